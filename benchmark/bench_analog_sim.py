@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# 测量模拟电路仿真在电阻电容网格上的耗时
+# 用法: python benchmark/bench_analog_sim.py [网格边长] [瞬态分析的步数]
+# 网格的每个节点通过电容接地, 相邻节点之间为电阻, 电池连接在网格的一角与地之间
+import os
+import sys
+import time
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+from physicsLab.circuit.analogSimulator import AnalogSimulator
+
+def main() -> None:
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    close_color_print()
+    exp = Experiment().crt("__bench__", force_crt=True)
+    ground = Ground_Component(0, 0, 1)
+    capacitors = crt_Elements(Basic_Capacitor, [(x, y, 0) for y in range(side) for x in range(side)])
+    for capacitor in capacitors:
+        capacitor.black - ground.i
+    for y in range(side):
+        for x in range(side):
+            node = capacitors[y * side + x].red
+            if x + 1 < side:
+                resistor = Resistor(x, y, 0.1)
+                node - resistor.red
+                resistor.black - capacitors[y * side + x + 1].red
+            if y + 1 < side:
+                resistor = Resistor(x, y, 0.2)
+                node - resistor.red
+                resistor.black - capacitors[(y + 1) * side + x].red
+    battery = Battery_Source(0, 0, 2)
+    battery.red - capacitors[0].red
+    battery.black - ground.i
+    print(f"{side}x{side} grid, {len(exp.Elements)} elements, {len(exp.Wires)} wires")
+
+    start = time.perf_counter()
+    sim = AnalogSimulator(exp)
+    print(f"build:  {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    sim.dc()
+    print(f"dc:     {time.perf_counter() - start:.2f}s")
+
+    sim = AnalogSimulator(exp)
+    start = time.perf_counter()
+    sim.transient(steps * 1e-6, 1e-6)
+    cost = time.perf_counter() - start
+    print(f"transient: {steps} steps in {cost:.2f}s ({cost / steps * 1e3:.2f}ms per step)")
+    exp.exit()
+
+if __name__ == "__main__":
+    main()
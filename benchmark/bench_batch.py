@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# 对比依次处理与用batch.map_saves并行处理多个存档的耗时
+# 用法: python benchmark/bench_batch.py [存档数量] [每个存档的元件数量]
+import os
+import sys
+import time
+import tempfile
+import collections
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+from physicsLab import batch
+
+def build_savs(count: int, num: int) -> list:
+    paths = []
+    for i in range(count):
+        exp = Experiment().crt(f"__bench_{i}__", force_crt=True)
+        gates = [Yes_Gate(j % 100, j // 100, 0) for j in range(num)]
+        for j in range(1, num):
+            gates[j - 1].o - gates[j].i
+        exp.write()
+        paths.append(exp.SAV_PATH)
+    return paths
+
+def audit(exp: Experiment) -> dict:
+    ''' 统计元件的类型与导线数 '''
+    counter = collections.Counter(type(element).__name__ for element in exp.Elements)
+    return {"elements": dict(counter), "wires": len(exp.Wires)}
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    num = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    close_color_print()
+    paths = build_savs(count, num)
+    print(f"{count} saves, {num} elements per save, {os.cpu_count()} cpus")
+
+    start = time.perf_counter()
+    serial = list(batch.map_saves(audit, paths, workers=0))
+    print(f"serial:   {time.perf_counter() - start:.2f}s")
+
+    for workers in (2, 4, os.cpu_count() or 1):
+        start = time.perf_counter()
+        parallel = list(batch.map_saves(audit, paths, workers=workers))
+        print(f"workers={workers}: {time.perf_counter() - start:.2f}s")
+        assert parallel == serial
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# 测量位并行仿真穷举检查加法电路的耗时
+# 用法: python benchmark/bench_bit_parallel.py [加法器位数] [最多仿真的分块数]
+# 输入组合过多时只仿真前几个分块, 并按比例估计穷举所有组合的耗时
+import os
+import sys
+import time
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+from physicsLab import lib
+from physicsLab.circuit.bitParallel import BitParallelSimulator
+
+def main() -> None:
+    bitnum = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    max_chunks = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    chunk_bits = 20
+    close_color_print()
+    exp = Experiment().crt("__bench__", force_crt=True)
+    a = lib.Inputs(0, 0, 0, bitnum)
+    b = lib.Inputs(1, 0, 0, bitnum)
+    adder = lib.Sum(2, 0, 0, bitnum)
+    a.outputs - adder.inputs1
+    b.outputs - adder.inputs2
+    print(f"{bitnum}-bit adder, {len(exp.Elements)} elements, {len(exp.Wires)} wires")
+
+    start = time.perf_counter()
+    sim = BitParallelSimulator(exp)
+    print(f"build:  {time.perf_counter() - start:.3f}s")
+
+    total = 1 << (2 * bitnum)
+    checked = 0
+    start = time.perf_counter()
+    for x, y in sim.exhaustive([a, b], chunk_bits):
+        assert (sim.get(adder.outputs) == x + y).all()
+        checked += len(x)
+        if checked >> chunk_bits >= max_chunks:
+            break
+    cost = time.perf_counter() - start
+    print(f"{checked} of {total} cases: {cost:.3f}s ({checked / cost / 1e6:.1f}M cases/s)")
+    if checked < total:
+        print(f"estimated time for all cases: {cost * total / checked:.1f}s")
+    exp.exit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# 创建大量逻辑门, 检查创建元件的耗时随元件数量线性增长
+# 用法: python benchmark/bench_crt_elements.py [最大元件数量]
+import os
+import sys
+import time
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+
+def bench(num: int) -> float:
+    exp = Experiment().crt("__bench__", force_crt=True)
+    start = time.perf_counter()
+    for i in range(num):
+        # 每个元件的坐标都不相同
+        Yes_Gate(i % 1000, i // 1000, 0)
+    result = time.perf_counter() - start
+    exp.exit()
+    return result
+
+def main() -> None:
+    max_num = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    nums = [max_num // 8, max_num // 4, max_num // 2, max_num]
+
+    per_element = []
+    for num in nums:
+        t = bench(num)
+        per_element.append(t / num)
+        print(f"{num:>7} gates: {t:.3f}s, {t / num * 1e6:.2f}us/gate")
+
+    # 线性增长时每个元件的平均耗时应基本不变
+    ratio = per_element[-1] / per_element[0]
+    print(f"per-gate time ratio ({nums[-1]} / {nums[0]}): {ratio:.2f}")
+    if ratio > 2:
+        print("construction time is not linear")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# 对比逐个实例化与用crt_Elements批量创建元件的耗时
+# 用法: python benchmark/bench_crt_elements_bulk.py [元件数量]
+import gc
+import os
+import sys
+import time
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+
+def one_by_one(positions: list) -> None:
+    for x, y, z in positions:
+        Yes_Gate(x, y, z)
+
+def bulk(positions: list) -> None:
+    crt_Elements(Yes_Gate, positions)
+
+def measure(func, positions: list) -> float:
+    gc.collect() # 回收上一次测量创建的元件
+    exp = Experiment().crt("__bench__", force_crt=True)
+    start = time.perf_counter()
+    func(positions)
+    cost = time.perf_counter() - start
+    assert len(exp.Elements) == len(positions)
+    exp.exit()
+    return cost
+
+def main() -> None:
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    close_color_print()
+    positions = [(i % 100, i // 100 % 100, i // 10000) for i in range(num)]
+    print(f"{num} Yes_Gate")
+
+    serial = measure(one_by_one, positions)
+    print(f"one by one:   {serial:.2f}s")
+    batched = min(measure(bulk, positions) for _ in range(3))
+    print(f"crt_Elements: {batched:.2f}s ({serial / batched:.1f}x)")
+
+if __name__ == "__main__":
+    main()
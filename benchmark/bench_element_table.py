@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# 测量元件表(Experiment.use_ElementTable)对内存的影响, 以及删除, 清空元件后回收的内存
+# 用法: python benchmark/bench_element_table.py [元件数量]
+import gc
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+
+def current_mb() -> float:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 2 ** 20
+
+def measure(num: int, use_table: bool) -> None:
+    positions = [(i % 100, i // 100 % 100, i // 10000) for i in range(num)]
+    tracemalloc.start()
+    base = current_mb()
+    exp = Experiment().crt("__bench__", force_crt=True)
+    if use_table:
+        exp.use_ElementTable()
+    start = time.perf_counter()
+    elements = crt_Elements(Logic_Input, positions)
+    cost = time.perf_counter() - start
+    created = current_mb() - base
+
+    # 删除一半元件, 之后再创建同样多的元件, 空出的行应被重新使用
+    half = elements[::2]
+    del_Elements(half)
+    del half, elements
+    deleted = current_mb() - base
+    crt_Elements(Logic_Input, positions[::2])
+    recreated = current_mb() - base
+
+    clear_Elements()
+    cleared = current_mb() - base
+    exp.exit()
+    tracemalloc.stop()
+    name = "ElementTable" if use_table else "dict"
+    print(f"{name:>12}: create {cost:.2f}s, {created:.1f}MB; "
+          f"delete half {deleted:.1f}MB; recreate {recreated:.1f}MB; clear {cleared:.1f}MB")
+
+def main() -> None:
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    close_color_print()
+    print(f"{num} Logic_Input (memory measured with tracemalloc, relative to an empty experiment)")
+    measure(num, False)
+    measure(num, True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# 对比各个json库解析存档的吞吐量
+# 用法: python benchmark/bench_json_backend.py [元件数量]
+import os
+import sys
+import time
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+from physicsLab import _jsonBackend, _savIO
+
+def build_sav(num: int) -> None:
+    Experiment().crt("__bench__", force_crt=True)
+    gates = [Yes_Gate(i % 1000, i // 1000, 0) for i in range(num)]
+    for i in range(1, num):
+        gates[i - 1].o - gates[i].i
+    get_Experiment().write()
+
+def best_of(func, repeat: int = 3) -> float:
+    result = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+def main() -> None:
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    build_sav(num)
+
+    exp = Experiment().open("__bench__")
+    status_save = _savIO.load_status_save(exp.PlSav["Experiment"]["StatusSave"])
+    exp.exit()
+    size = len(status_save.encode("utf-8")) / 1024 / 1024
+    print(f"StatusSave: {size:.1f}MB, {num} elements, {num - 1} wires")
+
+    for backend in _jsonBackend.BACKENDS:
+        if backend not in _jsonBackend.available_backends():
+            print(f"{backend:>9}: not installed")
+            continue
+        _jsonBackend.set_backend(backend)
+        t = best_of(lambda: _jsonBackend.loads(status_save))
+        print(f"{backend:>9}: loads {t:.3f}s ({size / t:.0f}MB/s)")
+
+    Experiment().open("__bench__").delete()
+
+if __name__ == "__main__":
+    main()
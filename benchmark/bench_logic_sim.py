@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# 测量事件驱动仿真在大型加法电路上的耗时
+# 用法: python benchmark/bench_logic_sim.py [加法器位数] [输入的组数]
+import os
+import sys
+import time
+import random
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+from physicsLab import lib
+from physicsLab.circuit.logicSimulator import LogicSimulator
+
+def main() -> None:
+    bitnum = int(sys.argv[1]) if len(sys.argv) > 1 else 2500
+    vectors = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    close_color_print()
+    exp = Experiment().crt("__bench__", force_crt=True)
+    a = lib.Inputs(0, 0, 0, bitnum)
+    b = lib.Inputs(1, 0, 0, bitnum)
+    adder = lib.Sum(2, 0, 0, bitnum)
+    out = lib.Outputs(3, 0, 0, bitnum + 1)
+    a.outputs - adder.inputs1
+    b.outputs - adder.inputs2
+    adder.outputs - out.inputs
+    print(f"{bitnum}-bit adder, {len(exp.Elements)} elements, {len(exp.Wires)} wires")
+
+    start = time.perf_counter()
+    sim = LogicSimulator(exp)
+    print(f"build:  {time.perf_counter() - start:.2f}s")
+
+    rand = random.Random(0)
+    start = time.perf_counter()
+    evaluations = sim.evaluations
+    for _ in range(vectors):
+        x, y = rand.getrandbits(bitnum), rand.getrandbits(bitnum)
+        sim.set(a, x).set(b, y)
+        assert sim.get(out) == x + y
+    cost = time.perf_counter() - start
+    print(f"{vectors} vectors: {cost:.2f}s, {(sim.evaluations - evaluations) / vectors:.0f} evaluations per vector")
+    exp.exit()
+
+if __name__ == "__main__":
+    main()
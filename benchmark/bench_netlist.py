@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# 测量在生成的大电路上建立网表与lint的耗时, 耗时应与电路的规模成线性关系
+# 用法: python benchmark/bench_netlist.py [门电路数量]
+import os
+import sys
+import time
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+
+def measure(num: int) -> None:
+    exp = Experiment().crt("__bench__", force_crt=True)
+    gates = crt_Elements(And_Gate, [(i % 100, i // 100 % 100, i // 10000) for i in range(num)])
+    for i in range(1, num):
+        gates[i - 1].o - gates[i].i_up
+        gates[i // 2].o - gates[i].i_low
+
+    start = time.perf_counter()
+    exp.use_Netlist()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    issues = exp.netlist.lint()
+    linted = time.perf_counter() - start
+    print(f"{num:>7} gates: use_Netlist {built:.2f}s, lint {linted:.2f}s, {len(issues)} issues")
+
+    # 交替删除导线与查询网络, 每次只重建被删除的导线所在的网络
+    start = time.perf_counter()
+    for i in range(1, min(num, 1001)):
+        del_Wire(gates[i - 1].o, gates[i].i_up)
+        exp.netlist.same_net(gates[i].o, gates[i // 2].o)
+    print(f"{'':>7}        del_Wire + same_net x{min(num, 1001) - 1}: {time.perf_counter() - start:.2f}s")
+    exp.exit()
+
+def main() -> None:
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    close_color_print()
+    measure(num)
+    measure(num * 2)
+
+if __name__ == "__main__":
+    main()
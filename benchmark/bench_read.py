@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# 读取存档的耗时, 以及通过注册表与通过eval获取元件类的耗时对比
+# 用法: python benchmark/bench_read.py [元件数量]
+import gc
+import os
+import sys
+import time
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+from physicsLab import circuit
+
+MODELS = ["Yes Gate", "And Gate", "Full Adder", "Logic Input", "Multiplier", "555 Timer", "D Flipflop"]
+
+def build_sav(num: int) -> str:
+    exp = Experiment().crt("__bench__", force_crt=True)
+    for i in range(num):
+        crt_Element(MODELS[i % len(MODELS)], i % 100, i // 100, 0)
+    exp.write()
+    return exp.SAV_PATH
+
+def measure_read(path: str) -> float:
+    gc.collect()
+    exp = Experiment().open(path, Experiment.PathLoadMode.path)
+    start = time.perf_counter()
+    exp.read()
+    cost = time.perf_counter() - start
+    exp.exit()
+    return cost
+
+def measure_dispatch(num: int) -> None:
+    names = [MODELS[i % len(MODELS)].replace(' ', '_') for i in range(num)]
+    names = ["NE555" if name == "555_Timer" else name for name in names]
+
+    start = time.perf_counter()
+    for name in names:
+        eval(f"circuit.{name}")
+    print(f"eval dispatch:     {time.perf_counter() - start:.3f}s")
+
+    from physicsLab.element import _element_class
+    start = time.perf_counter()
+    for model in (MODELS[i % len(MODELS)] for i in range(num)):
+        _element_class(ExperimentType.Circuit, model)
+    print(f"registry dispatch: {time.perf_counter() - start:.3f}s")
+
+def main() -> None:
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    close_color_print()
+    path = build_sav(num)
+    print(f"{num} elements")
+    print(f"read: {min(measure_read(path) for _ in range(3)):.2f}s")
+    measure_dispatch(num)
+    Experiment().open(path, Experiment.PathLoadMode.path).delete()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# 对比eval与_tools.parse_vector解析元件坐标的耗时
+# 用法: python benchmark/bench_read_vector.py [元件数量]
+import os
+import sys
+import time
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+from physicsLab import _tools
+
+def eval_vector(vector: str):
+    ''' 原先读取存档时使用的解析方式 '''
+    return eval(f"({vector})")
+
+def build_sav(num: int) -> None:
+    Experiment().crt("__bench__", force_crt=True)
+    # 元件放在少量坐标上, 使耗时主要来自解析存档
+    for i in range(num):
+        Logic_Input(i % 10, i // 10 % 10, 0)
+    get_Experiment().write()
+
+def bench_read(parse_vector) -> float:
+    _tools.parse_vector = parse_vector
+    exp = Experiment().open("__bench__")
+    start = time.perf_counter()
+    exp.read()
+    result = time.perf_counter() - start
+    exp.exit()
+    return result
+
+def bench_parse(parse_vector, vectors) -> float:
+    start = time.perf_counter()
+    for vector in vectors:
+        parse_vector(vector)
+    return time.perf_counter() - start
+
+def main() -> None:
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    build_sav(num)
+
+    vectors = [f"{i * 0.1234:.4f},{-i * 1e-05},{i}" for i in range(num)] * 2 # Position + Rotation
+    fast_parse = _tools.parse_vector
+    print(f"parse {len(vectors)} vectors: eval {bench_parse(eval_vector, vectors):.3f}s, "
+          f"parse_vector {bench_parse(fast_parse, vectors):.3f}s")
+    print(f"read {num} elements: eval {bench_read(eval_vector):.3f}s, "
+          f"parse_vector {bench_read(fast_parse):.3f}s")
+
+    Experiment().open("__bench__").delete()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# 测量crt_Wire, 查询导线与del_Wire的吞吐量
+# 用法: python benchmark/bench_wires.py [导线数量]
+import gc
+import os
+import sys
+import time
+import tempfile
+
+os.environ["PHYSICSLAB_HOME_PATH"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from physicsLab import *
+from physicsLab.circuit.wire import Wire
+
+def report(name: str, num: int, cost: float) -> None:
+    print(f"{name:<10} {cost:.2f}s ({num / cost / 1000:.0f}k wires/s)")
+
+def main() -> None:
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    close_color_print()
+    exp = Experiment().crt("__bench__", force_crt=True)
+    gates = crt_Elements(Yes_Gate, [(i % 100, i // 100 % 100, i // 10000) for i in range(num + 1)])
+    print(f"{num} wires")
+
+    gc.collect()
+    start = time.perf_counter()
+    for i in range(num):
+        crt_Wire(gates[i].o, gates[i + 1].i)
+    report("crt_Wire", num, time.perf_counter() - start)
+    assert len(exp.Wires) == num
+
+    wires = list(exp.Wires)
+    start = time.perf_counter()
+    for a_wire in wires:
+        assert a_wire in exp.Wires
+    report("lookup", num, time.perf_counter() - start)
+
+    # 新构造的导线需要由两端元件的slot计算key
+    start = time.perf_counter()
+    for i in range(num):
+        assert Wire(gates[i].o, gates[i + 1].i) in exp.Wires
+    report("lookup new", num, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(num):
+        del_Wire(gates[i].o, gates[i + 1].i)
+    report("del_Wire", num, time.perf_counter() - start)
+    assert len(exp.Wires) == 0
+    exp.exit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# 对比流式写入与原先一次性json.dumps写入存档的峰值内存(RSS)与耗时
+# 用法: python benchmark/bench_write.py [元件数量]
+# 每种写入方式在单独的进程中运行, 峰值RSS为写入存档期间增加的内存 (仅支持Linux)
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+os.environ.setdefault("PHYSICSLAB_HOME_PATH", tempfile.mkdtemp())
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+def _rss_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    raise RuntimeError(f"{field} not found")
+
+def _reset_peak_rss() -> None:
+    # 重置VmHWM (Linux >= 4.0)
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+def legacy_write(exp) -> None:
+    ''' 原先Experiment.write的实现: 先生成整个StatusSave字符串, 再生成整个存档字符串 '''
+    from physicsLab.circuit.elementTable import to_save_dict
+    exp._Experiment__write_header()
+    status_save = dict(exp.StatusSave)
+    status_save["Elements"] = [to_save_dict(a_element.data) for a_element in exp.Elements]
+    status_save["Wires"] = [a_wire.release() for a_wire in exp.Wires]
+    exp.PlSav["Experiment"]["StatusSave"] = json.dumps(status_save, ensure_ascii=False, separators=(',', ': '))
+    context = json.dumps(exp.PlSav, indent=2, ensure_ascii=False, separators=(',', ':'))
+    with open(exp.SAV_PATH, "w", encoding="utf-8") as f:
+        f.write(context)
+
+def run(mode: str, num: int) -> None:
+    from physicsLab import Experiment, Yes_Gate
+
+    exp = Experiment().crt(f"__bench_{mode}__", force_crt=True)
+    gates = [Yes_Gate(i % 1000, i // 1000, 0) for i in range(num)]
+    for i in range(1, num):
+        gates[i - 1].o - gates[i].i
+
+    _reset_peak_rss()
+    rss = _rss_kb("VmRSS")
+    start = time.perf_counter()
+    if mode == "stream":
+        exp.write(no_pop=True)
+    else:
+        legacy_write(exp)
+    elapsed = time.perf_counter() - start
+    peak = _rss_kb("VmHWM") - rss
+
+    size = os.path.getsize(exp.SAV_PATH)
+    print(f"{mode:>6}: {elapsed:.2f}s, peak RSS +{peak / 1024:.1f}MB, save {size / 1024 / 1024:.1f}MB")
+    exp.delete()
+
+def main() -> None:
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for mode in ("legacy", "stream"):
+        subprocess.run([sys.executable, __file__, "--run", mode, str(num)], check=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
@@ -16,7 +16,7 @@ from .celestial import *
 # 电与磁实验
 from .electromagnetism import *
 # 操作元件
-from .element import crt_Element, del_Element, count_Elements, get_Element, clear_Elements
+from .element import crt_Element, crt_Elements, del_Element, del_Elements, count_Elements, get_Element, clear_Elements
 # `physicsLab`自定义异常类
 from .errors import *
 
@@ -27,6 +27,7 @@ from physicsLab.plAR import *
 from physicsLab import web
 from physicsLab import lib
 from physicsLab import music
+from physicsLab import batch
 
 # 检测操作系统
 # Win: 若存档对应文件夹不存在直接报错
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# Experiment.Elements: 删除元件时不遍历整个列表
+# 被删除的元件在列表中以None占位(墓碑), 并记录每个元件的位置;
+#   墓碑超过一半时压缩列表, 因此删除的均摊开销为O(1)
+# 按下标访问, 插入等依赖位置的操作会先压缩列表
+# 每个元件在列表中只能出现一次
+from collections.abc import MutableSequence
+
+from physicsLab.typehint import Any, Dict, Iterable, Iterator
+
+_MIN_COMPACT = 32 # 墓碑少于该值时不压缩, 避免小列表频繁压缩
+
+class ElementList(MutableSequence):
+    ''' 元件列表, remove与in的开销为O(1), 其余行为同list
+        注意: 不是list的子类, 切片, copy(), 与list相加的结果为list
+    '''
+    def __init__(self, elements: Iterable[Any] = ()) -> None:
+        self._items: list = list(elements) # 被删除的元件为None
+        self._holes: int = 0
+        self._reindex()
+
+    def _compact(self) -> None:
+        if self._holes == 0:
+            return
+        self._items = [element for element in self._items if element is not None]
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._holes = 0
+        self._position: Dict[Any, int] = {element: i for i, element in enumerate(self._items)}
+        if len(self._position) != len(self._items):
+            raise ValueError("an element can only be in ElementList once")
+
+    def _check_new(self, value) -> None:
+        if value in self._position:
+            raise ValueError("element is already in ElementList")
+
+    def __len__(self) -> int:
+        return len(self._items) - self._holes
+
+    def __getitem__(self, i):
+        self._compact()
+        return self._items[i]
+
+    def __setitem__(self, i, value) -> None:
+        self._compact()
+        if isinstance(i, slice):
+            items = self._items.copy()
+            items[i] = value
+            self._items, old_items = items, self._items
+            try:
+                self._reindex()
+            except ValueError:
+                self._items = old_items
+                self._reindex()
+                raise
+            return
+        if i < 0:
+            i += len(self._items)
+        old = self._items[i]
+        if value is not old:
+            self._check_new(value)
+        self._items[i] = value
+        if self._position.get(old) == i:
+            del self._position[old]
+        self._position[value] = i
+
+    def __delitem__(self, i) -> None:
+        self._compact()
+        del self._items[i]
+        self._reindex()
+
+    def insert(self, i: int, value) -> None:
+        self._check_new(value)
+        self._compact()
+        self._items.insert(i, value)
+        self._reindex()
+
+    def append(self, value) -> None:
+        self._check_new(value)
+        self._position[value] = len(self._items)
+        self._items.append(value)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        for value in values:
+            self.append(value)
+
+    def remove(self, value) -> None:
+        i = self._position.pop(value, None)
+        if i is None:
+            raise ValueError("ElementList.remove(x): x not in list")
+        self._items[i] = None
+        self._holes += 1
+        # 末尾的墓碑可以直接去掉
+        while self._items and self._items[-1] is None:
+            self._items.pop()
+            self._holes -= 1
+        if self._holes >= _MIN_COMPACT and self._holes * 2 > len(self._items):
+            self._compact()
+
+    def index(self, value, *args) -> int:
+        self._compact()
+        i = self._position.get(value)
+        if i is None or args:
+            return self._items.index(value, *args)
+        return i
+
+    def __contains__(self, value) -> bool:
+        return value in self._position
+
+    def __iter__(self) -> Iterator[Any]:
+        # 遍历时可能有元件被删除或列表被压缩, 与list一样按位置继续遍历
+        i = 0
+        while i < len(self._items):
+            element = self._items[i]
+            if element is not None:
+                yield element
+            i += 1
+
+    def sort(self, *, key=None, reverse: bool = False) -> None:
+        self._compact()
+        self._items.sort(key=key, reverse=reverse)
+        self._reindex()
+
+    def reverse(self) -> None:
+        self._compact()
+        self._items.reverse()
+        self._reindex()
+
+    def copy(self) -> list:
+        return list(self)
+
+    def __add__(self, other) -> list:
+        if isinstance(other, (list, ElementList)):
+            return list(self) + list(other)
+        return NotImplemented
+
+    def __radd__(self, other) -> list:
+        if isinstance(other, list):
+            return other + list(self)
+        return NotImplemented
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._position.clear()
+        self._holes = 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, ElementList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# 为实验中的元件分配Identifier (与物实相同: 32位大小写字母与数字)
+# 每次生成一批随机的Identifier, 分配时跳过实验中已有的Identifier
+from physicsLab import _tools
+from physicsLab.typehint import List
+
+IDENTIFIER_LENGTH = 32
+
+class IdentifierAllocator:
+    ''' 一个实验的Identifier分配器, 分配的Identifier不会与实验中已有的元件重复 '''
+    BATCH_SIZE = 256 # 每次生成的Identifier数
+
+    def __init__(self, experiment) -> None:
+        self._experiment = experiment
+        self._pool: List[str] = []
+
+    def allocate(self) -> str:
+        ''' 分配一个Identifier '''
+        used = self._experiment.elements_Identifier
+        while True:
+            if len(self._pool) == 0:
+                self._pool = _tools.randStrings(self.BATCH_SIZE, IDENTIFIER_LENGTH)
+            identifier = self._pool.pop()
+            if identifier not in used:
+                return identifier
+
+    def allocate_many(self, count: int) -> List[str]:
+        ''' 分配count个互不相同的Identifier '''
+        if not isinstance(count, int):
+            raise TypeError
+        if count < 0:
+            raise ValueError("count must not be negative")
+
+        used = self._experiment.elements_Identifier
+        result = self._pool[len(self._pool) - count:] if count != 0 else []
+        del self._pool[len(self._pool) - len(result):]
+        while True:
+            # 去掉与实验中已有的或本批中重复的Identifier, 再补足
+            result = [identifier for identifier in dict.fromkeys(result) if identifier not in used]
+            if len(result) == count:
+                return result
+            result += _tools.randStrings(count - len(result), IDENTIFIER_LENGTH)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# 解析存档使用的json库
+# 安装了orjson, ujson或simdjson时使用更快的库解析存档, 否则使用标准库json
+# 写入存档始终使用标准库json: 其他库无法生成与之前完全相同的存档 (如separators=(',', ': '))
+import json
+
+from physicsLab.typehint import Any, Callable, Dict, List, Optional
+
+def _json_loads(s: str) -> Any:
+    # 存档中可能含有未转义的换行 (Experiment.write(ln=True)), 因此使用strict=False
+    return json.loads(s, strict=False)
+
+def _import_backend(name: str) -> Optional[Callable[[str], Any]]:
+    try:
+        if name == "orjson":
+            import orjson
+            return orjson.loads
+        if name == "ujson":
+            import ujson
+            return ujson.loads
+        if name == "simdjson":
+            import simdjson
+            return simdjson.loads
+    except ImportError:
+        return None
+    if name == "json":
+        return _json_loads
+    raise ValueError(f"unknown json backend {name}")
+
+# 按速度排序
+BACKENDS = ("orjson", "simdjson", "ujson", "json")
+
+_loads_func: Dict[str, Callable[[str], Any]] = {}
+for _name in BACKENDS:
+    _func = _import_backend(_name)
+    if _func is not None:
+        _loads_func[_name] = _func
+
+_backend: str = next(name for name in BACKENDS if name in _loads_func)
+
+def available_backends() -> List[str]:
+    ''' 已安装的json库 '''
+    return list(_loads_func.keys())
+
+def get_backend() -> str:
+    return _backend
+
+def set_backend(name: str) -> None:
+    ''' 设置解析存档使用的json库: "orjson", "simdjson", "ujson"或"json" '''
+    if not isinstance(name, str):
+        raise TypeError
+    if name not in BACKENDS:
+        raise ValueError(f"unknown json backend {name}")
+    if name not in _loads_func:
+        raise ImportError(f"json backend {name} is not installed")
+
+    global _backend
+    _backend = name
+
+def loads(s: str) -> Any:
+    ''' 解析json字符串, 结果与json.loads(s, strict=False)相同
+        其他json库不支持的内容(如NaN, 字符串中未转义的控制字符, 超出64位的整数)交给标准库处理
+    '''
+    if _backend == "json":
+        return _json_loads(s)
+    try:
+        return _loads_func[_backend](s)
+    except (ValueError, OverflowError): # orjson.JSONDecodeError, ujson.JSONDecodeError等均为ValueError的子类
+        return _json_loads(s)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# 按需构造元件的Experiment.Elements (Experiment.read(lazy=True))
+# 未构造的元件在列表中以其在StatusSaveIndex中的row(int)占位, 被索引或遍历时才会解码并构造
+from collections.abc import MutableSequence
+
+from physicsLab.typehint import Any, Callable, Optional, Iterator
+
+class LazyElements(MutableSequence):
+    ''' 按需构造元件的元件列表 '''
+    def __init__(self, experiment, index, read_element: Callable[[dict], Any]) -> None:
+        self._experiment = experiment
+        self._index = index # _savIO.StatusSaveIndex
+        self._read_element = read_element
+        self._items: list = list(range(len(index)))
+        self._unbuilt: int = len(index)
+        self._building: Optional[int] = None # 正在构造的元件的位置
+        self._shifted: bool = False # 未构造的元件的位置是否可能已经与row不同
+
+    @property
+    def unbuilt(self) -> int:
+        ''' 尚未构造的元件数 '''
+        return self._unbuilt
+
+    def _build(self, i: int) -> Any:
+        item = self._items[i]
+        if type(item) is not int:
+            return item
+
+        from physicsLab.experiment import stack_Experiment
+        # 元件的元类通过get_Experiment()获取所属的实验, 并调用Elements.append
+        stack_Experiment.push(self._experiment)
+        self._building = i
+        try:
+            self._read_element(self._index.load_element(item))
+        finally:
+            self._building = None
+            stack_Experiment.pop()
+        self._unbuilt -= 1
+        return self._items[i]
+
+    def build_identifier(self, identifier: str) -> None:
+        ''' 构造存档中Identifier为identifier的元件(若尚未构造) '''
+        row = self._index.find_identifier(identifier)
+        if row is None:
+            return
+        if not self._shifted and row < len(self._items) and self._items[row] == row:
+            self._build(row)
+            return
+        for i, item in enumerate(self._items):
+            if type(item) is int and item == row:
+                self._build(i)
+                return
+
+    def load_wires(self) -> list:
+        ''' 解码存档中的所有导线 '''
+        return self._index.load_wires()
+
+    def close(self) -> None:
+        ''' 解除对存档的映射, 之后无法再构造未构造的元件 '''
+        self._index.close()
+
+    def load_all(self) -> None:
+        ''' 构造所有元件 '''
+        if self._unbuilt != 0:
+            for i in range(len(self._items)):
+                self._build(i)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._build(j) for j in range(*i.indices(len(self._items)))]
+        if i < 0:
+            i += len(self._items)
+        if not 0 <= i < len(self._items):
+            raise IndexError("list index out of range")
+        return self._build(i)
+
+    def __setitem__(self, i, value) -> None:
+        if isinstance(i, slice):
+            value = list(value)
+            self._unbuilt -= sum(1 for item in self._items[i] if type(item) is int)
+            self._shifted = True
+        elif type(self._items[i]) is int:
+            self._unbuilt -= 1
+        self._items[i] = value
+
+    def __delitem__(self, i) -> None:
+        if isinstance(i, slice):
+            self._unbuilt -= sum(1 for item in self._items[i] if type(item) is int)
+        elif type(self._items[i]) is int:
+            self._unbuilt -= 1
+        del self._items[i]
+        self._shifted = True
+
+    def insert(self, i: int, value) -> None:
+        if i < len(self._items):
+            self._shifted = True
+        self._items.insert(i, value)
+
+    def append(self, value) -> None:
+        if self._building is not None:
+            self._items[self._building] = value
+        else:
+            self._items.append(value)
+
+    def __iter__(self) -> Iterator[Any]:
+        i = 0
+        while i < len(self._items):
+            yield self._build(i)
+            i += 1
+
+    def __contains__(self, value) -> bool:
+        return type(value) is not int and value in self._items
+
+    def index(self, value, *args) -> int:
+        if type(value) is int:
+            raise ValueError(f"{value} is not in list")
+        return self._items.index(value, *args)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._unbuilt = 0
+
+    def __repr__(self) -> str:
+        return f"LazyElements({len(self._items)} elements, {self._unbuilt} unbuilt)"
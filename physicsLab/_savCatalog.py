@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# 存档目录的索引: 文件名 -> 存档名(InternalName)
+# 用文件的mtime与size判断存档是否被修改, 每次只重新解析被修改过的存档
+# 限制: 在mtime的精度内被改写且大小不变的存档会被当作未修改; 查找到的存档由search_Experiment再次检查InternalName,
+#   但改名后的存档在其下次被修改前可能查找不到
+# 索引保存在physicsLab自己的缓存目录中, 不会在物实的存档目录中写入文件
+import os
+import json
+import hashlib
+import platform
+import tempfile
+
+from physicsLab.typehint import Optional, Dict
+
+_CATALOG_VERSION = 1
+
+def _cache_dir() -> str:
+    ''' physicsLab的缓存目录, 可以用环境变量PHYSICSLAB_CACHE_PATH指定 '''
+    if os.environ.get("PHYSICSLAB_CACHE_PATH"):
+        return os.environ["PHYSICSLAB_CACHE_PATH"]
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/AppData/Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "physicsLab")
+
+def _catalog_path(sav_root_dir: str) -> str:
+    # 每个存档目录对应一个索引文件
+    digest = hashlib.sha1(os.path.abspath(sav_root_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_cache_dir(), f"catalog_{digest}.json")
+
+def _load(sav_root_dir: str) -> Dict[str, dict]:
+    try:
+        with open(_catalog_path(sav_root_dir), encoding="utf-8") as f:
+            catalog = json.load(f)
+    except (OSError, ValueError): # 索引不存在或已损坏, 重新建立索引
+        return {}
+
+    if not isinstance(catalog, dict) or catalog.get("version") != _CATALOG_VERSION \
+            or not isinstance(catalog.get("entries"), dict):
+        return {}
+    return catalog["entries"]
+
+def _dump(sav_root_dir: str, entries: Dict[str, dict]) -> None:
+    ''' 先写入临时文件再替换, 避免多个进程同时写入时索引损坏 '''
+    try:
+        os.makedirs(_cache_dir(), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=_cache_dir(), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": _CATALOG_VERSION, "entries": entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, _catalog_path(sav_root_dir))
+    except OSError: # 缓存目录不可写时, 索引仅在内存中生效
+        pass
+
+def refresh(sav_root_dir: str) -> Dict[str, dict]:
+    ''' 增量刷新索引
+        @return: {文件名: {"mtime": ..., "size": ..., "name": 存档名}}
+                 不是物实存档的文件的name为None
+    '''
+    from physicsLab.experiment import _open_sav
+
+    old_entries = _load(sav_root_dir)
+    entries: Dict[str, dict] = {}
+    changed = False
+
+    with os.scandir(sav_root_dir) as it:
+        for entry in it:
+            if not entry.name.endswith("sav") or not entry.is_file():
+                continue
+
+            stat = entry.stat()
+            record = old_entries.get(entry.name)
+            # 手动修改或未写完的记录视为过期, 重新解析该存档
+            if isinstance(record, dict) and "name" in record and record.get("mtime") == stat.st_mtime_ns \
+                    and record.get("size") == stat.st_size:
+                entries[entry.name] = record
+                continue
+
+            sav = _open_sav(entry.path, header_only=True)
+            name = sav.get("InternalName") if isinstance(sav, dict) else None
+            entries[entry.name] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "name": name}
+            changed = True
+
+    if changed or len(entries) != len(old_entries):
+        _dump(sav_root_dir, entries)
+    return entries
+
+def search(sav_root_dir: str, sav_name: str) -> Optional[str]:
+    ''' 通过索引查找存档名对应的文件名, 若不存在则返回None '''
+    for filename, record in refresh(sav_root_dir).items():
+        if record.get("name") == sav_name:
+            return filename
+    return None
+
+def discard(sav_root_dir: str, filename: str) -> None:
+    ''' 从索引中移除一个文件 (如该存档已被删除) '''
+    entries = _load(sav_root_dir)
+    if entries.pop(filename, None) is not None:
+        _dump(sav_root_dir, entries)
@@ -0,0 +1,502 @@
+# -*- coding: utf-8 -*-
+# 存档(.sav)的流式读取
+# 存档的StatusSave是嵌套在json中的json字符串, 通常占了存档的绝大部分
+# 因此这里按块读取存档, 只解析需要的字段, 跳过的字段只会被逐块扫描而不会构造成python对象
+import re
+import json
+
+from json.decoder import scanstring
+
+from physicsLab.typehint import Optional, Iterator, Tuple, Dict, Any
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_CONTAINER_TOKEN = re.compile(r'["{}\[\]]')
+
+# 存档中可能含有未转义的换行 (Experiment.write(ln=True)), 因此使用strict=False
+_decoder = json.JSONDecoder(strict=False)
+
+class _Scanner:
+    ''' 按块读取文件的增量json扫描器 '''
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, f) -> None:
+        self.f = f
+        self.buf: str = ""
+        self.pos: int = 0
+        self.eof: bool = False
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        ''' 读取更多内容, 丢弃已经扫描过的部分 '''
+        if self.eof:
+            return False
+        chunk = self.f.read(self.CHUNK_SIZE if size is None else size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _error(self, msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, self.buf, self.pos)
+
+    def skip_whitespace(self) -> None:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        self.skip_whitespace()
+        if self.pos >= len(self.buf):
+            raise self._error("Unexpected end of file")
+        return self.buf[self.pos]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def decode_value(self) -> Any:
+        ''' 解码一个完整的json值 '''
+        self.peek()
+        size = self.CHUNK_SIZE
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # 值被块截断, 读取更多内容后重试; 每次加倍读取量以保证线性的开销
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # 数字可能恰好在块的末尾被截断
+            if end == len(self.buf) and not self.eof and not isinstance(value, (str, dict, list)):
+                self._fill(size)
+                continue
+            self.pos = end
+            return value
+
+    def skip_string(self) -> None:
+        ''' 跳过一个字符串, 只会临时解码当前的块 '''
+        self.expect('"')
+        while True:
+            try:
+                _, end = scanstring(self.buf, self.pos, False)
+            except json.JSONDecodeError:
+                # 字符串在当前块中没有结束, 只保留块末尾未配对的转义符
+                tail = len(self.buf)
+                while tail > self.pos and self.buf[tail - 1] == '\\':
+                    tail -= 1
+                self.pos = len(self.buf) - (len(self.buf) - tail) % 2
+                if not self._fill():
+                    raise self._error("Unterminated string")
+                continue
+            self.pos = end
+            return
+
+    def skip_value(self) -> None:
+        ''' 跳过一个json值, 不构造对应的python对象 '''
+        char = self.peek()
+        if char == '"':
+            self.skip_string()
+            return
+        if char not in "{[":
+            self.decode_value()
+            return
+
+        depth = 0
+        while True:
+            match = _CONTAINER_TOKEN.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise self._error("Unexpected end of file")
+                continue
+
+            token = match.group()
+            if token == '"':
+                self.pos = match.start()
+                self.skip_string()
+                continue
+
+            self.pos = match.end()
+            if token in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def iter_object(self) -> Iterator[str]:
+        ''' 依次产生对象的键, 调用者需要在取得键之后消耗掉对应的值 '''
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.decode_value()
+            if not isinstance(key, str):
+                raise self._error("Expecting property name enclosed in double quotes")
+            self.expect(':')
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise self._error("Expecting ',' delimiter")
+
+    def finish(self) -> None:
+        ''' 检查文档之后只有空白字符 '''
+        self.skip_whitespace()
+        if self.pos < len(self.buf):
+            raise self._error("Extra data")
+
+class LazyStatusSave:
+    ''' 尚未读取的StatusSave, 仅在Experiment.read()时才会从存档中解码 '''
+    __slots__ = ("path", "encoding")
+
+    def __init__(self, path: str, encoding: str) -> None:
+        self.path = path
+        self.encoding = encoding
+
+    def load(self) -> str:
+        with open(self.path, encoding=self.encoding) as f:
+            scanner = _Scanner(f)
+            for key in scanner.iter_object():
+                if key == "StatusSave":
+                    return scanner.decode_value()
+                if key == "Experiment" and scanner.peek() == '{':
+                    for sub_key in scanner.iter_object():
+                        if sub_key == "StatusSave":
+                            return scanner.decode_value()
+                        scanner.skip_value()
+                    continue
+                scanner.skip_value()
+        raise json.JSONDecodeError("StatusSave not found", "", 0)
+
+def read_header(path: str,
+                encoding: str = "utf-8",
+                keys: Tuple[str, ...] = ("InternalName", "Type", "Summary"),
+                ) -> Dict[str, Any]:
+    ''' 只读取存档最外层的元数据, 其余字段(如Experiment)被跳过而不解码
+        取得所有需要的字段后立即停止读取
+    '''
+    result: Dict[str, Any] = {}
+    with open(path, encoding=encoding) as f:
+        scanner = _Scanner(f)
+        for key in scanner.iter_object():
+            if key in keys:
+                result[key] = scanner.decode_value()
+                if len(result) == len(keys):
+                    break
+            else:
+                scanner.skip_value()
+    return result
+
+def read_sav(path: str, encoding: str = "utf-8") -> Dict[str, Any]:
+    ''' 读取整个存档, 但StatusSave以LazyStatusSave代替 '''
+    result: Dict[str, Any] = {}
+    with open(path, encoding=encoding) as f:
+        scanner = _Scanner(f)
+        for key in scanner.iter_object():
+            if key == "StatusSave": # 物实导出的存档只含有.sav的Experiment部分
+                scanner.skip_value()
+                result[key] = LazyStatusSave(path, encoding)
+            elif key == "Experiment" and scanner.peek() == '{':
+                experiment: Dict[str, Any] = {}
+                for sub_key in scanner.iter_object():
+                    if sub_key == "StatusSave":
+                        scanner.skip_value()
+                        experiment[sub_key] = LazyStatusSave(path, encoding)
+                    else:
+                        experiment[sub_key] = scanner.decode_value()
+                result[key] = experiment
+            else:
+                result[key] = scanner.decode_value()
+        scanner.finish()
+    return result
+
+def load_status_save(status_save: Any) -> Optional[str]:
+    ''' 获取StatusSave字符串, 若为LazyStatusSave则从存档中读取 '''
+    if isinstance(status_save, LazyStatusSave):
+        return status_save.load()
+    return status_save
+
+# 按需读取StatusSave中的元件 (Experiment.read(lazy=True))
+# StatusSave在存档中是转义后的json字符串, 这里直接在存档的字节中定位每个元件的范围, 而不解码整个StatusSave
+# 在转义后的字节中, 内层json的结构字符({}[]与内层字符串的引号)可以不经解码地识别:
+#   内层字符串的引号为 \" , 内层字符串中被转义的引号为 \\\" , 内层的反斜杠为 \\
+_B_WS = rb'(?:\s|\\[nrt])*'
+_B_OTHER = rb'[^{}\[\]\\"]*'
+_B_STRING = rb'\\"[^\\"]*(?:(?:\\[^\\"]|\\\\(?:\\"|\\\\|[^\\"]))[^\\"]*)*\\"'
+
+def _b_container(depth: int) -> bytes:
+    ''' 嵌套深度不超过depth的内层json对象或数组 '''
+    inner = _B_STRING if depth == 0 else rb'(?:' + _B_STRING + rb'|' + _b_container(depth - 1) + rb')'
+    return rb'[{\[]' + _B_OTHER + rb'(?:' + inner + _B_OTHER + rb')*[}\]]'
+
+# 元件通常只有2层嵌套, 更深的值交给_skip_nested处理
+# 正则中的循环均已展开(各分支的首字符互斥), 匹配失败时不会出现指数级的回溯
+_b_container_re = re.compile(_b_container(4))
+_b_string_re = re.compile(_B_STRING)
+_b_key_re = re.compile(_B_WS + rb'\\"([^\\"]*)\\"' + _B_WS + rb':' + _B_WS)
+_b_scalar_re = re.compile(rb'[^,}\]\s\\]*')
+_b_ws_re = re.compile(_B_WS)
+_b_token_re = re.compile(rb'\\*"|[{}\[\]]')
+_b_status_save_re = re.compile(rb'(?<!\\)"StatusSave"\s*:\s*"')
+_b_identifier_re = re.compile(rb'\\"Identifier\\"' + _B_WS + rb':' + _B_WS + rb'\\"([^\\"]*)\\"')
+
+class StatusSaveIndex:
+    ''' 存档中StatusSave的元件与导线在文件中的字节范围
+        文件通过mmap映射, 只有被读取的元件才会被解码
+    '''
+    def __init__(self, path: str) -> None:
+        import mmap
+        from array import array
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._starts = array('Q')
+        self._ends = array('Q')
+        self._wires: Optional[Tuple[int, int]] = None
+        self._identifiers: Optional[Dict[str, int]] = None
+        try:
+            self.__scan()
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @staticmethod
+    def _error(msg: str, pos: int) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, "", pos)
+
+    def __scan(self) -> None:
+        buf = self._mmap
+        match = _b_status_save_re.search(buf)
+        if match is None:
+            raise self._error("StatusSave not found", 0)
+        pos = _b_ws_re.match(buf, match.end()).end()
+        if buf[pos:pos + 1] != b'{':
+            raise self._error("Expecting '{'", pos)
+        pos += 1
+
+        while True:
+            pos = _b_ws_re.match(buf, pos).end()
+            if buf[pos:pos + 1] == b'}':
+                return
+            match = _b_key_re.match(buf, pos)
+            if match is None:
+                raise self._error("Expecting property name", pos)
+            key = match.group(1)
+            pos = match.end()
+            if key == b"Elements":
+                pos = self.__scan_elements(pos)
+            elif key == b"Wires":
+                end = self._skip_value(pos)
+                self._wires = (pos, end)
+                pos = end
+            else:
+                pos = self._skip_value(pos)
+
+            pos = _b_ws_re.match(buf, pos).end()
+            if buf[pos:pos + 1] == b',':
+                pos += 1
+            elif buf[pos:pos + 1] != b'}':
+                raise self._error("Expecting ',' delimiter", pos)
+
+    def __scan_elements(self, pos: int) -> int:
+        ''' 记录每个元件的范围, 电学与电与磁实验的元件为数组, 天体物理实验的元件为对象 '''
+        buf = self._mmap
+        if buf[pos:pos + 1] not in (b'[', b'{'):
+            return self._skip_value(pos)
+        is_dict = buf[pos:pos + 1] == b'{'
+        pos += 1
+        while True:
+            pos = _b_ws_re.match(buf, pos).end()
+            if buf[pos:pos + 1] in (b']', b'}'):
+                return pos + 1
+            if is_dict:
+                match = _b_key_re.match(buf, pos)
+                if match is None:
+                    raise self._error("Expecting property name", pos)
+                pos = match.end()
+            end = self._skip_value(pos)
+            self._starts.append(pos)
+            self._ends.append(end)
+            pos = _b_ws_re.match(buf, end).end()
+            if buf[pos:pos + 1] == b',':
+                pos += 1
+            elif buf[pos:pos + 1] not in (b']', b'}'):
+                raise self._error("Expecting ',' delimiter", pos)
+
+    def _skip_value(self, pos: int) -> int:
+        ''' 返回从pos开始的内层json值的结束位置 '''
+        buf = self._mmap
+        char = buf[pos:pos + 1]
+        if char in (b'{', b'['):
+            match = _b_container_re.match(buf, pos)
+            return self._skip_nested(pos) if match is None else match.end()
+        if char == b'\\':
+            match = _b_string_re.match(buf, pos)
+            if match is None:
+                raise self._error("Unterminated string", pos)
+            return match.end()
+        return _b_scalar_re.match(buf, pos).end()
+
+    def _skip_nested(self, pos: int) -> int:
+        ''' 逐个扫描结构字符, 用于嵌套较深的值 '''
+        depth = 0
+        in_string = False
+        for match in _b_token_re.finditer(self._mmap, pos):
+            token = match.group()
+            if token[-1:] == b'"':
+                backslashes = len(token) - 1
+                if backslashes % 2 == 0: # StatusSave字符串结束
+                    break
+                if backslashes % 4 == 1: # 内层字符串的引号, 而不是内层字符串中被转义的引号
+                    in_string = not in_string
+                continue
+            if in_string:
+                continue
+            if token in (b'{', b'['):
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        raise self._error("Unexpected end of StatusSave", pos)
+
+    def _decode(self, start: int, end: int) -> Any:
+        from physicsLab import _jsonBackend
+        text, _ = scanstring(self._mmap[start:end].decode("utf-8") + '"', 0, False)
+        return _jsonBackend.loads(text)
+
+    def load_element(self, row: int) -> dict:
+        ''' 解码第row个元件的dict '''
+        return self._decode(self._starts[row], self._ends[row])
+
+    def load_wires(self) -> list:
+        ''' 解码所有导线 '''
+        if self._wires is None:
+            return []
+        return self._decode(*self._wires)
+
+    def find_identifier(self, identifier: str) -> Optional[int]:
+        ''' 通过Identifier查找元件的row, 第一次调用时建立索引 '''
+        if self._identifiers is None:
+            self._identifiers = {}
+            for row, (start, end) in enumerate(zip(self._starts, self._ends)):
+                match = _b_identifier_re.search(self._mmap, start, end)
+                if match is not None:
+                    self._identifiers.setdefault(match.group(1).decode("utf-8"), row)
+        return self._identifiers.get(identifier)
+
+    def close(self) -> None:
+        self._mmap.close()
+
+# 流式写入存档
+# 结果与json.dumps(plsav, indent=2, ensure_ascii=False, separators=(',', ':'))完全相同,
+# 但StatusSave逐个元件编码并转义后直接写入文件, 内存中不会出现整个存档或StatusSave的字符串
+WRITE_BUFFER_SIZE = 1 << 16
+
+_status_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ': '))
+_sav_encoder = json.JSONEncoder(indent=2, ensure_ascii=False, separators=(',', ':'))
+
+class StreamList:
+    ''' 逐个产生元素的json数组, 用于iter_status_save '''
+    __slots__ = ("iterable",)
+
+    def __init__(self, iterable) -> None:
+        self.iterable = iterable
+
+class StreamDict:
+    ''' 逐个产生(key, value)的json对象, 用于iter_status_save '''
+    __slots__ = ("iterable",)
+
+    def __init__(self, iterable) -> None:
+        self.iterable = iterable
+
+def _iter_stream(value: Any) -> Iterator[str]:
+    encode = _status_encoder.encode
+    if isinstance(value, StreamList):
+        yield '['
+        first = True
+        for item in value.iterable:
+            if not first:
+                yield ','
+            first = False
+            yield encode(item)
+        yield ']'
+    elif isinstance(value, StreamDict):
+        yield '{'
+        first = True
+        for key, item in value.iterable:
+            if not first:
+                yield ','
+            first = False
+            yield encode(key)
+            yield ': '
+            yield encode(item)
+        yield '}'
+    else:
+        yield encode(value)
+
+def iter_status_save(status_save: Dict[str, Any]) -> Iterator[str]:
+    ''' 产生StatusSave的json字符串的各个部分
+        与json.dumps(status_save, ensure_ascii=False, separators=(',', ': '))的结果相同
+        值为StreamList或StreamDict的字段会被逐个元素编码
+    '''
+    yield '{'
+    first = True
+    for key, value in status_save.items():
+        if not first:
+            yield ','
+        first = False
+        yield _status_encoder.encode(key)
+        yield ': '
+        yield from _iter_stream(value)
+    yield '}'
+
+def _buffered(chunks: Iterator[str]) -> Iterator[str]:
+    ''' 将小块合并为约WRITE_BUFFER_SIZE大小的块 '''
+    buf = []
+    size = 0
+    for chunk in chunks:
+        buf.append(chunk)
+        size += len(chunk)
+        if size >= WRITE_BUFFER_SIZE:
+            yield ''.join(buf)
+            buf.clear()
+            size = 0
+    if buf:
+        yield ''.join(buf)
+
+def write_sav(f, plsav: Dict[str, Any], status_save_chunks: Iterator[str]) -> None:
+    ''' 将存档写入文件对象f, plsav["Experiment"]["StatusSave"]的内容由status_save_chunks提供 '''
+    from json.encoder import encode_basestring
+
+    # 用一个不会出现在存档中的字符串占据StatusSave的位置
+    placeholder = "\0physicsLab StatusSave\0"
+    encoded_placeholder = encode_basestring(placeholder)
+    outer = dict(plsav)
+    outer["Experiment"] = dict(plsav["Experiment"])
+    outer["Experiment"]["StatusSave"] = placeholder
+
+    for chunk in _sav_encoder.iterencode(outer):
+        if encoded_placeholder not in chunk:
+            f.write(chunk)
+            continue
+
+        head, tail = chunk.split(encoded_placeholder, 1)
+        f.write(head)
+        f.write('"')
+        # json字符串的转义与上下文无关, 因此可以逐块转义
+        for part in _buffered(status_save_chunks):
+            f.write(encode_basestring(part)[1:-1])
+        f.write('"')
+        f.write(tail)
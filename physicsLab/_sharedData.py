@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# 元件data中的子字典(Properties, Statistics, DiagramPosition)在同一ModelID的元件之间共享
+# 元件只有在修改子字典时才会复制一份自己的子字典 (copy-on-write)
+import copy
+
+from collections.abc import ItemsView, ValuesView
+
+from physicsLab.typehint import Any, Dict, List, Optional, Tuple
+
+# 同一ModelID的同一字段最多保存的模板数, 避免属性各不相同的元件(如Simple_Instrument)使缓存无限增长
+_MAX_VARIANTS = 16
+_IMMUTABLE_TYPES = frozenset((int, float, str, bool, type(None)))
+
+class _SharedDict(dict):
+    ''' 多个元件共享的只读子字典 '''
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("shared template can not be modified")
+
+    __setitem__ = __delitem__ = _readonly # type: ignore
+    update = setdefault = pop = popitem = clear = __ior__ = _readonly # type: ignore
+
+    def __copy__(self) -> "_SharedDict":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "_SharedDict":
+        return self
+
+    def __reduce__(self):
+        return _SharedDict, (dict(self),)
+
+class _CopyOnWriteDict(dict):
+    ''' 共享的子字典在元件中的副本, 是普通的dict
+        每个元件的每个字段只有一个副本(缓存于ElementData), 因此之前取得的引用都能看到之后的修改
+        第一次修改时成为元件data中该字段的值(此后元件不再共享该字段)
+        注意: 副本在创建时复制共享的子字典, 因为json等会直接读取dict的存储
+    '''
+    __slots__ = ("_owner", "_key", "_shared")
+
+    def __init__(self, owner: "ElementData", key: str, shared: _SharedDict) -> None:
+        dict.__init__(self, shared)
+        self._owner: Any = owner
+        self._key = key
+        self._shared: Optional[_SharedDict] = shared
+
+    def _promote(self) -> None:
+        ''' 修改自身后调用, 使自身成为元件data中该字段的值 '''
+        owner = self._owner
+        if owner is None:
+            return
+        if dict.get(owner, self._key) is self._shared:
+            dict.__setitem__(owner, self._key, self)
+        owner._drop_proxy(self._key, self)
+        self._owner = self._shared = None
+
+    def __setitem__(self, key, val) -> None:
+        dict.__setitem__(self, key, val)
+        self._promote()
+
+    def __delitem__(self, key) -> None:
+        dict.__delitem__(self, key)
+        self._promote()
+
+    def pop(self, key, *default) -> Any:
+        res = dict.pop(self, key, *default)
+        self._promote()
+        return res
+
+    def popitem(self) -> tuple:
+        res = dict.popitem(self)
+        self._promote()
+        return res
+
+    def setdefault(self, key, default=None) -> Any:
+        if key in self:
+            return dict.__getitem__(self, key)
+        self[key] = default
+        return default
+
+    def update(self, *args, **kwargs) -> None:
+        dict.update(self, *args, **kwargs)
+        self._promote()
+
+    def __ior__(self, other) -> "_CopyOnWriteDict":
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        dict.clear(self)
+        self._promote()
+
+    def copy(self) -> dict:
+        return dict(self)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo: dict) -> dict:
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+class ElementData(dict):
+    ''' 元件的data, 读取共享的子字典时返回该元件的copy-on-write副本(_CopyOnWriteDict)
+        同一字段每次读取得到的都是同一个副本, 之后的读取不会再复制
+        json.dumps等直接读取dict的内容, 因此导出的存档不受影响
+    '''
+    __slots__ = ("_proxies",) # key: 字段名, value: 该字段的副本
+
+    def __getitem__(self, key: str) -> Any:
+        val = dict.__getitem__(self, key)
+        if type(val) is _SharedDict:
+            return self._proxy(key, val)
+        return val
+
+    def _proxy(self, key: str, shared: _SharedDict) -> _CopyOnWriteDict:
+        try:
+            proxies = self._proxies
+        except AttributeError:
+            proxies = self._proxies = {}
+        proxy = proxies.get(key)
+        if proxy is None or proxy._shared is not shared:
+            proxy = proxies[key] = _CopyOnWriteDict(self, key, shared)
+        return proxy
+
+    def _drop_proxy(self, key: str, proxy: _CopyOnWriteDict) -> None:
+        proxies = getattr(self, "_proxies", None)
+        if proxies is not None and proxies.get(key) is proxy:
+            del proxies[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
+
+    def pop(self, key: str, *default) -> Any:
+        val = dict.pop(self, key, *default)
+        return dict(val) if type(val) is _SharedDict else val
+
+    def popitem(self) -> tuple:
+        key, val = dict.popitem(self)
+        return key, dict(val) if type(val) is _SharedDict else val
+
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return ValuesView(self)
+
+    def copy(self) -> "ElementData":
+        # 副本同样共享模板, 修改副本不会影响原来的data
+        return ElementData(self)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo: dict) -> "ElementData":
+        result = ElementData()
+        memo[id(self)] = result
+        for key, val in dict.items(self):
+            dict.__setitem__(result, key, val if type(val) is _SharedDict else copy.deepcopy(val, memo))
+        return result
+
+    def __reduce__(self):
+        return ElementData, (dict(self),)
+
+# key: (ModelID, 字段名), value: [(共享的子字典, 子字典中值的类型)]
+_templates: Dict[Tuple[Any, str], List[Tuple[_SharedDict, list]]] = {}
+
+def share_template(data: dict) -> ElementData:
+    ''' 将元件data中与模板相同的子字典替换为共享的模板 '''
+    result = ElementData(data)
+    model_id = data.get("ModelID")
+    for key, val in dict.items(data):
+        if type(val) is not dict:
+            continue
+        # setdefault是原子的, 多个线程同时创建元件时不会丢失模板
+        variants = _templates.setdefault((model_id, key), [])
+
+        # 值的类型也需要相同, 区分1, 1.0与True, 以保证导出的存档不变; 先比较值, 相等时才比较类型
+        types = None
+        for shared, shared_types in variants:
+            if val == shared:
+                if types is None:
+                    types = list(map(type, val.values()))
+                if types == shared_types:
+                    break
+        else:
+            if types is None:
+                types = list(map(type, val.values()))
+            # 共享的子字典中不能有可变的值
+            if len(variants) >= _MAX_VARIANTS or not _IMMUTABLE_TYPES.issuperset(types):
+                continue
+            shared = _SharedDict(val)
+            variants.append((shared, types))
+        dict.__setitem__(result, key, shared)
+    return result
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+# 实验的二进制快照 (见Experiment.dump_snapshot, Experiment.load_snapshot)
+# 文件结构:
+#   MAGIC | 头部长度(uint32) | 头部(json) | 各段数据(按8字节对齐)
+# 头部保存PlSav(不含StatusSave), StatusSave中元件以外的内容, ModelID表与每个ModelID的模板
+# 每个元件只保存: ModelID的index, 坐标与角度(float64), Identifier, 以及与模板不同时的完整字段
+# 导线的两端保存为元件的index
+# 读取时用mmap映射文件, 各段直接转换为memoryview, 不经过元件的元类, 开销与元件数成线性关系
+import os
+import sys
+import copy
+import json
+import mmap
+
+from array import array
+
+from physicsLab import _tools
+from physicsLab import errors
+from physicsLab.enums import ExperimentType
+from physicsLab.savTemplate import Generate
+from physicsLab.typehint import Any, Dict, List, Tuple
+
+MAGIC = b"PLSNAP\0\0"
+VERSION = 1
+_HEADER_LEN = array('I', [0]).itemsize
+
+# 保存在数组中的字段在模板中为None
+_VECTOR_KEYS = ("Position", "Rotation")
+_HAS_POSITION = 1 << 6
+_HAS_ROTATION = 1 << 7
+_HAS_IDENTIFIER = 1 << 8
+
+# 各段的名字与数组的类型, 按此顺序写入文件
+_SECTIONS = (
+    ("model", 'H'), # 元件的ModelID在头部Models中的index
+    ("vectors", 'd'), # 每个元件6个数: 坐标x, z, y, 角度x, z, y (与存档中的顺序相同)
+    ("flags", 'H'), # 坐标与角度中哪些数是int, 以及元件的Position, Rotation, Identifier是否保存在数组中
+    ("identifier_offsets", 'I'),
+    ("identifiers", 'B'), # 所有Identifier依次拼接(utf-8)
+    ("extra_offsets", 'I'),
+    ("extra", 'B'), # 与模板不同的元件的完整字段(json), 与模板相同时长度为0
+    ("wire_source", 'I'),
+    ("wire_target", 'I'),
+    ("wire_source_pin", 'H'),
+    ("wire_target_pin", 'H'),
+    ("wire_color", 'B'), # 导线颜色在头部Colors中的index
+)
+
+def _split_vector(vector: Any) -> Any:
+    ''' 解析存档中的坐标字符串, 返回(x, z, y, int_flags)
+        无法无损还原为原字符串时返回None
+    '''
+    if not isinstance(vector, str):
+        return None
+    try:
+        vals = _tools.parse_vector(vector)
+    except (TypeError, ValueError):
+        return None
+    if len(vals) != 3 or "{},{},{}".format(*vals) != vector:
+        return None
+    flags = 0
+    for i, val in enumerate(vals):
+        if type(val) is int:
+            flags |= 1 << i
+    return vals[0], vals[1], vals[2], flags
+
+def _restore_vector(vectors: Any, start: int, flags: int) -> tuple:
+    ''' 从数组中还原存档中的(x, z, y) '''
+    x, z, y = vectors[start:start + 3]
+    if flags & 1:
+        x = int(x)
+    if flags & 2:
+        z = int(z)
+    if flags & 4:
+        y = int(y)
+    return x, z, y
+
+def _json_default(obj: Any) -> Any:
+    # 未生成的存档内容(如创建实验后的CreationDate)在write时才会生成
+    if obj is Generate:
+        return None
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _element_datas(experiment) -> List[dict]:
+    if experiment.experiment_type == ExperimentType.Circuit:
+        from physicsLab.circuit.elementTable import to_save_dict
+        return [to_save_dict(a_element.data) for a_element in experiment.Elements]
+    return [a_element.data for a_element in experiment.Elements]
+
+def dump(experiment, path: str) -> None:
+    ''' 将实验保存为快照 '''
+    models: List[str] = []
+    model_index: Dict[str, int] = {}
+    templates: List[str] = []
+    colors: List[str] = []
+    color_index: Dict[str, int] = {}
+    model_key = "Model" if experiment.experiment_type == ExperimentType.Celestial else "ModelID"
+
+    sections: Dict[str, array] = {name: array(typecode) for name, typecode in _SECTIONS}
+    model_col, vectors, flags_col = sections["model"], sections["vectors"], sections["flags"]
+    identifier_offsets, identifiers = sections["identifier_offsets"], bytearray()
+    extra_offsets, extra = sections["extra_offsets"], bytearray()
+    identifier_offsets.append(0)
+    extra_offsets.append(0)
+
+    elements_index: Dict[object, int] = {}
+    for i, data in enumerate(_element_datas(experiment)):
+        elements_index[experiment.Elements[i]] = i
+        # 坐标, 角度与Identifier保存在数组中, 其余字段与模板比较
+        skeleton = dict(data)
+        flags = 0
+        row: List[float] = [0.0] * 6
+        for offset, key in enumerate(_VECTOR_KEYS):
+            vector = _split_vector(data.get(key))
+            if vector is not None:
+                row[offset * 3:offset * 3 + 3] = vector[:3]
+                flags |= vector[3] << (offset * 3) | (_HAS_POSITION, _HAS_ROTATION)[offset]
+                skeleton[key] = None
+        identifier = data.get("Identifier")
+        if isinstance(identifier, str):
+            skeleton["Identifier"] = None
+            flags |= _HAS_IDENTIFIER
+        else:
+            identifier = ""
+
+        skeleton_str = json.dumps(skeleton, ensure_ascii=False)
+        model_id = skeleton.get(model_key)
+        if not isinstance(model_id, str):
+            model_id = ""
+        index = model_index.get(model_id)
+        if index is None:
+            index = model_index[model_id] = len(models)
+            models.append(model_id)
+            templates.append(skeleton_str)
+        if skeleton_str != templates[index]:
+            extra += skeleton_str.encode("utf-8")
+
+        model_col.append(index)
+        vectors.extend(row)
+        flags_col.append(flags)
+        identifiers += identifier.encode("utf-8")
+        identifier_offsets.append(len(identifiers))
+        extra_offsets.append(len(extra))
+    sections["identifiers"] = array('B', identifiers)
+    sections["extra"] = array('B', extra)
+
+    wires_count = 0
+    if experiment.experiment_type == ExperimentType.Circuit:
+        for a_wire in experiment.Wires:
+            index = color_index.get(a_wire.color)
+            if index is None:
+                index = color_index[a_wire.color] = len(colors)
+                colors.append(a_wire.color)
+            sections["wire_source"].append(elements_index[a_wire.Source.element_self])
+            sections["wire_target"].append(elements_index[a_wire.Target.element_self])
+            sections["wire_source_pin"].append(a_wire.Source.pinLabel)
+            sections["wire_target_pin"].append(a_wire.Target.pinLabel)
+            sections["wire_color"].append(index)
+            wires_count += 1
+
+    plsav = dict(experiment.PlSav)
+    plsav["Experiment"] = dict(plsav["Experiment"])
+    plsav["Experiment"]["StatusSave"] = None
+    experiment_camera = dict(experiment.CameraSave)
+    experiment_camera["VisionCenter"] = \
+        f"{experiment.VisionCenter.x},{experiment.VisionCenter.z},{experiment.VisionCenter.y}"
+    experiment_camera["TargetRotation"] = \
+        f"{experiment.TargetRotation.x},{experiment.TargetRotation.z},{experiment.TargetRotation.y}"
+
+    header: Dict[str, Any] = {
+        "Version": VERSION,
+        "ByteOrder": sys.byteorder,
+        "ItemSize": {typecode: array(typecode).itemsize for _, typecode in _SECTIONS},
+        "PlSav": plsav,
+        "CameraSave": experiment_camera,
+        "StatusSave": {key: val for key, val in experiment.StatusSave.items() if key not in ("Elements", "Wires")},
+        "Models": models,
+        "Templates": templates,
+        "Colors": colors,
+        "ElementCount": len(experiment.Elements),
+        "WireCount": wires_count,
+        "Sections": {},
+    }
+
+    # 头部中记录各段的位置, 因此先计算头部之后各段的相对位置
+    relative: Dict[str, Tuple[int, int]] = {}
+    pos = 0
+    for name, _ in _SECTIONS:
+        pos = (pos + 7) // 8 * 8
+        size = len(sections[name]) * sections[name].itemsize
+        relative[name] = (pos, size)
+        pos += size
+
+    # 头部的长度会随着各段的位置而变化, 因此重复计算直到头部能放在各段之前
+    data_start = 0
+    while True:
+        header["Sections"] = {name: [data_start + start, size] for name, (start, size) in relative.items()}
+        header_bytes = json.dumps(header, ensure_ascii=False, default=_json_default).encode("utf-8")
+        end = len(MAGIC) + _HEADER_LEN + len(header_bytes)
+        if end <= data_start:
+            break
+        data_start = (end + 7) // 8 * 8
+    header_bytes += b" " * (data_start - end)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(array('I', [len(header_bytes)]).tobytes())
+        f.write(header_bytes)
+        for name, _ in _SECTIONS:
+            start, _ = header["Sections"][name]
+            f.write(b"\0" * (start - f.tell()))
+            sections[name].tofile(f)
+
+def _read_header(buffer: Any) -> dict:
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise errors.ExperimentError("not a physicsLab snapshot")
+    header_len = memoryview(buffer)[len(MAGIC):len(MAGIC) + _HEADER_LEN].cast('I')[0]
+    start = len(MAGIC) + _HEADER_LEN
+    header = json.loads(bytes(buffer[start:start + header_len]).decode("utf-8"))
+    if header["Version"] != VERSION:
+        raise errors.ExperimentError(f"unsupported snapshot version {header['Version']}")
+    return header
+
+def _section(buffer: Any, header: dict, name: str, typecode: str) -> Any:
+    start, size = header["Sections"][name]
+    if header["ByteOrder"] == sys.byteorder and header["ItemSize"][typecode] == array(typecode).itemsize:
+        return memoryview(buffer)[start:start + size].cast(typecode)
+    # 在字节序或数组大小不同的平台上生成的快照, 需要复制并转换
+    itemsize = header["ItemSize"][typecode]
+    raw = bytes(buffer[start:start + size])
+    if typecode == 'd':
+        result = array('d', raw)
+        if header["ByteOrder"] != sys.byteorder:
+            result.byteswap()
+        return result
+    return array(typecode, (int.from_bytes(raw[i:i + itemsize], header["ByteOrder"])
+                            for i in range(0, size, itemsize)))
+
+def load(experiment, path: str) -> None:
+    ''' 将快照中的元件与导线添加到experiment中 '''
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < len(MAGIC) + _HEADER_LEN:
+            raise errors.ExperimentError("not a physicsLab snapshot")
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    columns: Dict[str, Any] = {}
+    try:
+        header = _read_header(buffer)
+        if header["PlSav"]["Experiment"]["Type"] != experiment.experiment_type.value:
+            raise errors.ExperimentTypeError
+        for name, typecode in _SECTIONS:
+            columns[name] = _section(buffer, header, name, typecode)
+        _load_elements(experiment, header, columns)
+        _load_wires(experiment, header, columns)
+    finally:
+        for view in columns.values():
+            if isinstance(view, memoryview):
+                view.release()
+        buffer.close()
+
+    # 只添加元件, 导线与StatusSave中的其他字段, 实验的名称, 简介与视角等保持不变
+    experiment.StatusSave.update(header["StatusSave"])
+
+def _load_elements(experiment, header: dict, columns: dict) -> None:
+    from physicsLab._sharedData import ElementData, share_template
+    from physicsLab.element import _element_class
+
+    experiment_type: ExperimentType = experiment.experiment_type
+    is_circuit = experiment_type == ExperimentType.Circuit
+    model_key = "Model" if experiment_type == ExperimentType.Celestial else "ModelID"
+
+    # 每个ModelID的模板只解析一次; 电学元件的子字典在元件之间共享(copy-on-write)
+    classes: List[Any] = []
+    templates: List[Any] = []
+    mutable_keys: List[List[str]] = [] # 模板中未被共享的子字典与列表, 每个元件需要复制一份
+    for template_str in header["Templates"]:
+        template = json.loads(template_str)
+        classes.append(_element_class(experiment_type, template[model_key]))
+        if is_circuit:
+            template = share_template(template)
+            templates.append(template)
+            mutable_keys.append([key for key, val in template.items() if type(val) in (dict, list)])
+        else:
+            templates.append(template_str)
+
+    model_col, vectors, flags_col = columns["model"], columns["vectors"], columns["flags"]
+    identifier_offsets, identifiers = columns["identifier_offsets"], bytes(columns["identifiers"])
+    extra_offsets, extra = columns["extra_offsets"], columns["extra"]
+
+    position = _tools.position
+    elements_Position = experiment.elements_Position
+    elements_Identifier = experiment.elements_Identifier
+    spatial_Index = experiment.spatial_Index
+    Elements = experiment.Elements
+    element_Table = experiment.element_Table if is_circuit else None
+
+    for i in range(header["ElementCount"]):
+        model = model_col[i]
+        cls = classes[model]
+        if extra_offsets[i] != extra_offsets[i + 1]:
+            data = json.loads(bytes(extra[extra_offsets[i]:extra_offsets[i + 1]]).decode("utf-8"))
+            if is_circuit:
+                data = share_template(data)
+        elif is_circuit:
+            data = ElementData(templates[model])
+            for key in mutable_keys[model]:
+                dict.__setitem__(data, key, copy.deepcopy(dict.__getitem__(data, key)))
+        else:
+            data = json.loads(templates[model])
+
+        flags = flags_col[i]
+        if flags & _HAS_POSITION:
+            x, z, y = _restore_vector(vectors, i * 6, flags)
+            dict.__setitem__(data, "Position", f"{x},{z},{y}")
+        else:
+            x, z, y = _tools.parse_vector(data["Position"])
+        if flags & _HAS_ROTATION:
+            dict.__setitem__(data, "Rotation", "{},{},{}".format(*_restore_vector(vectors, i * 6 + 3, flags >> 3)))
+        if flags & _HAS_IDENTIFIER:
+            dict.__setitem__(data, "Identifier",
+                             identifiers[identifier_offsets[i]:identifier_offsets[i + 1]].decode("utf-8"))
+
+        obj = cls.__new__(cls)
+        obj.experiment = experiment
+        obj.data = data
+        x, y, z = round(x, 4), round(y, 4), round(z, 4) # 与roundData相同
+        obj._position = position(x, y, z)
+        if is_circuit:
+            obj.is_elementXYZ = False
+            if cls.__name__ == "Simple_Instrument":
+                obj.notes = []
+                for attr, val in data["Properties"].items():
+                    if attr.startswith("音高") and int(val) not in obj.notes:
+                        obj.notes.append(int(val))
+        elif experiment_type == ExperimentType.Celestial:
+            acceleration = data.get("Acceleration")
+            a_x, a_z, a_y = _tools.parse_vector(acceleration) if isinstance(acceleration, str) else (0, 0, 0)
+            obj.acceleration = position(a_x, a_y, a_z)
+
+        bucket = elements_Position.get(obj._position)
+        if bucket is None:
+            elements_Position[obj._position] = [obj]
+        else:
+            bucket.append(obj)
+        obj._position_key = obj._position
+        spatial_Index.update(obj, x, y, z)
+        elements_Identifier[data["Identifier"]] = obj
+        Elements.append(obj)
+        if element_Table is not None:
+            obj.data = element_Table.append(obj.data)
+
+def _load_wires(experiment, header: dict, columns: dict) -> None:
+    if header["WireCount"] == 0:
+        return
+
+    from physicsLab.circuit.wire import Wire, Pin, _add_wire
+    Elements = experiment.Elements
+    base = len(Elements) - header["ElementCount"]
+    colors = header["Colors"]
+    source, target = columns["wire_source"], columns["wire_target"]
+    source_pin, target_pin = columns["wire_source_pin"], columns["wire_target_pin"]
+    color = columns["wire_color"]
+    for i in range(header["WireCount"]):
+        _add_wire(experiment, Wire(
+            Pin(Elements[base + source[i]], source_pin[i]),
+            Pin(Elements[base + target[i]], target_pin[i]),
+            colors[color[i]],
+        ))
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
-from random import choice
+import os
+import json
+
 from string import ascii_lowercase, ascii_letters, digits
 
 from collections import namedtuple
-from .typehint import Tuple, Union, numType
+from .typehint import List, Tuple, Union, numType
 
 position = namedtuple("position", ["x", "y", "z"])
 
@@ -17,13 +19,52 @@ def roundData(*num) -> Union[numType, Tuple[numType]]:
         return round(num[0], 4)
     return tuple(round(i, 4) for i in num)
 
+# 随机字符串的字母表, 以及将随机字节映射到字母表的bytes.translate参数
+# 字节数不能被字母表长度整除, 因此丢弃较大的字节以使每个字母的概率相同
+def _alphabet(letters: str) -> Tuple[bytes, bytes]:
+    usable = 256 - 256 % len(letters)
+    return bytes(ord(letters[i % len(letters)]) for i in range(256)), bytes(range(usable, 256))
+
+_ALPHABET = _alphabet(ascii_letters + digits)
+_LOWER_ALPHABET = _alphabet(ascii_lowercase + digits)
+
 # 生成随机字符串
 def randString(strLength: int, lower: bool = False) -> str:
     if not isinstance(strLength, int):
         raise TypeError
 
-    if lower:
-        letters = ascii_lowercase
-    else:
-        letters = ascii_letters
-    return ''.join(choice(letters + digits) for _ in range(strLength))
+    return randStrings(1, strLength, lower)[0]
+
+# 一次生成count个随机字符串, 用os.urandom生成随机字节后用bytes.translate映射到字母表
+def randStrings(count: int, strLength: int, lower: bool = False) -> List[str]:
+    if not isinstance(count, int) or not isinstance(strLength, int):
+        raise TypeError
+
+    table, reject = _LOWER_ALPHABET if lower else _ALPHABET
+    total = count * strLength
+    chars = b""
+    while len(chars) < total:
+        need = total - len(chars)
+        chars += os.urandom(need + need // 16 + 16).translate(table, reject)
+    text = chars[:total].decode("ascii")
+    return [text[i:i + strLength] for i in range(0, total, strLength)]
+
+def _parse_number(num: str) -> numType:
+    try:
+        return int(num)
+    except ValueError:
+        return float(num)
+
+# 解析存档中形如"x,y,z"的向量字符串, 代替eval
+# 存档可能来自网络, 因此不能执行其中的内容
+def parse_vector(vector: str) -> Tuple[numType, ...]:
+    if not isinstance(vector, str):
+        raise TypeError
+
+    try:
+        result = json.loads(f"[{vector}]")
+    except ValueError: # 不符合json格式的数字, 如".5"
+        result = None
+    if result is None or not all(type(num) in (int, float) for num in result):
+        result = [_parse_number(num) for num in vector.split(",")]
+    return tuple(result)
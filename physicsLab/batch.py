@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+''' 批量处理存档 '''
+import os
+import itertools
+import collections
+
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+
+from physicsLab.typehint import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+def _process_save(fn: Callable[..., Any], path: str, read: bool, lazy: bool) -> Any:
+    ''' 打开并处理一个存档, 期间使用独立的实验栈, 不受调用者已打开的实验影响 '''
+    from physicsLab.experiment import Experiment, stack_Experiment
+
+    # 通过fork创建的子进程会继承父进程的实验栈
+    saved = stack_Experiment.data[:]
+    stack_Experiment.data.clear()
+    exp = None
+    try:
+        exp = Experiment().open(path, Experiment.PathLoadMode.path)
+        if read:
+            exp.read(lazy=lazy)
+        return fn(exp)
+    finally:
+        if exp is not None:
+            if exp in stack_Experiment.data:
+                exp.exit()
+            else: # fn已经退出了实验(如调用了write)
+                exp._close_lazy_Elements()
+        stack_Experiment.data[:] = saved
+
+def map_saves(fn: Callable[..., Any],
+              paths: Iterable[str],
+              workers: Optional[int] = None,
+              read: bool = True,
+              lazy: bool = False,
+              ordered: bool = True,
+              ) -> Iterator[Tuple[str, Any]]:
+    ''' 用进程池并行地打开并处理多个存档, 依次产生(存档路径, fn的返回值)
+        @param fn: 处理存档的函数, 参数为打开的Experiment; fn与其返回值需要能被pickle(如模块顶层的函数)
+        @param paths: 存档的路径
+        @param workers: 进程数, 默认为CPU数; 为0时在当前进程中依次处理
+        @param read: 是否在调用fn之前读取存档的元件与导线
+        @param lazy: 读取存档时是否按需构造元件, 见Experiment.read
+        @param ordered: 是否按paths的顺序产生结果, 为False时按完成的顺序产生
+
+        只有少量存档会同时处于待处理状态, 因此paths可以是很长的迭代器
+        fn抛出的异常会在产生对应结果时抛出
+    '''
+    if not callable(fn) \
+            or workers is not None and not isinstance(workers, int) \
+            or not isinstance(read, bool) \
+            or not isinstance(lazy, bool) \
+            or not isinstance(ordered, bool):
+        raise TypeError
+    if workers is not None and workers < 0:
+        raise ValueError("workers must not be negative")
+
+    if workers == 0:
+        for path in paths:
+            yield path, _process_save(fn, path, read, lazy)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    window = workers * 4 # 同时提交给进程池的存档数
+    path_iter = iter(paths)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(path: str) -> Future:
+            return executor.submit(_process_save, fn, path, read, lazy)
+
+        if ordered:
+            queue: Deque[Tuple[str, Future]] = collections.deque(
+                (path, submit(path)) for path in itertools.islice(path_iter, window)
+            )
+            try:
+                while queue:
+                    path, future = queue.popleft()
+                    result = future.result()
+                    for next_path in itertools.islice(path_iter, 1):
+                        queue.append((next_path, submit(next_path)))
+                    yield path, result
+            finally:
+                for _, future in queue:
+                    future.cancel()
+        else:
+            running: Dict[Future, str] = {submit(path): path for path in itertools.islice(path_iter, window)}
+            try:
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = running.pop(future)
+                        result = future.result()
+                        for next_path in itertools.islice(path_iter, 1):
+                            running[submit(next_path)] = next_path
+                        yield path, result
+            finally:
+                for future in running:
+                    future.cancel()
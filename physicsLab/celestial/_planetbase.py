@@ -24,7 +24,8 @@ class _PlanetMeta(type):
         self.__init__(x, y, z, *args, **kwargs)
         assert hasattr(self, "data") and isinstance(self.data, dict)
 
-        self.data["Identifier"] = _tools.randString(32)
+        self.data["Identifier"] = _Expe.identifier_Allocator.allocate()
+        _Expe.elements_Identifier[self.data["Identifier"]] = self
         self.set_position(x, y, z)
         self.set_velocity(0, 0, 0)
         self.set_acceleration(0, 0, 0)
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+# 模拟电路的离线仿真 (需要numpy与scipy)
+# 使用改进节点分析法(MNA)建立稀疏线性方程组, 未知数为各节点的电势与各支路(电池, 电容, 电感, 开关)的电流:
+#   支路的方程为 s * (Va - Vb) - Z * i = E, 其中i为从red流入, 从black流出元件的电流
+# 电容与电感在瞬态分析中以后向欧拉法离散, 二极管以牛顿迭代求解
+# 没有二极管时每次瞬态分析只需要分解一次矩阵, 之后每一步只需要回代
+from physicsLab import errors
+from physicsLab.circuit.wire import Pin, PIN_LABEL_BITS
+from physicsLab.experiment import get_Experiment
+from physicsLab.enums import ExperimentType
+from physicsLab.typehint import Callable, Dict, List, Optional, Self
+
+_GMIN = 1e-12 # 每个节点到地, 以及二极管两端的电导, 避免悬空的节点使矩阵奇异
+_VT = 0.025852 # 二极管的热电压(300K)
+_MAX_EXP = 40.0 # 二极管电流的指数部分超过该值后线性外推, 避免溢出
+
+_RESISTOR = "Resistor"
+_BATTERY = "Battery Source"
+_CAPACITOR = "Basic Capacitor"
+_INDUCTOR = "Basic Inductor"
+_DIODE = "Basic Diode"
+_SWITCH = "Simple Switch"
+_GROUND = "Ground Component"
+_SUPPORTED = (_RESISTOR, _BATTERY, _CAPACITOR, _INDUCTOR, _DIODE, _SWITCH, _GROUND)
+
+class AnalogSimulator:
+    ''' 实验中模拟电路的直流工作点分析与定步长瞬态分析, 结果写入元件的Statistics
+        支持电阻, 电池, 电容, 电感, 二极管, 简单开关与接地元件, 其他元件视为断路
+        电势以接地元件为零点; 电路中没有接地元件时只有电势差有意义
+        仿真开始时根据实验的网表(见Experiment.use_Netlist)建立, 之后对电路的修改不会影响仿真
+    '''
+    def __init__(self, experiment=None, max_iterations: int = 100) -> None:
+        ''' @param experiment: 仿真的实验, 默认为当前实验
+            @param max_iterations: 每次求解时牛顿迭代的最大次数
+        '''
+        import numpy as np
+        from scipy import sparse
+        from scipy.sparse import linalg
+
+        if experiment is None:
+            experiment = get_Experiment()
+        if not isinstance(max_iterations, int):
+            raise TypeError
+        if experiment.experiment_type != ExperimentType.Circuit:
+            raise errors.ExperimentTypeError
+
+        self._np, self._sparse, self._linalg = np, sparse, linalg
+        self._experiment = experiment
+        self.max_iterations: int = max_iterations
+        self.iterations: int = 0 # 牛顿迭代的总次数
+        self.time: float = 0.0 # 瞬态分析的时间
+
+        experiment.use_Netlist()
+        self._pin_net: Dict[int, int] = {} # key: 端点, value: 网络的下标
+        nets = experiment.netlist.nets()
+        unsupported = set()
+        for i, members in enumerate(nets):
+            model_ids = {pin.element_self.data["ModelID"] for pin in members}
+            if any(model_id in _SUPPORTED for model_id in model_ids):
+                unsupported.update(model_id for model_id in model_ids if model_id not in _SUPPORTED)
+            for pin in members:
+                self._pin_net[pin.element_self._slot << PIN_LABEL_BITS | pin.pinLabel] = i
+        if unsupported:
+            errors.warning(f"unsupported elements are treated as open circuits: {', '.join(sorted(unsupported))}")
+
+        # 接地元件所在的网络为地(节点-1), 其他网络依次编号; 没有连接导线的引脚各自为一个节点
+        self._node_of_net: List[Optional[int]] = [None] * len(nets)
+        for element in experiment.Elements:
+            if element.data["ModelID"] == _GROUND:
+                net = self._find_net(element, 0)
+                if net is not None:
+                    self._node_of_net[net] = -1
+        self._node_count: int = 0
+
+        self._elements: Dict[str, list] = {model_id: [] for model_id in _SUPPORTED}
+        for element in experiment.Elements:
+            elements = self._elements.get(element.data["ModelID"])
+            if elements is not None:
+                elements.append(element)
+        # 断开的开关视为断路
+        self._elements[_SWITCH] = [e for e in self._elements[_SWITCH] if e.data["Properties"]["开关"] == 1]
+
+        def nodes(model_id: str):
+            elements = self._elements[model_id]
+            return (np.array([self._node(e, 0) for e in elements], dtype=np.int64),
+                    np.array([self._node(e, 1) for e in elements], dtype=np.int64))
+
+        def properties(model_id: str, name: str):
+            return np.array([float(e.data["Properties"][name]) for e in self._elements[model_id]])
+
+        self._resistor = nodes(_RESISTOR)
+        self._conductance = 1 / properties(_RESISTOR, "电阻")
+        self._diode = nodes(_DIODE)
+        # 二极管在额定电流下的电压为前向压降, 击穿电压不为0时反向电压超过击穿电压后反向导通
+        self._rated_current = properties(_DIODE, "额定电流")
+        self._saturation = self._rated_current / np.expm1(properties(_DIODE, "前向压降") / _VT)
+        self._breakdown = properties(_DIODE, "击穿电压")
+        self._diode_voltage = np.zeros(len(self._elements[_DIODE]))
+
+        # 支路依次为电池, 电容, 电感, 开关
+        branch_nodes = [nodes(model_id) for model_id in (_BATTERY, _CAPACITOR, _INDUCTOR, _SWITCH)]
+        self._branch_a = np.concatenate([a for a, _ in branch_nodes])
+        self._branch_b = np.concatenate([b for _, b in branch_nodes])
+        counts = [len(self._elements[model_id]) for model_id in (_BATTERY, _CAPACITOR, _INDUCTOR, _SWITCH)]
+        bounds = np.cumsum([0] + counts)
+        self._battery = slice(bounds[0], bounds[1])
+        self._capacitor = slice(bounds[1], bounds[2])
+        self._inductor = slice(bounds[2], bounds[3])
+        self._emf = properties(_BATTERY, "电压")
+        self._battery_resistance = properties(_BATTERY, "内阻")
+        self._capacitance = properties(_CAPACITOR, "电容")
+        self._capacitor_resistance = properties(_CAPACITOR, "内阻")
+        self._inductance = properties(_INDUCTOR, "电感")
+        self._inductor_resistance = properties(_INDUCTOR, "内阻")
+        # 电容的电压与电感的电流, 仿真开始时均为0
+        self._capacitor_voltage = np.zeros(counts[1])
+        self._inductor_current = np.zeros(counts[2])
+
+        self._size: int = self._node_count + len(self._branch_a)
+        self._voltages = np.zeros(self._node_count + 1) # 最后一项为地
+        self._currents = np.zeros(len(self._branch_a))
+
+        # 二极管的导纳矩阵在每次迭代中变化, 其非零项的位置不变
+        a, b = self._diode
+        rows, cols = np.concatenate([a, a, b, b]), np.concatenate([a, b, a, b])
+        keep = (rows >= 0) & (cols >= 0) # 去掉地所在的行与列
+        self._diode_rows, self._diode_cols = rows[keep], cols[keep]
+        self._diode_sign = np.repeat([1.0, -1.0, -1.0, 1.0], len(a))[keep]
+        self._diode_index = np.tile(np.arange(len(a)), 4)[keep]
+
+    def _find_net(self, element, pinLabel: int) -> Optional[int]:
+        slot = element.__dict__.get("_slot")
+        slot_Elements = self._experiment.slot_Elements
+        if slot is None or slot >= len(slot_Elements) or slot_Elements[slot] is not element:
+            return None
+        return self._pin_net.get(slot << PIN_LABEL_BITS | pinLabel)
+
+    def _node(self, element, pinLabel: int) -> int:
+        ''' 引脚所在的节点, 地为-1 '''
+        net = self._find_net(element, pinLabel)
+        if net is not None and self._node_of_net[net] is not None:
+            return self._node_of_net[net] # type: ignore
+        node = self._node_count
+        self._node_count += 1
+        if net is not None:
+            self._node_of_net[net] = node
+        return node
+
+    def _linear_matrix(self, coefficient, impedance) -> tuple:
+        ''' 电阻与支路的矩阵(COO格式), coefficient与impedance为支路方程的s与Z '''
+        np = self._np
+        n = self._node_count
+        ga, gb = self._resistor
+        g = self._conductance
+        k = n + np.arange(len(self._branch_a))
+        a, b = self._branch_a, self._branch_b
+        nodes = np.arange(n)
+        rows = np.concatenate([ga, ga, gb, gb, a, b, k, k, k, nodes])
+        cols = np.concatenate([ga, gb, ga, gb, k, k, a, b, k, nodes])
+        values = np.concatenate([g, -g, -g, g, np.ones(len(a)), -np.ones(len(a)),
+                                 coefficient, -coefficient, -impedance, np.full(n, _GMIN)])
+        keep = (rows >= 0) & (cols >= 0)
+        return rows[keep], cols[keep], values[keep]
+
+    def _diode_current(self, voltage) -> tuple:
+        ''' 二极管的电流与微分电导 '''
+        np = self._np
+        res, conductance = np.zeros_like(voltage), np.zeros_like(voltage)
+        parts = [(self._saturation, voltage, 1.0)]
+        breakdown = self._breakdown > 0
+        if breakdown.any():
+            # 反向击穿: 电压为-击穿电压时反向电流为额定电流
+            parts.append((np.where(breakdown, self._rated_current, 0.0), -voltage - self._breakdown, -1.0))
+        for scale, x, sign in parts:
+            x = x / _VT
+            clipped = np.minimum(x, _MAX_EXP)
+            exp = np.exp(clipped)
+            # 指数超过_MAX_EXP后线性外推
+            res += sign * scale * (exp * (1 + x - clipped) - (1 if sign > 0 else 0))
+            conductance += scale * exp / _VT
+        return res + _GMIN * voltage, conductance + _GMIN
+
+    def _limit(self, new, old):
+        ''' 限制二极管电压在一次迭代中的变化(同SPICE的pnjlim), 避免指数溢出与振荡 '''
+        np = self._np
+        critical = _VT * np.log(_VT / (np.sqrt(2) * self._saturation))
+        arg = 1 + (new - old) / _VT
+        limited = np.where(old > 0,
+                           np.where(arg > 0, old + _VT * np.log(np.maximum(arg, 1e-300)), critical),
+                           _VT * np.log(np.maximum(new, _VT) / _VT))
+        return np.where((new > critical) & (np.abs(new - old) > 2 * _VT), limited, new)
+
+    def _factorize(self, rows, cols, values):
+        A = self._sparse.csc_matrix((values, (rows, cols)), shape=(self._size, self._size))
+        try:
+            return self._linalg.splu(A)
+        except RuntimeError:
+            raise errors.SimulationError("the circuit has no unique solution, "
+                                         "e.g. an ideal battery is short-circuited") from None
+
+    def _store(self, x) -> None:
+        n = self._node_count
+        self._voltages[:n] = x[:n]
+        self._currents = x[n:]
+
+    def _solve(self, matrix: tuple, rhs) -> None:
+        ''' 求解方程组, 有二极管时以牛顿迭代求解 '''
+        np = self._np
+        rows, cols, values = matrix
+        if len(self._diode_voltage) == 0:
+            self.iterations += 1
+            self._store(self._factorize(rows, cols, values).solve(rhs))
+            return
+
+        a, b = self._diode
+        rows = np.concatenate([rows, self._diode_rows])
+        cols = np.concatenate([cols, self._diode_cols])
+        voltage = self._diode_voltage
+        for _ in range(self.max_iterations):
+            self.iterations += 1
+            # 在voltage处线性化: i = current + conductance * (v - voltage)
+            current, conductance = self._diode_current(voltage)
+            equivalent = current - conductance * voltage
+            b_vec = rhs.copy()
+            np.subtract.at(b_vec, a[a >= 0], equivalent[a >= 0])
+            np.add.at(b_vec, b[b >= 0], equivalent[b >= 0])
+            lu = self._factorize(rows, cols,
+                                 np.concatenate([values, self._diode_sign * conductance[self._diode_index]]))
+            self._store(lu.solve(b_vec))
+
+            raw = self._voltages[a] - self._voltages[b]
+            converged = np.all(np.abs(raw - voltage) <= 1e-6 + 1e-4 * np.abs(voltage))
+            voltage = self._limit(raw, voltage)
+            if converged:
+                break
+        else:
+            raise errors.SimulationError(f"diodes do not converge in {self.max_iterations} iterations")
+        self._diode_voltage = voltage
+
+    def dc(self) -> Self:
+        ''' 直流工作点分析: 电容视为断路, 电感视为只有内阻的导线 '''
+        np = self._np
+        count = len(self._branch_a)
+        coefficient = np.ones(count)
+        impedance = np.zeros(count)
+        impedance[self._battery] = self._battery_resistance
+        coefficient[self._capacitor] = 0
+        impedance[self._capacitor] = -1 # 方程为i = 0
+        impedance[self._inductor] = self._inductor_resistance
+
+        rhs = np.zeros(self._size)
+        rhs[self._node_count + np.arange(count)[self._battery]] = self._emf
+        self._solve(self._linear_matrix(coefficient, impedance), rhs)
+
+        v = self._branch_voltage()
+        self._capacitor_voltage = v[self._capacitor].copy()
+        self._inductor_current = self._currents[self._inductor].copy()
+        self._write_statistics()
+        return self
+
+    def transient(self, duration: float, step: float,
+                  callback: Optional[Callable[[float], None]] = None) -> Self:
+        ''' 定步长瞬态分析, 从上一次分析结束时的状态(初始时电容没有电荷, 电感没有电流)开始
+            @param duration: 仿真的时长(s)
+            @param step: 步长(s)
+            @param callback: 每一步结束后以当前时间调用, 此时元件的Statistics已更新
+        '''
+        if not isinstance(duration, (int, float)) or not isinstance(step, (int, float)) or step <= 0:
+            raise TypeError
+        np = self._np
+        n, count = self._node_count, len(self._branch_a)
+        k = n + np.arange(count)
+
+        coefficient = np.ones(count)
+        impedance = np.zeros(count)
+        impedance[self._battery] = self._battery_resistance
+        # 电容: Va - Vb = R * i + Vc + step / C * i; 电感: Va - Vb = R * i + L / step * (i - i_prev)
+        impedance[self._capacitor] = self._capacitor_resistance + step / self._capacitance
+        impedance[self._inductor] = self._inductor_resistance + self._inductance / step
+        matrix = self._linear_matrix(coefficient, impedance)
+
+        # 没有二极管时矩阵在每一步中不变, 只需要分解一次
+        lu = self._factorize(*matrix) if len(self._diode_voltage) == 0 else None
+        for _ in range(int(round(duration / step))):
+            rhs = np.zeros(self._size)
+            rhs[k[self._battery]] = self._emf
+            rhs[k[self._capacitor]] = self._capacitor_voltage
+            rhs[k[self._inductor]] = -self._inductance / step * self._inductor_current
+            if lu is not None:
+                self._store(lu.solve(rhs))
+                self.iterations += 1
+            else:
+                self._solve(matrix, rhs)
+            self._capacitor_voltage = \
+                self._capacitor_voltage + step / self._capacitance * self._currents[self._capacitor]
+            self._inductor_current = self._currents[self._inductor].copy()
+            self.time += step
+            if callback is not None:
+                self._write_statistics()
+                callback(self.time)
+        self._write_statistics()
+        return self
+
+    def _branch_voltage(self):
+        return self._voltages[self._branch_a] - self._voltages[self._branch_b]
+
+    def voltage(self, pin: Pin) -> float:
+        ''' 最近一次分析结束时引脚的电势 '''
+        if not isinstance(pin, Pin):
+            raise TypeError
+        net = self._find_net(pin.element_self, pin.pinLabel)
+        if net is None or self._node_of_net[net] is None:
+            return 0.0
+        return float(self._voltages[self._node_of_net[net]])
+
+    def _write_statistics(self) -> None:
+        v = self._voltages
+        # 各元件的电压(red - black)与电流(从red流入)
+        a, b = self._resistor
+        results = {
+            _RESISTOR: (v[a] - v[b], (v[a] - v[b]) * self._conductance),
+            _DIODE: (self._diode_voltage, self._diode_current(self._diode_voltage)[0]),
+        }
+        branch_voltage, currents = self._branch_voltage(), self._currents
+        for model_id, part in ((_BATTERY, self._battery), (_CAPACITOR, self._capacitor), (_INDUCTOR, self._inductor)):
+            results[model_id] = (branch_voltage[part], currents[part])
+
+        for model_id, (voltages, currents) in results.items():
+            if model_id == _BATTERY:
+                currents = -currents # 电池的电流为输出的电流
+            for element, voltage, current in zip(self._elements[model_id], voltages.tolist(), currents.tolist()):
+                statistics = element.data["Statistics"]
+                statistics["电压"] = voltage
+                statistics["电流"] = current
+                statistics["功率"] = voltage * current
+                if model_id == _RESISTOR:
+                    statistics["瞬间电压"] = voltage
+                    statistics["瞬间电流"] = current
+                    statistics["瞬间功率"] = voltage * current
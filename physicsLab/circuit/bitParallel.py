@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+# 组合逻辑电路的位并行仿真 (需要numpy)
+# 将电路按拓扑序排列(levelize)后编译为一串位运算, 每个网络的电平为一个uint64数组:
+#   第i个输入组合为第i // 64个数的第i % 64位, 因此每次位运算同时计算64个输入组合
+# 元件的引脚与行为与logicSimulator相同, 但只支持组合逻辑元件
+from physicsLab import errors
+from physicsLab.circuit.wire import Pin, PIN_LABEL_BITS
+from physicsLab.circuit.logicSimulator import _MODELS
+from physicsLab.experiment import get_Experiment
+from physicsLab.enums import ExperimentType
+from physicsLab.typehint import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Self
+
+def _multiplier(up, upmid, lowmid, low) -> tuple:
+    # (lowmid, low) * (up, upmid)
+    p1_a, p1_b, high = lowmid & upmid, low & up, lowmid & up
+    carry = p1_a & p1_b
+    return high & carry, high ^ carry, p1_a ^ p1_b, low & upmid
+
+# key: ModelID, value: 对uint64数组进行位运算的函数, 参数与返回值的顺序同logicSimulator._MODELS
+_BITWISE: Dict[str, Callable[..., tuple]] = {
+    "Yes Gate": lambda a: (a,),
+    "No Gate": lambda a: (~a,),
+    "Or Gate": lambda a, b: (a | b,),
+    "And Gate": lambda a, b: (a & b,),
+    "Nor Gate": lambda a, b: (~(a | b),),
+    "Nand Gate": lambda a, b: (~(a & b),),
+    "Xor Gate": lambda a, b: (a ^ b,),
+    "Xnor Gate": lambda a, b: (~(a ^ b),),
+    "Imp Gate": lambda a, b: (~a | b,),
+    "Nimp Gate": lambda a, b: (a & ~b,),
+    "Half Adder": lambda a, b: (a ^ b, a & b),
+    "Full Adder": lambda a, b, c: (a ^ b ^ c, a & b | c & (a ^ b)),
+    "Half Subtractor": lambda a, b: (a ^ b, ~a & b),
+    "Full Subtractor": lambda a, b, c: (a ^ b ^ c, ~a & (b | c) | b & c),
+    "Multiplier": _multiplier,
+    "Schmitt Trigger": lambda a: (a,),
+}
+_INPUTS = ("Logic Input", "8bit Input") # 由evaluate的参数给定电平的元件
+_OUTPUTS = ("Logic Output", "8bit Display")
+
+class BitParallelSimulator:
+    ''' 组合逻辑电路的位并行仿真, 用于对所有输入组合进行穷举测试
+        仿真开始时根据实验的网表(见Experiment.use_Netlist)编译, 之后对电路的修改不会影响仿真
+        电路中有时序元件(如触发器)或组合逻辑环路时抛出SimulationError, 非逻辑电路元件被忽略
+    '''
+    def __init__(self, experiment=None) -> None:
+        import numpy as np
+
+        if experiment is None:
+            experiment = get_Experiment()
+        if experiment.experiment_type != ExperimentType.Circuit:
+            raise errors.ExperimentTypeError
+
+        experiment.use_Netlist()
+        self._experiment = experiment
+        self._pin_net: Dict[int, int] = {} # key: 端点, value: 网络的下标
+        for i, members in enumerate(experiment.netlist.nets()):
+            for pin in members:
+                self._pin_net[pin.element_self._slot << PIN_LABEL_BITS | pin.pinLabel] = i
+        self._net_count: int = len(experiment.netlist.nets())
+        # 没有连接导线的输出引脚各自属于一个新的网络, 没有连接导线的输入引脚属于ground
+        self._private_nets: Dict[Tuple[int, int], int] = {} # key: (id(元件), pinLabel)
+
+        # 输入元件, 以及需要计算的元件: (ModelID, 输入网络, 输出网络)
+        self._inputs: Dict[object, Tuple[int, ...]] = {}
+        nodes: List[Tuple[str, Tuple[int, ...], Tuple[int, ...]]] = []
+        self._sinks: Dict[object, Tuple[int, ...]] = {}
+        for element in experiment.Elements:
+            model_id = element.data["ModelID"]
+            model = _MODELS.get(model_id)
+            if model is None:
+                continue
+            in_labels, out_labels = model[0], model[1]
+            if model_id in _INPUTS:
+                self._inputs[element] = tuple(self._output_net(element, label) for label in out_labels)
+            elif model_id in _OUTPUTS:
+                self._sinks[element] = tuple(self._input_net(element, label) for label in in_labels)
+            elif model_id in _BITWISE:
+                nodes.append((
+                    model_id,
+                    tuple(self._input_net(element, label) for label in in_labels),
+                    tuple(self._output_net(element, label) for label in out_labels),
+                ))
+            else:
+                raise errors.SimulationError(f"{model_id} is not a combinational element")
+        self._ground: int = self._net_count
+
+        self._program = self._levelize(nodes)
+        self._np = np
+        self._values: List = [] # 每个网络的电平
+        self._size: int = 0 # 输入组合的个数
+
+    def _input_net(self, element, pinLabel: int) -> int:
+        net = self._find_net(element, pinLabel)
+        return -1 if net is None else net # -1在_levelize之后替换为ground
+
+    def _output_net(self, element, pinLabel: int) -> int:
+        net = self._find_net(element, pinLabel)
+        if net is None:
+            net = self._private_nets.setdefault((id(element), pinLabel), self._net_count)
+            if net == self._net_count:
+                self._net_count += 1
+        return net
+
+    def _find_net(self, element, pinLabel: int) -> Optional[int]:
+        slot = element.__dict__.get("_slot")
+        slot_Elements = self._experiment.slot_Elements
+        if slot is None or slot >= len(slot_Elements) or slot_Elements[slot] is not element:
+            return None
+        return self._pin_net.get(slot << PIN_LABEL_BITS | pinLabel)
+
+    def _levelize(self, nodes: list) -> List[Tuple[Callable[..., tuple], Tuple[int, ...], Tuple[int, ...]]]:
+        ''' 按拓扑序排列元件, 驱动一个网络的所有元件都排在读取该网络的元件之前 '''
+        ground = self._ground
+        nodes = [(model_id, tuple(ground if net == -1 else net for net in in_nets), out_nets)
+                 for model_id, in_nets, out_nets in nodes]
+        self._sinks = {element: tuple(ground if net == -1 else net for net in nets)
+                       for element, nets in self._sinks.items()}
+
+        drivers: Dict[int, List[int]] = {} # key: 网络, value: 驱动该网络的元件
+        for i, (_, _, out_nets) in enumerate(nodes):
+            for net in out_nets:
+                drivers.setdefault(net, []).append(i)
+        readers: List[List[int]] = [[] for _ in nodes] # 读取元件i的输出的元件
+        indegree = [0] * len(nodes)
+        for i, (_, in_nets, _) in enumerate(nodes):
+            sources = {driver for net in set(in_nets) for driver in drivers.get(net, ())}
+            indegree[i] = len(sources)
+            for driver in sources:
+                readers[driver].append(i)
+
+        order = [i for i, degree in enumerate(indegree) if degree == 0]
+        for i in order: # order在遍历时增长
+            for reader in readers[i]:
+                indegree[reader] -= 1
+                if indegree[reader] == 0:
+                    order.append(reader)
+        if len(order) != len(nodes):
+            raise errors.SimulationError("the circuit has a combinational loop")
+
+        return [(_BITWISE[nodes[i][0]], nodes[i][1], nodes[i][2]) for i in order]
+
+    def _input_nets(self, target) -> List[int]:
+        ''' 逻辑输入(或其引脚, 八位输入器, 由它们组成的序列)对应的网络, 第i项为第i位 '''
+        if isinstance(target, Pin):
+            target = target.element_self
+        nets = self._inputs.get(target)
+        if nets is not None:
+            return list(nets)
+        try:
+            items = list(target)
+        except TypeError:
+            raise TypeError(f"{target!r} is not a Logic_Input") from None
+        return [net for item in items for net in self._input_nets(item)]
+
+    def _output_nets(self, target) -> List[int]:
+        ''' 引脚(或逻辑输出, 八位显示器, 由它们组成的序列)对应的网络, 第i项为第i位 '''
+        if isinstance(target, Pin):
+            element = target.element_self
+            net = self._find_net(element, target.pinLabel)
+            if net is None:
+                net = self._private_nets.get((id(element), target.pinLabel), self._ground)
+            return [net]
+        nets = self._sinks.get(target)
+        if nets is not None:
+            return list(nets)
+        try:
+            items = list(target)
+        except TypeError:
+            raise TypeError(f"{target!r} is not a pin") from None
+        return [net for item in items for net in self._output_nets(item)]
+
+    def _run(self, planes: Dict[int, object], words: int) -> None:
+        ''' planes: key: 输入元件的网络, value: 该网络的电平(uint64数组) '''
+        np = self._np
+        zeros = np.zeros(words, dtype=np.uint64)
+        values: list = [None] * (self._net_count + 1)
+        for net, plane in planes.items():
+            values[net] = plane
+        for element, nets in self._inputs.items():
+            # 未给定电平的输入元件保持存档中的状态
+            for i, net in enumerate(nets):
+                if values[net] is None:
+                    state = _MODELS[element.data["ModelID"]][3](element, None)[1][i] # type: ignore
+                    values[net] = zeros if state == 0 else ~zeros
+
+        for func, in_nets, out_nets in self._program:
+            res = func(*(zeros if values[net] is None else values[net] for net in in_nets))
+            for net, value in zip(out_nets, res):
+                # 同一网络有多个输出引脚时, 任一输出为1则网络为1
+                values[net] = value if values[net] is None else values[net] | value
+        for i, value in enumerate(values):
+            if value is None:
+                values[i] = zeros
+        self._values = values
+
+    def evaluate(self, assignments: Dict) -> Self:
+        ''' 对一组输入组合进行仿真
+            @param assignments: key: 逻辑输入(或其引脚, 八位输入器, 由它们组成的序列, 如lib.Inputs)
+                                value: 每个输入组合的值(整数数组), 第i位为序列中第i个逻辑输入的电平
+                                所有数组的长度相同; 未给出的逻辑输入保持存档中的状态
+        '''
+        np = self._np
+        size = None
+        planes: Dict[int, object] = {}
+        for target, values in assignments.items():
+            values = np.asarray(values, dtype=np.uint64)
+            if values.ndim != 1 or size is not None and len(values) != size:
+                raise ValueError("all values must be 1-D arrays with the same length")
+            size = len(values)
+            words = (size + 63) // 64
+            for bit, net in enumerate(self._input_nets(target)):
+                bits = ((values >> np.uint64(bit)) & np.uint64(1)).astype(np.uint8)
+                packed = np.zeros(words * 8, dtype=np.uint8)
+                packed[:(size + 7) // 8] = np.packbits(bits, bitorder="little")
+                planes[net] = packed.view(np.uint64)
+        if size is None:
+            raise ValueError("no input is given")
+
+        self._size = size
+        self._run(planes, (size + 63) // 64)
+        return self
+
+    def exhaustive(self, targets: Sequence, chunk_bits: int = 20) -> Iterator[Tuple]:
+        ''' 依次仿真targets的所有输入组合, 每次仿真2 ** chunk_bits个组合
+            产生每个target在这些组合中的值(整数数组), 之后可以用get获取对应的输出
+            for x, y in sim.exhaustive([a, b]):
+                assert (sim.get(out) == x + y).all()
+        '''
+        if not isinstance(chunk_bits, int):
+            raise TypeError
+        np = self._np
+        groups = [self._input_nets(target) for target in targets]
+        nets = [net for group in groups for net in group]
+        total_bits = len(nets)
+        if total_bits > 64:
+            raise ValueError("too many inputs to enumerate")
+
+        chunk_bits = max(6, min(chunk_bits, total_bits))
+        size = 1 << chunk_bits
+        words = size >> 6
+        word_index = np.arange(words, dtype=np.uint64)
+        zeros = np.zeros(words, dtype=np.uint64)
+        # 第k位在一个uint64中的分布(k < 6), 与第k位在uint64之间的分布(k >= 6)
+        patterns = [np.uint64(sum(1 << i for i in range(64) if i >> k & 1)) for k in range(6)]
+        local = [zeros + patterns[k] if k < 6
+                 else zeros - ((word_index >> np.uint64(k - 6)) & np.uint64(1))
+                 for k in range(min(chunk_bits, total_bits))]
+        # base是size的整数倍, 因此(base + offset) >> shift == (base >> shift) | (offset >> shift)
+        offsets = np.arange(size, dtype=np.uint64)
+        shifts = [sum(len(group) for group in groups[:i]) for i in range(len(groups))]
+        masks = [(1 << len(group)) - 1 for group in groups]
+        local_values = [(offsets >> np.uint64(shift)) & np.uint64(mask) for shift, mask in zip(shifts, masks)]
+
+        for base in range(0, 1 << total_bits, size):
+            planes = {}
+            for k, net in enumerate(nets):
+                if k < chunk_bits:
+                    planes[net] = local[k]
+                else:
+                    planes[net] = ~zeros if base >> k & 1 else zeros
+            count = min(size, (1 << total_bits) - base)
+            self._size = count
+            self._run(planes, words)
+
+            yield tuple(
+                (values | np.uint64(base >> shift & mask))[:count]
+                for values, shift, mask in zip(local_values, shifts, masks)
+            )
+
+    def get(self, target):
+        ''' 获取最近一次仿真中每个输入组合的输出(整数数组)
+            @param target: 引脚, 逻辑输出, 八位显示器, 或由它们组成的序列, 第i项为结果的第i位
+        '''
+        np = self._np
+        nets = self._output_nets(target)
+        if len(nets) > 64:
+            raise ValueError("too many pins")
+        if len(nets) == 0:
+            return np.zeros(self._size, dtype=np.uint64)
+
+        res = np.zeros(self._size, dtype=np.uint64)
+        for bit, net in enumerate(nets):
+            bits = np.unpackbits(self._values[net].view(np.uint8), bitorder="little", count=self._size)
+            res |= bits.astype(np.uint64) << np.uint64(bit)
+        return res
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+# 列式存储的电学元件表 (可选, 见Experiment.use_ElementTable)
+# 同一ModelID的元件共享一份模板, 表中每一行只保存:
+#   坐标与角度(array), Identifier, 属性列(Properties), 以及与模板不同的字段
+# 元件的data为ElementRecord, 即表中一行的视图; 只有在Experiment.__write时才会转换为存档的dict
+import copy
+
+from array import array
+from collections.abc import ItemsView, KeysView, Mapping, ValuesView
+
+from physicsLab import _tools
+from physicsLab._sharedData import ElementData
+from physicsLab.typehint import Dict, List, Any, Iterator, Optional
+
+_MISSING: Any = object() # 元件没有该字段或属性
+
+# 每个元件各自保存的字段, 其余字段共享模板
+_ROW_KEYS = ("ModelID", "Identifier", "Position", "Rotation", "Properties")
+_VECTOR_KEYS = {"Position": 0, "Rotation": 3}
+
+class _Model:
+    ''' 同一ModelID的元件共享的模板与属性列 '''
+    __slots__ = ("model_id", "keys", "template", "columns", "size", "free_locals")
+
+    def __init__(self, model_id: str, data: dict) -> None:
+        self.model_id: str = model_id
+        self.keys: List[str] = list(data.keys()) # 导出时字段的顺序
+        self.template: dict = {key: val for key, val in _raw_items(data) if key not in _ROW_KEYS}
+        self.columns: Dict[str, list] = {} # key: 属性名, value: 每个元件的属性值
+        self.size: int = 0 # 属性列的长度
+        self.free_locals: List[int] = [] # 被删除的元件空出的属性列index
+
+def _raw_items(data: dict):
+    # ElementData.items()会为共享的子字典创建视图, 模板中直接保存共享的子字典即可
+    if type(data) is ElementData:
+        return dict.items(data)
+    return data.items()
+
+class ElementTable:
+    ''' 列式存储的元件表 '''
+    def __init__(self) -> None:
+        self._models: List[_Model] = []
+        self._model_index: Dict[str, int] = {}
+        self._row_model = array('H') # 元件的ModelID在_models中的index
+        self._row_local = array('L') # 元件在属性列中的index
+        self._vectors = array('d') # 每个元件6个数: 坐标x, z, y, 角度x, z, y (与存档中的顺序相同)
+        self._int_flags = array('B') # 坐标与角度中哪些数是int, 用于还原存档中的字符串
+        self._identifiers: List[Optional[str]] = []
+        self._overrides: Dict[int, dict] = {} # 与模板不同的字段, 只有少数元件会有
+        self._records: List[Optional[ElementRecord]] = [] # 每一行的视图, 回收该行时使其与表分离
+        self._free_rows: List[int] = [] # 被删除的元件空出的行, 之后创建的元件优先使用
+
+    def __len__(self) -> int:
+        return len(self._identifiers) - len(self._free_rows)
+
+    def append(self, data: dict) -> "ElementRecord":
+        ''' 将元件的data存入表中, 返回对应的视图 '''
+        model_id = data["ModelID"]
+        model_index = self._model_index.get(model_id)
+        if model_index is None:
+            model_index = len(self._models)
+            self._model_index[model_id] = model_index
+            self._models.append(_Model(model_id, data))
+        model = self._models[model_index]
+
+        if model.free_locals:
+            local = model.free_locals.pop()
+        else:
+            local = model.size
+            model.size += 1
+            for column in model.columns.values():
+                column.append(_MISSING)
+
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._row_model[row] = model_index
+            self._row_local[row] = local
+            self._vectors[row * 6:row * 6 + 6] = array('d', (0.0,) * 6)
+            self._int_flags[row] = 0
+        else:
+            row = len(self._identifiers)
+            self._row_model.append(model_index)
+            self._row_local.append(local)
+            self._vectors.extend((0.0,) * 6)
+            self._int_flags.append(0)
+            self._identifiers.append(None)
+            self._records.append(None)
+        record = self._records[row] = ElementRecord(self, row)
+
+        for key in model.keys:
+            if key not in _ROW_KEYS and key not in data:
+                self._override(row)[key] = _MISSING
+        for key, val in _raw_items(data):
+            if key == "ModelID":
+                continue
+            if key in _ROW_KEYS:
+                self.set_field(row, key, val)
+            elif model.template.get(key, _MISSING) != val or key not in model.keys:
+                self._override(row)[key] = val
+        return record
+
+    def free(self, record: "ElementRecord") -> None:
+        ''' 回收元件所在的行, 元件被删除时调用
+            record与表分离, 之后仍然可以读写, 但不再影响表中的内容
+        '''
+        if type(record) is not ElementRecord or record._table is not self:
+            return
+        row = record._row
+        record._detach(copy.deepcopy(self.export(row)))
+        self._records[row] = None
+
+        model = self._model_of(row)
+        local = self._row_local[row]
+        for column in model.columns.values():
+            column[local] = _MISSING
+        model.free_locals.append(local)
+        self._overrides.pop(row, None)
+        self._identifiers[row] = None
+        self._free_rows.append(row)
+
+    def _override(self, row: int) -> dict:
+        overrides = self._overrides.get(row)
+        if overrides is None:
+            overrides = self._overrides[row] = {}
+        return overrides
+
+    def _model_of(self, row: int) -> _Model:
+        return self._models[self._row_model[row]]
+
+    def _get_vector(self, row: int, offset: int) -> str:
+        flags = self._int_flags[row] >> offset
+        start = row * 6 + offset
+        x, z, y = self._vectors[start:start + 3]
+        if flags & 1:
+            x = int(x)
+        if flags & 2:
+            z = int(z)
+        if flags & 4:
+            y = int(y)
+        return f"{x},{z},{y}"
+
+    def _set_vector(self, row: int, offset: int, vector: str) -> bool:
+        try:
+            vals = _tools.parse_vector(vector)
+        except (TypeError, ValueError):
+            return False
+        if len(vals) != 3:
+            return False
+
+        flags = self._int_flags[row] & ~(0b111 << offset)
+        start = row * 6 + offset
+        for i, val in enumerate(vals):
+            self._vectors[start + i] = val
+            if type(val) is int:
+                flags |= 1 << (offset + i)
+        self._int_flags[row] = flags
+        return True
+
+    def get_field(self, row: int, key: str) -> Any:
+        overrides = self._overrides.get(row)
+        if overrides is not None and key in overrides:
+            result = overrides[key]
+            if result is _MISSING:
+                raise KeyError(key)
+            return result
+
+        if key == "ModelID":
+            return self._model_of(row).model_id
+        if key == "Identifier":
+            return self._identifiers[row]
+        if key in _VECTOR_KEYS:
+            return self._get_vector(row, _VECTOR_KEYS[key])
+        if key == "Properties":
+            return PropertiesView(self._records[row])
+
+        result = self._model_of(row).template.get(key, _MISSING)
+        if result is _MISSING:
+            raise KeyError(key)
+        if isinstance(result, (dict, list)):
+            # 可变的字段在第一次访问时复制, 避免修改共享的模板
+            result = self._override(row)[key] = copy.deepcopy(dict(result) if isinstance(result, dict) else result)
+        return result
+
+    def set_field(self, row: int, key: str, val: Any) -> None:
+        overrides = self._overrides.get(row)
+        if key == "Identifier":
+            self._identifiers[row] = val
+        elif key in _VECTOR_KEYS and self._set_vector(row, _VECTOR_KEYS[key], val):
+            pass
+        elif key == "Properties" and isinstance(val, dict):
+            props = PropertiesView(self._records[row])
+            props.clear()
+            props.update(val)
+        else:
+            self._override(row)[key] = val
+            return
+        if overrides is not None:
+            overrides.pop(key, None)
+
+    def del_field(self, row: int, key: str) -> None:
+        self.get_field(row, key) # 检查字段存在
+        self._override(row)[key] = _MISSING
+
+    def has_field(self, row: int, key: str) -> bool:
+        overrides = self._overrides.get(row)
+        if overrides is not None and key in overrides:
+            return overrides[key] is not _MISSING
+        return key in self._model_of(row).keys
+
+    def iter_keys(self, row: int) -> Iterator[str]:
+        overrides = self._overrides.get(row, {})
+        keys = self._model_of(row).keys
+        for key in keys:
+            if overrides.get(key) is not _MISSING:
+                yield key
+        for key, val in overrides.items():
+            if val is not _MISSING and key not in keys:
+                yield key
+
+    def export(self, row: int) -> dict:
+        ''' 转换为存档中元件的dict, 注意: 未被修改过的嵌套字段与模板共享 '''
+        model = self._model_of(row)
+        overrides = self._overrides.get(row)
+        result = {}
+        for key in model.keys:
+            if overrides is not None and key in overrides:
+                val = overrides[key]
+                if val is not _MISSING:
+                    result[key] = val
+            elif key == "ModelID":
+                result[key] = model.model_id
+            elif key == "Identifier":
+                result[key] = self._identifiers[row]
+            elif key in _VECTOR_KEYS:
+                result[key] = self._get_vector(row, _VECTOR_KEYS[key])
+            elif key == "Properties":
+                local = self._row_local[row]
+                result[key] = {name: column[local] for name, column in model.columns.items()
+                               if column[local] is not _MISSING}
+            else:
+                result[key] = model.template[key]
+        if overrides is not None:
+            for key, val in overrides.items():
+                if val is not _MISSING and key not in result:
+                    result[key] = val
+        return result
+
+class _DictView(dict):
+    ''' 以dict的子类实现的视图, 因此isinstance(x, dict), dict(x)等与普通的dict相同
+        子类实现__getitem__, __setitem__, __delitem__, __iter__, __len__, 其余方法都由这5个方法实现
+        注意: dict自身的存储只在视图与表分离后使用, 直接读取该存储的json.dumps, orjson等会得到空的dict,
+              编码前应先用to_save_dict()或to_dict()转换
+    '''
+    __slots__ = ()
+    __hash__ = None # type: ignore
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return KeysView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def __reversed__(self) -> Iterator[str]:
+        return reversed(list(self))
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def pop(self, key, *default):
+        try:
+            val = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return val
+
+    def popitem(self) -> tuple:
+        for key in self:
+            return key, self.pop(key)
+        raise KeyError("popitem(): dictionary is empty")
+
+    def update(self, other=(), /, **kwargs) -> None:
+        if isinstance(other, Mapping):
+            other = other.items()
+        elif hasattr(other, "keys"):
+            other = [(key, other[key]) for key in other.keys()]
+        for key, val in other:
+            self[key] = val
+        for key, val in kwargs.items():
+            self[key] = val
+
+    def clear(self) -> None:
+        for key in list(self):
+            del self[key]
+
+    def copy(self) -> dict:
+        return dict(self.items())
+
+    __copy__ = copy
+
+    def __or__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        result = self.copy()
+        result.update(other)
+        return result
+
+    def __ror__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        result = dict(other)
+        result.update(self.items())
+        return result
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.copy() == dict(other.items())
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+    def __reduce__(self):
+        return (dict, (self.copy(),))
+
+class ElementRecord(_DictView):
+    ''' 元件表中一行的视图, 可以像元件的data一样使用
+        元件被删除后该行会被回收, 视图与表分离并保存该行的内容
+    '''
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: ElementTable, row: int) -> None:
+        super().__init__()
+        self._table: Optional[ElementTable] = table
+        self._row = row
+
+    def _detach(self, data: dict) -> None:
+        dict.clear(self)
+        dict.update(self, data)
+        self._table = None
+
+    def __getitem__(self, key: str) -> Any:
+        if self._table is None:
+            return dict.__getitem__(self, key)
+        return self._table.get_field(self._row, key)
+
+    def __setitem__(self, key: str, val: Any) -> None:
+        if self._table is None:
+            dict.__setitem__(self, key, val)
+        else:
+            self._table.set_field(self._row, key, val)
+
+    def __delitem__(self, key: str) -> None:
+        if self._table is None:
+            dict.__delitem__(self, key)
+        else:
+            self._table.del_field(self._row, key)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._table is None:
+            return dict.__iter__(self)
+        return self._table.iter_keys(self._row)
+
+    def __len__(self) -> int:
+        if self._table is None:
+            return dict.__len__(self)
+        return sum(1 for _ in self)
+
+    def __contains__(self, key) -> bool:
+        if self._table is None:
+            return dict.__contains__(self, key)
+        return self._table.has_field(self._row, key)
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def __deepcopy__(self, memo: dict) -> dict:
+        # 复制出的元件(如Experiment.merge)不再属于该表
+        return copy.deepcopy(self._export(), memo)
+
+    def _export(self) -> dict:
+        if self._table is None:
+            return dict(dict.items(self))
+        return self._table.export(self._row)
+
+    def to_dict(self) -> dict:
+        return copy.deepcopy(self._export())
+
+class PropertiesView(_DictView):
+    ''' 元件的Properties, 存放于所属ModelID的属性列中
+        所属的行被回收后改为访问分离后的ElementRecord中的Properties
+    '''
+    __slots__ = ("_record",)
+
+    def __init__(self, record: ElementRecord) -> None:
+        super().__init__()
+        self._record = record
+
+    def _column_index(self):
+        ''' 返回(_Model, 属性列中的index), 与表分离后返回None '''
+        table = self._record._table
+        if table is None:
+            return None
+        row = self._record._row
+        return table._model_of(row), table._row_local[row]
+
+    def _detached(self) -> dict:
+        return dict.__getitem__(self._record, "Properties")
+
+    def __getitem__(self, key: str) -> Any:
+        index = self._column_index()
+        if index is None:
+            return self._detached()[key]
+        model, local = index
+        column = model.columns.get(key)
+        if column is None or column[local] is _MISSING:
+            raise KeyError(key)
+        return column[local]
+
+    def __setitem__(self, key: str, val: Any) -> None:
+        index = self._column_index()
+        if index is None:
+            self._detached()[key] = val
+            return
+        model, local = index
+        column = model.columns.get(key)
+        if column is None:
+            column = model.columns[key] = [_MISSING] * model.size
+        column[local] = val
+
+    def __delitem__(self, key: str) -> None:
+        index = self._column_index()
+        if index is None:
+            del self._detached()[key]
+            return
+        self[key] # 检查属性存在
+        model, local = index
+        model.columns[key][local] = _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        index = self._column_index()
+        if index is None:
+            return iter(self._detached())
+        model, local = index
+        return (key for key, column in model.columns.items() if column[local] is not _MISSING)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+def to_save_dict(data) -> dict:
+    ''' 获取存档格式的元件data '''
+    if type(data) is ElementRecord:
+        return data._export()
+    if type(data) is ElementData:
+        # dict(data)直接复制其内容, 之后编码时不会为共享的子字典创建副本
+        return dict(data)
+    return data
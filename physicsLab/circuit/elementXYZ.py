@@ -6,7 +6,7 @@
 
 from physicsLab import errors
 from physicsLab._tools import position
-from physicsLab.typehint import numType
+from physicsLab.typehint import numType, Union, Sequence, List
 from physicsLab.experiment import get_Experiment
 from physicsLab.enums import ExperimentType
 
@@ -64,9 +64,91 @@ def translateXYZ(x: numType, y: numType, z: numType, is_bigElement: bool = False
     z -= _zOrigin
     # 修改大体积逻辑电路原件的坐标
     if is_bigElement:
-        y -= _Y_AMEND
+        y = _amend_y(y, to_element=True)
     return x, y, z
 
+def _big_flags(is_bigElement: Union[bool, Sequence[bool]], num: int) -> List[bool]:
+    if isinstance(is_bigElement, bool):
+        return [is_bigElement] * num
+    if hasattr(is_bigElement, "tolist"): # numpy数组
+        is_bigElement = is_bigElement.tolist()
+    flags = list(is_bigElement)
+    if len(flags) != num or not all(isinstance(flag, bool) for flag in flags):
+        raise TypeError
+    return flags
+
+def _translate_array(points, is_bigElement, scale, origin, to_element: bool):
+    ''' xyzTranslate_array与translateXYZ_array的实现, 运算顺序与逐个转换相同, 因此结果完全相同 '''
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    if np is not None:
+        is_array = isinstance(points, np.ndarray)
+        array = np.array(points, ndmin=2)
+        if array.size == 0:
+            array = array.reshape(0, 3)
+        if array.ndim != 2 or array.shape[1] != 3 or array.dtype.kind not in "biuf":
+            raise TypeError
+        array = array.astype(np.float64)
+        bigs = is_bigElement if isinstance(is_bigElement, bool) else \
+            np.array(_big_flags(is_bigElement, len(array)), dtype=bool)
+        if to_element:
+            array /= scale
+            array -= origin
+        else:
+            array *= scale
+            array += origin
+        if bigs is True:
+            array[:, 1] = _amend_y(array[:, 1], to_element)
+        elif bigs is not False:
+            array[bigs, 1] = _amend_y(array[bigs, 1], to_element)
+        if is_array:
+            return array
+        return list(map(tuple, array.tolist()))
+
+    if hasattr(points, "tolist"):
+        points = points.tolist()
+    points = list(points)
+    bigs = _big_flags(is_bigElement, len(points))
+    (x_scale, y_scale, z_scale), (x_origin, y_origin, z_origin) = scale, origin
+    result = []
+    for (x, y, z), big in zip(points, bigs):
+        if not isinstance(x, (int, float)) or \
+                not isinstance(y, (int, float)) or \
+                not isinstance(z, (int, float)):
+            raise TypeError
+        if to_element:
+            x, y, z = x / x_scale - x_origin, y / y_scale - y_origin, z / z_scale - z_origin
+        else:
+            x, y, z = x * x_scale + x_origin, y * y_scale + y_origin, z * z_scale + z_origin
+        if big:
+            y = _amend_y(y, to_element)
+        result.append((float(x), float(y), float(z)))
+    return result
+
+def xyzTranslate_array(points, is_bigElement: Union[bool, Sequence[bool]] = False):
+    ''' 批量将元件坐标系转换为物实的坐标系, 结果与对每个坐标调用xyzTranslate相同
+        @param points: [(x, y, z), ...]或shape为(n, 3)的numpy数组
+        @param is_bigElement: 所有坐标共用的bool, 或与points一一对应的bool
+        points为numpy数组时返回numpy数组, 否则返回[(x, y, z), ...]
+        安装了numpy时使用numpy计算
+    '''
+    if get_Experiment().experiment_type != ExperimentType.Circuit:
+        raise errors.ExperimentTypeError
+
+    return _translate_array(points, is_bigElement, get_xyzUnit(), tuple(get_OriginPosition()), to_element=False)
+
+def translateXYZ_array(points, is_bigElement: Union[bool, Sequence[bool]] = False):
+    ''' 批量将物实的坐标系转换为元件坐标系, 结果与对每个坐标调用translateXYZ相同
+        参数与返回值同xyzTranslate_array
+    '''
+    if get_Experiment().experiment_type != ExperimentType.Circuit:
+        raise errors.ExperimentTypeError
+
+    return _translate_array(points, is_bigElement, get_xyzUnit(), tuple(get_OriginPosition()), to_element=True)
+
 # 设置元件坐标系原点O，输入值为物实坐标系
 def set_O(x: numType, y: numType, z: numType) -> None:
     if (isinstance(x, (int, float)) and
@@ -77,9 +159,15 @@ def set_O(x: numType, y: numType, z: numType) -> None:
     else:
         raise TypeError
 
+# 修正bigElement的y坐标, y可以是数或numpy数组
+def _amend_y(y, to_element: bool = False):
+    if to_element:
+        return y - _Y_AMEND
+    return y + _Y_AMEND
+
 # 修正bigElement的坐标
 def amend_big_Element(x: numType, y: numType, z: numType):
-    return x, y + _Y_AMEND, z
+    return x, _amend_y(y), z
 
 # 获取坐标原点
 def get_OriginPosition() -> position:
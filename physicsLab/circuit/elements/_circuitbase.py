@@ -8,8 +8,9 @@ from physicsLab.elementBase import ElementBase
 import physicsLab.circuit.elementXYZ as _elementXYZ
 
 from physicsLab.enums import ExperimentType
-from physicsLab.typehint import Optional, Self, numType, CircuitElementData, Generate
-from physicsLab._tools import roundData, randString
+from physicsLab.typehint import Optional, Self, numType, CircuitElementData, Generate, Dict, List
+from physicsLab._tools import roundData
+from physicsLab._sharedData import share_template
 from physicsLab.experiment import Experiment, get_Experiment
 
 # electricity class's metaClass
@@ -40,15 +41,25 @@ class CircuitMeta(type):
 
         self.__init__(x, y, z, elementXYZ, *args, **kwargs)
         assert hasattr(self, "data") and isinstance(self.data, dict)
+        # 与同一ModelID的元件共享未修改过的子字典
+        self.data = share_template(self.data)
 
-        self.data["Identifier"] = randString(32)
+        self.data["Identifier"] = _Expe.identifier_Allocator.allocate()
+        _Expe.elements_Identifier[self.data["Identifier"]] = self
         self.set_position(x, y, z, elementXYZ)
         self.set_rotation()
 
         _Expe.Elements.append(self)
+        if _Expe.element_Table is not None:
+            self.data = _Expe.element_Table.append(self.data)
 
         return self
 
+# key: 元件的类, value: 类的所有property的名字
+_properties: Dict[type, List[str]] = {}
+# key: 元件的类, value: {引脚的pinLabel: 该引脚的property的名字}
+_pin_names: Dict[type, Dict[int, str]] = {}
+
 # 所有电学元件的父类
 class CircuitBase(ElementBase, metaclass=CircuitMeta):
     is_bigElement = False # 该元件是否是逻辑电路的两体积元件
@@ -118,10 +129,26 @@ class CircuitBase(ElementBase, metaclass=CircuitMeta):
 
     @classmethod
     def _get_property(cls) -> list:
-        res: list = []
-        for name, _ in inspect.getmembers(cls, lambda i: isinstance(i, property)):
-            res.append(name)
-
+        res = _properties.get(cls)
+        if res is None:
+            res = _properties[cls] = [
+                name for name, _ in inspect.getmembers(cls, lambda i: isinstance(i, property))
+            ]
+        return list(res)
+
+    def _get_pin_names(self) -> Dict[int, str]:
+        ''' 引脚的pinLabel到其property的名字的映射, 每个类只计算一次
+            多个property对应同一个引脚时, 取名字(按字母序)最小的
+        '''
+        cls = type(self)
+        res = _pin_names.get(cls)
+        if res is None:
+            res = {}
+            for name in cls._get_property():
+                pin = getattr(self, name)
+                if isinstance(pin, wire.Pin) and pin.element_self is self:
+                    res.setdefault(pin.pinLabel, name)
+            _pin_names[cls] = res
         return res
 
     def rename(self, name: str) -> Self:
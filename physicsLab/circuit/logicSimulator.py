@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# 数字电路的离线事件驱动仿真, 用于在不打开物实的情况下测试逻辑电路(如lib中的模块化电路)
+# 电平只有0与1, 门电路没有延迟; 每一轮(delta)先计算所有待计算元件的输出, 再更新网络的电平,
+#   电平发生变化的网络的扇出元件在下一轮计算, 因此开销只与电平发生变化的元件数有关
+# 同一网络有多个输出引脚时, 任一输出为1则网络为1; 没有输出引脚驱动的输入引脚为0
+import random
+
+from physicsLab import errors
+from physicsLab.circuit.wire import Pin, PIN_LABEL_BITS
+from physicsLab.experiment import get_Experiment
+from physicsLab.enums import ExperimentType
+from physicsLab.typehint import Callable, Dict, List, Optional, Tuple, Self
+
+# 元件的行为: (输入引脚的pinLabel, 输出引脚的pinLabel, 根据状态与输入计算输出的函数, 创建状态的函数)
+_Model = Tuple[Tuple[int, ...], Tuple[int, ...], Callable[..., tuple], Optional[Callable[..., list]]]
+
+def _gate(fn: Callable[..., tuple]) -> Callable[..., tuple]:
+    ''' 组合逻辑元件没有状态 '''
+    return lambda state, values: fn(*values)
+
+def _edge(state: list, clock: int) -> bool:
+    ''' 时钟是否为上升沿, state[0]为上一次的时钟电平 '''
+    last, state[0] = state[0], clock
+    return last == 0 and clock == 1
+
+def _d_flipflop(state: list, values: tuple) -> tuple:
+    d, clock = values
+    if _edge(state, clock):
+        state[1] = d
+    return state[1], 1 - state[1]
+
+def _t_flipflop(state: list, values: tuple) -> tuple:
+    _, clock = values
+    if _edge(state, clock):
+        state[1] ^= 1
+    return state[1], 1 - state[1]
+
+def _real_t_flipflop(state: list, values: tuple) -> tuple:
+    t, clock = values
+    if _edge(state, clock) and t:
+        state[1] ^= 1
+    return state[1], 1 - state[1]
+
+def _jk_flipflop(state: list, values: tuple) -> tuple:
+    j, clock, k = values
+    if _edge(state, clock):
+        if j and k:
+            state[1] ^= 1
+        elif j or k:
+            state[1] = j
+    return state[1], 1 - state[1]
+
+def _bits4(num: int) -> tuple:
+    ''' 4位输出, 依次为o_up, o_upmid, o_lowmid, o_low (高位到低位) '''
+    return num >> 3 & 1, num >> 2 & 1, num >> 1 & 1, num & 1
+
+def _bits8(num: int) -> tuple:
+    ''' 8位输出, 第k个为第k位 '''
+    return tuple(num >> i & 1 for i in range(8))
+
+def _counter(state: list, values: tuple) -> tuple:
+    clock, reset = values
+    if _edge(state, clock):
+        state[1] = 0 if reset else (state[1] + 1) & 0xf
+    return _bits4(state[1])
+
+def _random_generator(state: list, values: tuple) -> tuple:
+    clock, reset = values
+    if _edge(state, clock):
+        state[1] = 0 if reset else state[2].getrandbits(4)
+    return _bits4(state[1])
+
+def _multiplier(up: int, upmid: int, lowmid: int, low: int) -> tuple:
+    return _bits4((low | lowmid << 1) * (upmid | up << 1))
+
+def _source(state: list, values: tuple) -> tuple:
+    ''' 逻辑输入与八位输入器, state[1]为输出的电平 '''
+    return state[1]
+
+def _sink(state, values: tuple) -> tuple:
+    return ()
+
+_MODELS: Dict[str, _Model] = {
+    "Logic Input": ((), (0,), _source, lambda element, rng: [None, (int(element.data["Properties"]["开关"]),)]),
+    "Logic Output": ((0,), (), _sink, None),
+    "Yes Gate": ((0,), (1,), _gate(lambda a: (a,)), None),
+    "No Gate": ((0,), (1,), _gate(lambda a: (1 - a,)), None),
+    "Or Gate": ((0, 1), (2,), _gate(lambda a, b: (a | b,)), None),
+    "And Gate": ((0, 1), (2,), _gate(lambda a, b: (a & b,)), None),
+    "Nor Gate": ((0, 1), (2,), _gate(lambda a, b: (1 - (a | b),)), None),
+    "Nand Gate": ((0, 1), (2,), _gate(lambda a, b: (1 - (a & b),)), None),
+    "Xor Gate": ((0, 1), (2,), _gate(lambda a, b: (a ^ b,)), None),
+    "Xnor Gate": ((0, 1), (2,), _gate(lambda a, b: (1 - (a ^ b),)), None),
+    "Imp Gate": ((0, 1), (2,), _gate(lambda a, b: ((1 - a) | b,)), None),
+    "Nimp Gate": ((0, 1), (2,), _gate(lambda a, b: (a & (1 - b),)), None),
+    # 加法器与减法器: o_up为和(差), o_low为进位(借位); 全加器的i_low为低位的进位
+    "Half Adder": ((2, 3), (0, 1), _gate(lambda a, b: (a ^ b, a & b)), None),
+    "Full Adder": ((2, 3, 4), (0, 1), _gate(lambda a, b, c: (a ^ b ^ c, a & b | a & c | b & c)), None),
+    "Half Subtractor": ((2, 3), (0, 1), _gate(lambda a, b: (a ^ b, (1 - a) & b)), None),
+    "Full Subtractor": ((2, 3, 4), (0, 1), _gate(lambda a, b, c: (a ^ b ^ c, (1 - a) & (b | c) | b & c)), None),
+    # 2位乘法器: i_low, i_lowmid为一个乘数, i_upmid, i_up为另一个乘数
+    "Multiplier": ((4, 5, 6, 7), (0, 1, 2, 3), _gate(_multiplier), None),
+    # 触发器: i_low(JK触发器为i_mid)为时钟, 上升沿触发; o_up为Q, o_low为非Q
+    "D Flipflop": ((2, 3), (0, 1), _d_flipflop, lambda element, rng: [None, 0]),
+    "T Flipflop": ((2, 3), (0, 1), _t_flipflop, lambda element, rng: [None, 0]),
+    "Real-T Flipflop": ((2, 3), (0, 1), _real_t_flipflop, lambda element, rng: [None, 0]),
+    "JK Flipflop": ((2, 3, 4), (0, 1), _jk_flipflop, lambda element, rng: [None, 0]),
+    # 计数器与随机数发生器: i_up为时钟, i_low为1时在时钟的上升沿清零
+    "Counter": ((4, 5), (0, 1, 2, 3), _counter, lambda element, rng: [None, 0]),
+    "Random Generator": ((4, 5), (0, 1, 2, 3), _random_generator, lambda element, rng: [None, 0, rng]),
+    # 八位输入器与八位显示器: pinLabel为k的引脚对应第k位
+    "8bit Input": ((), tuple(range(8)), _source,
+                   lambda element, rng: [None, _bits8(int(element.data["Properties"]["十进制"]))]),
+    "8bit Display": (tuple(range(8)), (), _sink, None),
+    # 施密特触发器视为缓冲器
+    "Schmitt Trigger": ((0,), (1,), _gate(lambda a: (a,)), None),
+}
+
+class LogicSimulator:
+    ''' 实验中数字电路的事件驱动仿真
+        仿真开始时根据实验的网表(见Experiment.use_Netlist)建立, 之后对电路的修改不会影响仿真
+        不支持的元件(如模拟电路元件)被忽略, 与其相连的网络只由支持的元件驱动
+    '''
+    def __init__(self, experiment=None, max_steps: Optional[int] = None, seed: Optional[int] = None) -> None:
+        ''' @param experiment: 仿真的实验, 默认为当前实验
+            @param max_steps: 每次仿真的最大轮数, 超过时认为电路振荡; 默认与元件数有关
+            @param seed: 随机数发生器的随机数种子
+        '''
+        if experiment is None:
+            experiment = get_Experiment()
+        if max_steps is not None and not isinstance(max_steps, int):
+            raise TypeError
+        if experiment.experiment_type != ExperimentType.Circuit:
+            raise errors.ExperimentTypeError
+
+        experiment.use_Netlist()
+        nets = experiment.netlist.nets()
+        pin_net: Dict[int, int] = {} # key: 端点, value: 网络的下标
+        for i, members in enumerate(nets):
+            for pin in members:
+                pin_net[pin.element_self._slot << PIN_LABEL_BITS | pin.pinLabel] = i
+        net_count = len(nets)
+
+        rng = random.Random(seed)
+        self._experiment = experiment
+        self._elements: list = []
+        self._index: Dict[object, int] = {} # key: 元件, value: 元件在仿真中的下标
+        self._in_nets: List[Tuple[int, ...]] = []
+        self._out_nets: List[Tuple[int, ...]] = []
+        self._funcs: List[Callable[..., tuple]] = []
+        self._states: List[Optional[list]] = []
+        self._outputs: List[tuple] = []
+        # 网络的电平, 驱动网络的输出引脚中为1的个数, 以网络为输入的元件
+        # 最后一个网络不会被驱动, 没有连接导线的输入引脚视为连接到这个网络
+        self._net_value: List[int] = [0] * (net_count + 1)
+        self._net_high: List[int] = [0] * (net_count + 1)
+        self._fanout: List[List[int]] = [[] for _ in range(net_count + 1)]
+        self._pin_net: Dict[int, int] = pin_net
+
+        for element in experiment.Elements:
+            model = _MODELS.get(element.data["ModelID"])
+            if model is None:
+                continue
+            in_labels, out_labels, func, init = model
+
+            index = len(self._elements)
+            self._index[element] = index
+            self._elements.append(element)
+            in_nets = tuple(self._net_of(element, label) for label in in_labels)
+            for net in set(in_nets):
+                self._fanout[net].append(index)
+            self._in_nets.append(in_nets)
+            # 没有连接导线的输出引脚不驱动任何网络
+            self._out_nets.append(tuple(-1 if net == net_count else net
+                                        for net in (self._net_of(element, label) for label in out_labels)))
+            self._funcs.append(func)
+            self._states.append(None if init is None else init(element, rng))
+            self._outputs.append((0,) * len(out_labels))
+
+        self.max_steps: int = 2 * len(self._elements) + 64 if max_steps is None else max_steps
+        self.evaluations: int = 0 # 计算元件输出的总次数
+        self._pending = set(range(len(self._elements)))
+        self.run()
+
+    def _net_of(self, element, pinLabel: int) -> int:
+        ''' 引脚所在网络的下标, 引脚没有连接导线时为不会被驱动的最后一个网络 '''
+        ground = len(self._net_value) - 1
+        slot = element.__dict__.get("_slot")
+        slot_Elements = self._experiment.slot_Elements
+        if slot is None or slot >= len(slot_Elements) or slot_Elements[slot] is not element:
+            return ground
+        return self._pin_net.get(slot << PIN_LABEL_BITS | pinLabel, ground)
+
+    def run(self) -> Self:
+        ''' 仿真直到电路稳定 '''
+        net_value, net_high, fanout = self._net_value, self._net_high, self._fanout
+        in_nets, out_nets, funcs, states, outputs = \
+            self._in_nets, self._out_nets, self._funcs, self._states, self._outputs
+
+        pending, self._pending = self._pending, set()
+        steps = 0
+        while pending:
+            steps += 1
+            if steps > self.max_steps:
+                raise errors.SimulationError(f"circuit does not settle in {self.max_steps} steps")
+            self.evaluations += len(pending)
+
+            changed = []
+            for index in pending:
+                res = funcs[index](states[index], tuple([net_value[net] for net in in_nets[index]]))
+                if res != outputs[index]:
+                    changed.append((index, res))
+
+            nets = set()
+            for index, res in changed:
+                for net, new, old in zip(out_nets[index], res, outputs[index]):
+                    if new != old and net >= 0:
+                        net_high[net] += new - old
+                        nets.add(net)
+                outputs[index] = res
+
+            pending = set()
+            for net in nets:
+                value = 1 if net_high[net] > 0 else 0
+                if value != net_value[net]:
+                    net_value[net] = value
+                    pending.update(fanout[net])
+        return self
+
+    def set(self, target, value: int) -> Self:
+        ''' 设置逻辑输入或八位输入器的值, 需要调用run或get后才会传播
+            @param target: 逻辑输入, 八位输入器, 它们的引脚, 或者由这些组成的序列(如lib.Inputs, unitPin)
+                           为序列时, value的第i位为序列中第i个逻辑输入的值
+        '''
+        if not isinstance(value, int):
+            raise TypeError
+
+        if isinstance(target, Pin):
+            target = target.element_self
+        index = self._index.get(target)
+        if index is not None:
+            model_id = target.data["ModelID"]
+            if model_id == "Logic Input" and value in (0, 1):
+                self._states[index][1] = (value,) # type: ignore
+            elif model_id == "8bit Input" and 0 <= value <= 255:
+                self._states[index][1] = _bits8(value) # type: ignore
+            else:
+                raise ValueError(f"can not set {model_id} to {value}")
+            self._pending.add(index)
+            return self
+
+        try:
+            items = list(target)
+        except TypeError:
+            raise TypeError(f"{target!r} is not a Logic_Input") from None
+        if value < 0 or value >> len(items) != 0:
+            raise ValueError(f"{value} does not fit in {len(items)} bits")
+        for i, item in enumerate(items):
+            self.set(item, value >> i & 1)
+        return self
+
+    def pulse(self, target) -> Self:
+        ''' 将逻辑输入依次设置为1与0, 用于产生时钟信号 '''
+        self.set(target, 1).run()
+        return self.set(target, 0).run()
+
+    def get(self, target) -> int:
+        ''' 获取电平, 会先仿真直到电路稳定
+            @param target: 引脚, 逻辑输出, 八位显示器, 或者由这些组成的序列(如lib.Outputs, unitPin)
+                           为序列时, 返回值的第i位为序列中第i项的电平
+        '''
+        if self._pending:
+            self.run()
+
+        if isinstance(target, Pin):
+            return self._pin_value(target)
+        index = self._index.get(target)
+        if index is not None:
+            model_id = target.data["ModelID"]
+            if model_id == "Logic Output":
+                return self._net_value[self._in_nets[index][0]]
+            if model_id == "8bit Display":
+                return sum(self._net_value[net] << i for i, net in enumerate(self._in_nets[index]))
+            raise ValueError(f"can not get the value of {model_id}, use its pins instead")
+
+        try:
+            items = list(target)
+        except TypeError:
+            raise TypeError(f"{target!r} is not a pin") from None
+        return sum(self.get(item) << i for i, item in enumerate(items))
+
+    def _pin_value(self, pin: Pin) -> int:
+        element = pin.element_self
+        net = self._net_of(element, pin.pinLabel)
+        if net != len(self._net_value) - 1:
+            return self._net_value[net]
+        # 没有连接导线的输出引脚
+        index = self._index.get(element)
+        if index is not None:
+            out_labels = _MODELS[element.data["ModelID"]][1]
+            if pin.pinLabel in out_labels:
+                return self._outputs[index][out_labels.index(pin.pinLabel)]
+        return 0
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# 电学实验的网表 (可选, 见Experiment.use_Netlist)
+# 引脚以端点(元件的slot与pinLabel组成的整数, 见wire.py)表示
+# 引脚的邻接表与并查集随crt_Wire, del_Wire增量更新:
+#   连接导线时合并两端的网络; 删除导线后网络可能分裂, 只由邻接表重建导线两端所在的网络
+from collections import namedtuple
+
+from physicsLab.circuit.wire import Pin, Wire, PIN_LABEL_BITS, _split_key
+from physicsLab.typehint import Dict, List, Optional, Set, Tuple
+
+# lint发现的问题, kind为下面的常量之一, pins为有关的引脚
+LintIssue = namedtuple("LintIssue", ["kind", "pins"])
+UNCONNECTED_INPUT = "unconnected input" # 没有连接导线的输入引脚
+MULTIPLE_DRIVERS = "multiple drivers" # 同一个网络中有多个输出引脚
+UNDRIVEN_NET = "undriven net" # 只有输入引脚的网络
+
+# key: 元件的类, value: 输入引脚的(pinLabel, property的名字)
+_input_pins: Dict[type, Tuple[Tuple[int, str], ...]] = {}
+
+def _get_input_pins(element) -> Tuple[Tuple[int, str], ...]:
+    cls = type(element)
+    res = _input_pins.get(cls)
+    if res is None:
+        res = _input_pins[cls] = tuple(
+            (label, name) for label, name in sorted(element._get_pin_names().items())
+            if getattr(element, name).is_input
+        )
+    return res
+
+def _typed_pin(pin: Pin) -> Pin:
+    ''' 读取存档时构造的是Pin, 将其换为元件的property返回的InputPin或OutputPin '''
+    if type(pin) is not Pin:
+        return pin
+    name = pin.element_self._get_pin_names().get(pin.pinLabel)
+    if name is None:
+        return pin
+    return getattr(pin.element_self, name)
+
+class Netlist:
+    ''' 实验的网表, 网络即通过导线相连的引脚
+        判断两个引脚是否属于同一网络的开销为O(α(n)), 查询引脚的邻居的开销只与其连接的导线数有关
+    '''
+    def __init__(self, experiment) -> None:
+        self._experiment = experiment
+        self._pins: Dict[int, Pin] = {} # key: 端点, value: 引脚
+        self._adjacency: Dict[int, List[int]] = {} # key: 端点, value: 通过导线直接相连的端点
+        self._parent: Dict[int, int] = {}
+        self._size: Dict[int, int] = {} # 只记录根的网络大小
+
+    def __len__(self) -> int:
+        ''' 连接了导线的引脚数 '''
+        return len(self._pins)
+
+    def clear(self) -> None:
+        self._pins.clear()
+        self._adjacency.clear()
+        self._parent.clear()
+        self._size.clear()
+
+    def _add(self, a_wire: Wire) -> None:
+        source, target = _split_key(a_wire._key)
+        self._link(source, target)
+        self._link(target, source)
+        for pin in (a_wire.Source, a_wire.Target):
+            endpoint = pin.element_self._slot << PIN_LABEL_BITS | pin.pinLabel
+            if endpoint not in self._pins:
+                self._pins[endpoint] = _typed_pin(pin)
+        self._union(source, target)
+
+    def _link(self, endpoint: int, other: int) -> None:
+        neighbors = self._adjacency.get(endpoint)
+        if neighbors is None:
+            self._adjacency[endpoint] = [other]
+        else:
+            neighbors.append(other)
+
+    def _remove(self, key: int) -> None:
+        source, target = _split_key(key)
+        self._unlink(source, target)
+        self._unlink(target, source)
+        # 两端仍然相连时网络不变, 否则网络分裂为两端各自所在的两个网络
+        component = self._component(source, stop=target)
+        if component is not None:
+            self._reset(component)
+            self._reset(self._component(target))
+
+    def _unlink(self, endpoint: int, other: int) -> None:
+        neighbors = self._adjacency[endpoint]
+        neighbors.remove(other)
+        if len(neighbors) == 0:
+            del self._adjacency[endpoint]
+            del self._pins[endpoint]
+
+    def _find(self, endpoint: int) -> int:
+        parent = self._parent
+        root = parent.get(endpoint, endpoint)
+        while root != endpoint:
+            # 路径减半
+            grandparent = parent.get(root, root)
+            parent[endpoint] = grandparent
+            endpoint, root = grandparent, parent.get(grandparent, grandparent)
+        return root
+
+    def _union(self, a: int, b: int) -> None:
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        size = self._size
+        size_a, size_b = size.pop(a, 1), size.pop(b, 1)
+        if size_a < size_b:
+            a, b = b, a
+        self._parent[b] = a
+        size[a] = size_a + size_b
+
+    def _component(self, start: int, stop: Optional[int] = None) -> Optional[Set[int]]:
+        ''' 通过导线与start相连的所有端点(包括start), 遇到stop时返回None '''
+        adjacency = self._adjacency
+        visited = {start}
+        stack = [start]
+        while stack:
+            for other in adjacency.get(stack.pop(), ()):
+                if other not in visited:
+                    if other == stop:
+                        return None
+                    visited.add(other)
+                    stack.append(other)
+        return visited
+
+    def _reset(self, component: Set[int]) -> None:
+        ''' 将component重建为并查集中的一个网络, 开销与网络的大小有关 '''
+        parent, size = self._parent, self._size
+        for endpoint in component:
+            parent.pop(endpoint, None)
+            size.pop(endpoint, None)
+        if len(component) > 1:
+            root = next(iter(component))
+            for endpoint in component:
+                if endpoint != root:
+                    parent[endpoint] = root
+            size[root] = len(component)
+
+    def _endpoint(self, pin: Pin) -> Optional[int]:
+        ''' 引脚的端点, 引脚没有连接导线时返回None '''
+        if not isinstance(pin, Pin):
+            raise TypeError
+
+        element = pin.element_self
+        slot = element.__dict__.get("_slot")
+        if slot is None:
+            return None
+        endpoint = slot << PIN_LABEL_BITS | pin.pinLabel
+        # 元件被复制到其他实验时, 其slot可能属于其他元件
+        stored = self._pins.get(endpoint)
+        if stored is None or stored.element_self is not element:
+            return None
+        return endpoint
+
+    def neighbors(self, pin: Pin) -> List[Pin]:
+        ''' 通过导线与pin直接相连的引脚 '''
+        endpoint = self._endpoint(pin)
+        if endpoint is None:
+            return []
+        return [self._pins[other] for other in self._adjacency[endpoint]]
+
+    def same_net(self, pin: Pin, other: Pin) -> bool:
+        ''' 两个引脚是否通过导线相连(可以经过其他引脚) '''
+        a, b = self._endpoint(pin), self._endpoint(other)
+        if a is None or b is None:
+            return pin == other
+        return self._find(a) == self._find(b)
+
+    def net(self, pin: Pin) -> List[Pin]:
+        ''' pin所在的网络中的所有引脚(包括pin), 开销与网络的大小有关 '''
+        start = self._endpoint(pin)
+        if start is None:
+            return [pin]
+        return [self._pins[endpoint] for endpoint in self._component(start)]
+
+    def nets(self) -> List[List[Pin]]:
+        ''' 所有网络, 每个网络至少包含两个引脚 '''
+        res: Dict[int, List[Pin]] = {}
+        for endpoint, pin in self._pins.items():
+            root = self._find(endpoint)
+            members = res.get(root)
+            if members is None:
+                res[root] = [pin]
+            else:
+                members.append(pin)
+        return list(res.values())
+
+    def fan_out(self, pin: Pin) -> List[Pin]:
+        ''' pin所在的网络中的其他输入引脚, 即pin驱动的引脚 '''
+        return [other for other in self.net(pin) if other.is_input and other != pin]
+
+    def lint(self) -> List[LintIssue]:
+        ''' 检查电路中的常见错误, 开销与元件数和导线数成线性关系
+            只检查区分了输入输出的引脚(如逻辑电路), 含有模拟电路引脚的网络不会被认为没有驱动
+        '''
+        issues: List[LintIssue] = []
+        pins = self._pins
+
+        for element in self._experiment.Elements:
+            input_pins = _get_input_pins(element)
+            if len(input_pins) == 0:
+                continue
+            slot = element.__dict__.get("_slot")
+            for label, name in input_pins:
+                stored = None if slot is None else pins.get(slot << PIN_LABEL_BITS | label)
+                if stored is None or stored.element_self is not element:
+                    issues.append(LintIssue(UNCONNECTED_INPUT, [getattr(element, name)]))
+
+        for members in self.nets():
+            drivers = [pin for pin in members if pin.is_output]
+            if len(drivers) > 1:
+                issues.append(LintIssue(MULTIPLE_DRIVERS, drivers))
+            elif len(drivers) == 0 and all(pin.is_input for pin in members):
+                issues.append(LintIssue(UNDRIVEN_NET, members))
+        return issues
@@ -2,9 +2,12 @@
 from physicsLab import errors
 from physicsLab.experiment import get_Experiment
 from physicsLab.enums import ExperimentType
-from physicsLab.typehint import Optional, Callable, Union
+from physicsLab.typehint import Optional, Callable, Union, Dict, Iterable, Iterator, Tuple
+
+from collections.abc import MutableSet
 
 # 电学元件引脚类, 模电元件引脚无明确的输入输出之分, 因此用这个
+# Pin只是临时对象, 导线中保存的是元件, pinLabel与Pin的类, 以减少长期存活的对象(gc需要扫描的对象)
 class Pin:
     __slots__ = ("element_self", "pinLabel")
     is_input = False
@@ -25,39 +28,98 @@ class Pin:
         return obj
 
     def __eq__(self, other: "Pin") -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Pin):
             return False
 
-        return self.element_self == other.element_self and self.pinLabel == other.pinLabel
+        return self.element_self is other.element_self and self.pinLabel == other.pinLabel
 
     # 将self转换为 CircuitBase.a_pin的形式
-    def export_str(self) -> str:
+    def export_str(self, element_index: Optional[Dict] = None) -> str:
+        ''' @param element_index: 元件到其index的映射, 导出大量引脚时避免每次遍历Elements '''
         pin_name = self._get_pin_name_of_class()
         if pin_name is None:
             raise errors.ExperimentError("Pin is not belong to any element")
-        return f"e{self.element_self.get_Index()}.{pin_name}"
+        if element_index is None:
+            index = self.element_self.get_index()
+        else:
+            index = element_index[self.element_self]
+        return f"e{index}.{pin_name}"
 
     def _get_pin_name_of_class(self) -> Optional[str]:
-        for method in self.element_self._get_property():
-            if eval(f"self.element_self.{method}") == self:
-                return method
-        return None
+        return self.element_self._get_pin_names().get(self.pinLabel)
 
 # 只用于输入的引脚
 class InputPin(Pin):
+    __slots__ = ()
     is_input = True
-    def __init__(self, input_self, pinLabel: int) -> None:
-        super().__init__(input_self, pinLabel)
 
 # 只用于输出的引脚
 class OutputPin(Pin):
+    __slots__ = ()
     is_output = True
-    def __init__(self, input_self, pinLabel: int) -> None:
-        super().__init__(input_self, pinLabel)
+
+# 引脚在实验中的编号: 元件的slot与pinLabel
+PIN_LABEL_BITS = 8
+# 导线的key: 两端引脚的编号中较小的在高位
+_ENDPOINT_BITS = 64
+_ENDPOINT_MASK = (1 << _ENDPOINT_BITS) - 1
+
+def _find_slot(element) -> Optional[int]:
+    ''' 元件在其实验中的slot, 元件没有连接过导线(或slot已被回收)时返回None '''
+    slot = element.__dict__.get("_slot")
+    if slot is None:
+        return None
+    slot_Elements = element.experiment.slot_Elements
+    if slot >= len(slot_Elements) or slot_Elements[slot] is not element:
+        return None
+    return slot
+
+def _slot_of(element) -> int:
+    ''' 元件在实验中的整数编号(slot), 第一次连接导线时分配, 优先使用被删除的元件空出的slot
+        元件被复制到其他实验(如merge)后, 原有的slot不属于新的实验, 会重新分配
+    '''
+    slot = _find_slot(element)
+    if slot is None:
+        experiment = element.experiment
+        if experiment.free_Slots:
+            slot = experiment.free_Slots.pop()
+            experiment.slot_Elements[slot] = element
+        else:
+            slot = len(experiment.slot_Elements)
+            experiment.slot_Elements.append(element)
+        element._slot = slot
+    return slot
+
+def _make_key(source: int, target: int) -> int:
+    if source < target:
+        return source << _ENDPOINT_BITS | target
+    return target << _ENDPOINT_BITS | source
+
+def _wire_key(source_element, source_label: int, target_element, target_label: int) -> int:
+    ''' 导线的key, 与导线的方向无关; 会为元件分配slot, 只在添加导线时使用 '''
+    return _make_key(_slot_of(source_element) << PIN_LABEL_BITS | source_label,
+                     _slot_of(target_element) << PIN_LABEL_BITS | target_label)
+
+def _find_wire_key(source_element, source_label: int, target_element, target_label: int) -> Optional[int]:
+    ''' 同_wire_key, 但不分配slot: 没有slot的元件不属于任何导线, 此时返回None '''
+    source_slot = _find_slot(source_element)
+    if source_slot is None:
+        return None
+    target_slot = _find_slot(target_element)
+    if target_slot is None:
+        return None
+    return _make_key(source_slot << PIN_LABEL_BITS | source_label, target_slot << PIN_LABEL_BITS | target_label)
+
+def _split_key(key: int) -> Tuple[int, int]:
+    ''' 导线两端引脚的编号, 较小的在前 '''
+    return key >> _ENDPOINT_BITS, key & _ENDPOINT_MASK
 
 # 导线类
 class Wire:
-    __slots__ = ("Source", "Target", "color")
+    __slots__ = ("_source", "_source_label", "_source_type",
+                 "_target", "_target_label", "_target_type", "color", "_key")
     def __init__(self, Source: Pin, Target: Pin, color: str = '蓝') -> None:
         if not isinstance(Source, Pin) or not isinstance(Target, Pin):
             raise TypeError
@@ -67,48 +129,145 @@ class Wire:
 
         if Source == Target:
             raise errors.ExperimentError()
+        if not 0 <= Source.pinLabel < 1 << PIN_LABEL_BITS or not 0 <= Target.pinLabel < 1 << PIN_LABEL_BITS:
+            raise errors.ExperimentError("invalid pinLabel")
 
         if color in ("black", "blue", "red", "green", "yellow"):
             color = {"black": "黑", "blue": "蓝", "red": "红", "green": "绿", "yellow": "黄"}[color]
         if color not in ('蓝', '绿', '黄', '红', '黑'):
             raise errors.WireColorError
 
-        self.Source: Pin = Source
-        self.Target: Pin = Target
+        self._source = Source.element_self
+        self._source_label: int = Source.pinLabel
+        self._source_type: type = type(Source)
+        self._target = Target.element_self
+        self._target_label: int = Target.pinLabel
+        self._target_type: type = type(Target)
         self.color: str = color
+        self._key: Optional[int] = None # 加入实验时分配, 见_add_wire
+
+    @property
+    def Source(self) -> Pin:
+        return self._source_type(self._source, self._source_label)
+
+    @property
+    def Target(self) -> Pin:
+        return self._target_type(self._target, self._target_label)
+
+    def _find_key(self) -> Optional[int]:
+        return _find_wire_key(self._source, self._source_label, self._target, self._target_label)
 
     def __hash__(self) -> int:
-        return hash(
-            (self.Source.element_self, self.Source.pinLabel, self.Target.element_self, self.Target.pinLabel)
-        ) + hash(
-            (self.Target.element_self, self.Target.pinLabel, self.Source.element_self, self.Source.pinLabel)
-        )
+        # 同导线的key, 但以元件的id代替slot: 未加入实验(没有key)的导线也要与__eq__一致
+        return hash(_make_key(id(self._source) << PIN_LABEL_BITS | self._source_label,
+                              id(self._target) << PIN_LABEL_BITS | self._target_label))
 
     def __eq__(self, other: "Wire") -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Wire):
             return False
 
-        if ((self.Source == other.Source and self.Target == other.Target)
-           or (self.Source == other.Target and self.Target == other.Source)):
+        if self._source_label == other._source_label and self._target_label == other._target_label \
+                and self._source is other._source and self._target is other._target:
             return True
-        else:
-            return False
+        return self._source_label == other._target_label and self._target_label == other._source_label \
+            and self._source is other._target and self._target is other._source
 
     def __repr__(self) -> str:
+        return self.export_str()
+
+    def export_str(self, element_index: Optional[Dict] = None) -> str:
+        ''' 将导线转换为physicsLab代码, element_index同Pin.export_str '''
+        source = self.Source.export_str(element_index)
+        target = self.Target.export_str(element_index)
         if self.color == "蓝":
-            return f"{self.Source.export_str()} - {self.Target.export_str()}"
+            return f"{source} - {target}"
         else:
-            return f"crt_Wire({self.Source.export_str()}, {self.Target.export_str()}, '{self.color}')"
+            return f"crt_Wire({source}, {target}, '{self.color}')"
 
     def release(self) -> dict:
         return {
-            "Source": self.Source.element_self.data["Identifier"],
-            "SourcePin": self.Source.pinLabel,
-            "Target": self.Target.element_self.data["Identifier"],
-            "TargetPin": self.Target.pinLabel,
+            "Source": self._source.data["Identifier"],
+            "SourcePin": self._source_label,
+            "Target": self._target.data["Identifier"],
+            "TargetPin": self._target_label,
             "ColorName": f"{self.color}色导线"
         }
 
+# 实验中的导线, 以导线的key为索引的边表
+class WireSet(MutableSet):
+    __slots__ = ("edges",)
+    def __init__(self, wires: Iterable[Wire] = ()) -> None:
+        self.edges: Dict[int, Wire] = {} # key: 导线的key, value: Wire
+        for a_wire in wires:
+            self.add(a_wire)
+
+    def __contains__(self, a_wire: object) -> bool:
+        if not isinstance(a_wire, Wire):
+            return False
+        # 集合中的导线以自身的key保存
+        if a_wire._key is not None and self.edges.get(a_wire._key) is a_wire:
+            return True
+        key = a_wire._find_key()
+        return key is not None and self.edges.get(key) == a_wire
+
+    def __iter__(self) -> Iterator[Wire]:
+        return iter(self.edges.values())
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def __repr__(self) -> str:
+        return f"WireSet({list(self.edges.values())!r})"
+
+    def add(self, a_wire: Wire) -> None:
+        self.edges.setdefault(_set_key(a_wire), a_wire)
+
+    def discard(self, a_wire: Wire) -> None:
+        key = a_wire._find_key()
+        if key is not None and self.edges.get(key) == a_wire:
+            del self.edges[key]
+
+    def clear(self) -> None:
+        self.edges.clear()
+
+def _set_key(a_wire: Wire) -> int:
+    ''' 为加入实验的导线分配key '''
+    key = a_wire._key = _wire_key(a_wire._source, a_wire._source_label, a_wire._target, a_wire._target_label)
+    return key
+
+# 添加导线, 同时维护元件到导线的邻接表
+def _add_wire(experiment, a_wire: Wire) -> None:
+    key = _set_key(a_wire)
+    edges = experiment.Wires.edges
+    if key in edges:
+        return
+    edges[key] = a_wire
+    elements_Wires = experiment.elements_Wires
+    # 只保存导线的key(int), 这样的dict不会被gc追踪
+    for element in (a_wire._source, a_wire._target):
+        wires = elements_Wires.get(element)
+        if wires is None:
+            elements_Wires[element] = {key: None}
+        else:
+            wires[key] = None
+    if experiment.netlist is not None:
+        experiment.netlist._add(a_wire)
+
+# 删除导线, 同时维护元件到导线的邻接表
+def _remove_wire(experiment, key: int) -> None:
+    a_wire = experiment.Wires.edges.pop(key)
+    elements_Wires = experiment.elements_Wires
+    for element in (a_wire._source, a_wire._target):
+        wires = elements_Wires.get(element)
+        if wires is not None:
+            wires.pop(key, None)
+            if len(wires) == 0:
+                del elements_Wires[element]
+    if experiment.netlist is not None:
+        experiment.netlist._remove(key)
+
 # 检查函数参数是否是导线
 def _check_typeWire(func: Callable):
     def result(SourcePin: Pin, TargetPin: Pin, *args, **kwargs) -> None:
@@ -118,32 +277,39 @@ def _check_typeWire(func: Callable):
         ):
             raise TypeError
 
-        if get_Experiment().experiment_type != ExperimentType.Circuit:
+        _Expe = get_Experiment()
+        if _Expe.experiment_type != ExperimentType.Circuit:
             raise errors.ExperimentTypeError
 
-        func(SourcePin, TargetPin, *args, **kwargs)
+        func(_Expe, SourcePin, TargetPin, *args, **kwargs)
 
     return result
 
 # 连接导线
 @_check_typeWire
-def crt_Wire(SourcePin: Pin, TargetPin: Pin, color: str = "blue") -> None:
-    get_Experiment().Wires.add(Wire(SourcePin, TargetPin, color))
+def crt_Wire(_Expe, SourcePin: Pin, TargetPin: Pin, color: str = "blue") -> None:
+    _add_wire(_Expe, Wire(SourcePin, TargetPin, color))
 
 # 删除导线
 @_check_typeWire
-def del_Wire(SourcePin: Pin, TargetPin: Pin) -> None:
-    temp = Wire(SourcePin, TargetPin)
-    if temp in get_Experiment().Wires:
-        get_Experiment().Wires.remove(temp)
-    else:
-        get_Experiment().Wires.remove(Wire(TargetPin, SourcePin))
+def del_Wire(_Expe, SourcePin: Pin, TargetPin: Pin) -> None:
+    if SourcePin.element_self.experiment is not _Expe or TargetPin.element_self.experiment is not _Expe:
+        raise KeyError(f"{SourcePin} - {TargetPin}")
+    if SourcePin == TargetPin:
+        raise errors.ExperimentError()
+    key = _find_wire_key(SourcePin.element_self, SourcePin.pinLabel, TargetPin.element_self, TargetPin.pinLabel)
+    if key is None:
+        raise KeyError(f"{SourcePin} - {TargetPin}")
+    _remove_wire(_Expe, key)
 
 # 删除所有导线
 def clear_Wires() -> None:
     if get_Experiment().experiment_type != ExperimentType.Circuit:
         raise errors.ExperimentTypeError
     get_Experiment().Wires.clear()
+    get_Experiment().elements_Wires.clear()
+    if get_Experiment().netlist is not None:
+        get_Experiment().netlist.clear()
 
 # 获取当前导线数
 def count_Wires() -> int:
@@ -29,7 +29,8 @@ class _ElectromagnetismMeta(type):
         self.__init__(x, y, z, *args, **kwargs)
         assert hasattr(self, "data") and isinstance(self.data, dict)
 
-        self.data["Identifier"] = _tools.randString(32)
+        self.data["Identifier"] = _Expe.identifier_Allocator.allocate()
+        _Expe.elements_Identifier[self.data["Identifier"]] = self
         self.set_position(x, y, z)
         self.set_rotation(0, 0, 0)
 
@@ -1,11 +1,56 @@
 # -*- coding: utf-8 -*-
+import gc
+import copy
+
 from physicsLab import _tools
 from physicsLab import errors
 from physicsLab import circuit
+from physicsLab import celestial
+from physicsLab import electromagnetism
 from physicsLab.elementBase import ElementBase
+from physicsLab.circuit.elements._circuitbase import CircuitBase
+from physicsLab.celestial._planetbase import PlanetBase
+from physicsLab.electromagnetism._electromagnetismBase import ElectromagnetismBase
 from physicsLab.enums import ExperimentType
 from physicsLab.experiment import get_Experiment
-from physicsLab.typehint import numType, Optional, Union, List
+from physicsLab.typehint import numType, Optional, Union, List, Dict, Iterable
+
+def _normalize_name(name: str) -> str:
+    ''' ModelID与类名的对应规则: 如"Yes Gate" -> "Yes_Gate" '''
+    return name.strip().replace(' ', '_').replace('-', '_')
+
+def _build_registry(module, base: type, aliases: Dict[str, str]) -> Dict[str, type]:
+    ''' 收集module中所有元件类, key为类名与规范化的ModelID '''
+    registry = {name: cls for name, cls in vars(module).items()
+                if isinstance(cls, type) and issubclass(cls, base) and cls is not base}
+    for model_id, name in aliases.items():
+        registry[_normalize_name(model_id)] = registry[name]
+    return registry
+
+# key: 实验类型, value: {类名或规范化的ModelID: 元件的类}, 在导入时构造一次
+_REGISTRY: Dict[ExperimentType, Dict[str, type]] = {
+    ExperimentType.Circuit: _build_registry(circuit, CircuitBase, {
+        # ModelID与类名不对应的元件
+        "555 Timer": "NE555", "8bit Input": "eight_bit_Input", "8bit Display": "eight_bit_Display",
+    }),
+    ExperimentType.Celestial: _build_registry(celestial, PlanetBase, {}),
+    ExperimentType.Electromagnetism: _build_registry(electromagnetism, ElectromagnetismBase, {}),
+}
+# 未规范化的名字(如存档中的ModelID)的缓存, 读取存档时不必每次规范化
+_RAW_NAMES: Dict[ExperimentType, Dict[str, type]] = {key: {} for key in _REGISTRY}
+
+def _element_class(experiment_type: ExperimentType, name: str) -> type:
+    ''' 通过ModelID或类名获取元件的类 '''
+    raw_names = _RAW_NAMES.get(experiment_type)
+    if raw_names is None:
+        raise errors.InternalError
+    cls = raw_names.get(name)
+    if cls is None:
+        cls = _REGISTRY[experiment_type].get(_normalize_name(name))
+        if cls is None:
+            raise errors.ElementNotExistError(f"unknown element {name}")
+        raw_names[name] = cls
+    return cls
 
 def crt_Element(name: str,
                 x: numType = 0,
@@ -15,7 +60,9 @@ def crt_Element(name: str,
                 *args,
                 **kwargs
 ) -> ElementBase:
-    ''' 创建原件，本质上仍然是实例化 '''
+    ''' 创建原件，本质上仍然是实例化
+        @param name: 元件的ModelID或类名
+    '''
     if not (isinstance(name, str)
             and isinstance(x, (int, float))
             and isinstance(y, (int, float))
@@ -23,26 +70,152 @@ def crt_Element(name: str,
     ):
         raise TypeError
 
-    name = name.strip().replace(' ', '_').replace('-', '_')
     x, y, z = _tools.roundData(x, y, z) # type: ignore
     _Expe = get_Experiment()
+    cls = _element_class(_Expe.experiment_type, name)
     if _Expe.experiment_type == ExperimentType.Circuit:
-        if (name == '555_Timer'):
-            return circuit.NE555(x, y, z, elementXYZ)
-        elif (name == '8bit_Input'):
-            return circuit.eight_bit_Input(x, y, z, elementXYZ)
-        elif (name == '8bit_Display'):
-            return circuit.eight_bit_Display(x, y, z, elementXYZ)
+        return cls(x, y, z, elementXYZ, *args, **kwargs)
+    else:
+        return cls(x, y, z)
+
+def _round_vectors(vectors) -> List[tuple]:
+    ''' 检查并四舍五入一组三维坐标, 与roundData相同 '''
+    if hasattr(vectors, "tolist"): # numpy数组
+        vectors = vectors.tolist()
+    result = []
+    for vector in vectors:
+        if len(vector) != 3:
+            raise TypeError
+        x, y, z = vector
+        if not isinstance(x, (int, float)) or \
+                not isinstance(y, (int, float)) or \
+                not isinstance(z, (int, float)):
+            raise TypeError
+        result.append((round(x, 4), round(y, 4), round(z, 4)))
+    return result
+
+def _is_vector(value) -> bool:
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    return len(value) == 3 and all(isinstance(val, (int, float)) for val in value)
+
+def crt_Elements(model: Union[str, type],
+                 positions: Iterable,
+                 rotations: Optional[Iterable] = None,
+                 elementXYZ: Optional[bool] = None,
+                 *args,
+                 **kwargs
+) -> List[ElementBase]:
+    ''' 批量创建同一种原件, 结果与逐个实例化相同, 但快得多
+        @param model: 元件的类或名称(与crt_Element相同)
+        @param positions: 元件的坐标, [(x, y, z), ...]或shape为(n, 3)的numpy数组
+        @param rotations: 元件的角度, 所有元件共用的(x_r, y_r, z_r)或与positions一一对应, 默认与set_rotation()相同
+        @param elementXYZ: 是否为元件坐标系
+        其余参数传给元件的__init__, 所有元件共用
+        所有坐标都通过检查后才会创建元件
+    '''
+    if not isinstance(model, (str, type)) or not isinstance(elementXYZ, (bool, type(None))):
+        raise TypeError
+
+    _Expe = get_Experiment()
+    if isinstance(model, str):
+        cls = _element_class(_Expe.experiment_type, model)
+    else:
+        cls = model
+    if not issubclass(cls, ElementBase):
+        raise TypeError
+
+    points = _round_vectors(positions)
+    rots: Optional[List[tuple]] = None
+    if rotations is not None:
+        if _is_vector(rotations):
+            rots = _round_vectors([rotations])
         else:
-            return eval(f"circuit.{name}({x}, {y}, {z}, {elementXYZ}, *{args}, **{kwargs})")
-    elif _Expe.experiment_type == ExperimentType.Celestial:
-        from physicsLab import celestial
-        return eval(f"celestial.{name}({x}, {y}, {z})")
-    elif _Expe.experiment_type == ExperimentType.Electromagnetism:
-        from physicsLab import electromagnetism
-        return eval(f"electromagnetism.{name}({x}, {y}, {z})")
+            rots = _round_vectors(rotations)
+            if len(rots) != len(points):
+                raise ValueError("rotations and positions must have the same length")
+
+    if _Expe.experiment_type != ExperimentType.Circuit:
+        # 天体与电与磁实验的元件很少, 逐个实例化
+        elements = [cls(x, y, z, *args, **kwargs) for x, y, z in points]
+        if rots is not None:
+            for element, rot in zip(elements, rots):
+                element.set_rotation(*rot) # type: ignore
+        return elements
+
+    from physicsLab.circuit import elementXYZ as _elementXYZ
+    from physicsLab._sharedData import ElementData, share_template
+    if not issubclass(cls, CircuitBase):
+        raise errors.ExperimentTypeError
+    if len(points) == 0:
+        return []
+
+    # 只调用一次__init__, 其余元件复制其结果
+    prototype = cls.__new__(cls)
+    prototype.experiment = _Expe
+    prototype.is_elementXYZ = False
+    prototype.__init__(*points[0], elementXYZ, *args, **kwargs)
+    template = share_template(prototype.data)
+    mutable_keys = [key for key, val in template.items() if type(val) in (dict, list)]
+    attrs = {key: val for key, val in prototype.__dict__.items()
+             if key not in ("experiment", "is_elementXYZ", "data", "_slot")}
+
+    is_xyz = elementXYZ is True or elementXYZ is None and _elementXYZ.is_elementXYZ()
+    if is_xyz:
+        translated = _round_vectors(_elementXYZ.xyzTranslate_array(points, cls.is_bigElement))
     else:
-        raise errors.InternalError
+        translated = points
+    if rots is None:
+        x_r, y_r, z_r = cls.set_rotation.__defaults__ # type: ignore
+        rots = [(x_r, y_r, z_r)]
+    rotation_strs = [f"{x_r},{z_r},{y_r}" for x_r, y_r, z_r in rots]
+    if len(rotation_strs) == 1: # 所有元件共用同一个角度
+        rotation_strs *= len(points)
+
+    identifiers = _Expe.identifier_Allocator.allocate_many(len(points))
+    elements_Identifier = _Expe.elements_Identifier
+
+    position = _tools.position
+    new_position = tuple.__new__
+    elements_Position = _Expe.elements_Position
+    spatial_Index = _Expe.spatial_Index
+    element_Table = _Expe.element_Table
+    elements = []
+    # 创建大量对象时会频繁触发分代gc, 而新建的元件都不会被回收
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i, point in enumerate(points):
+            n_x, n_y, n_z = translated[i]
+            # 模板中已有这些key, 因此key的顺序不变
+            data = ElementData(template, Identifier=identifiers[i],
+                               Position=f"{n_x},{n_z},{n_y}", Rotation=rotation_strs[i])
+            for key in mutable_keys:
+                dict.__setitem__(data, key, copy.deepcopy(dict.__getitem__(data, key)))
+
+            obj = cls.__new__(cls)
+            key = new_position(position, point) # 即position(x, y, z)
+            obj.__dict__ = {"experiment": _Expe, "is_elementXYZ": is_xyz, "data": data,
+                            "_position": key, "_position_key": key}
+            if attrs:
+                obj.__dict__.update(copy.deepcopy(attrs))
+
+            bucket = elements_Position.get(key)
+            if bucket is None:
+                elements_Position[key] = [obj]
+            else:
+                bucket.append(obj)
+            if element_Table is not None:
+                obj.data = element_Table.append(data)
+            elements.append(obj)
+        spatial_Index.update_many(elements, translated)
+        elements_Identifier.update(zip(identifiers, elements))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    _Expe.Elements.extend(elements)
+    return elements
 
 def get_Element(x: Optional[numType] = None,
                 y: Optional[numType] = None,
@@ -59,6 +232,11 @@ def get_Element(x: Optional[numType] = None,
                 not isinstance(z, (int, float)):
             raise TypeError
 
+        # read(lazy=True)时, 只有已构造的元件在elements_Position中
+        from physicsLab._lazyElements import LazyElements
+        if isinstance(_Expe.Elements, LazyElements):
+            _Expe.Elements.load_all()
+
         position = _tools.roundData(x, y, z)
         if position not in _Expe.elements_Position.keys():
             if "defualt" in kwargs:
@@ -89,37 +267,67 @@ def get_Element(x: Optional[numType] = None,
     else:
         raise TypeError
 
-def del_Element(element: ElementBase) -> None:
-    ''' 删除原件
-        @param element: 三大实验的元件
-    '''
+def _del_element_index(_Expe, element: ElementBase) -> None:
+    ''' 删除元件在导线, Identifier, 坐标索引中的引用, 耗时只与该元件连接的导线数有关 '''
     if not isinstance(element, ElementBase):
         raise TypeError
 
-    identifier = element.data["Identifier"] # type: ignore
+    if element.experiment is not _Expe:
+        raise errors.ExperimentError("element is not belong to current experiment")
 
-    _Expe = get_Experiment()
+    # 删除与该元件相连的导线
+    wires = _Expe.elements_Wires.pop(element, None)
+    if wires is not None:
+        from physicsLab.circuit.wire import _remove_wire
+        edges = _Expe.Wires.edges
+        for key in wires:
+            if key in edges:
+                _remove_wire(_Expe, key)
+    slot = element.__dict__.get("_slot")
+    if slot is not None and slot < len(_Expe.slot_Elements) and _Expe.slot_Elements[slot] is element:
+        _Expe.slot_Elements[slot] = None
+        _Expe.free_Slots.append(slot)
 
-    res_Wires = set()
-    for a_wire in _Expe.Wires:
-        if a_wire.Source.element_self.data["Identifier"] == identifier or \
-           a_wire.Target.element_self.data["Identifier"] == identifier:
-           continue
-
-        res_Wires.add(a_wire)
-    _Expe.Wires = res_Wires
+    _Expe.elements_Identifier.pop(element.data["Identifier"], None)
+    _Expe.spatial_Index.remove(element)
+    if _Expe.element_Table is not None:
+        _Expe.element_Table.free(element.data)
 
     # 删除elements_Position中的引用
-    for elements in _Expe.elements_Position.values():
-        if element in elements:
-            elements.remove(element)
-            break
-
-    # 删除elements_Index中的引用
-    for element in _Expe.Elements:
-        if element is element:
+    self_list = _Expe.elements_Position.get(element._position_key)
+    if self_list is not None and element in self_list:
+        self_list.remove(element)
+        if len(self_list) == 0:
+            del _Expe.elements_Position[element._position_key]
+
+def del_Element(element: ElementBase) -> None:
+    ''' 删除原件
+        @param element: 三大实验的元件
+    '''
+    _Expe = get_Experiment()
+    _del_element_index(_Expe, element)
+    _Expe.Elements.remove(element)
+
+def del_Elements(elements: Iterable[ElementBase]) -> None:
+    ''' 批量删除原件
+        @param elements: 三大实验的元件
+    '''
+    _Expe = get_Experiment()
+    to_delete = set()
+    for element in elements:
+        if element in to_delete:
+            continue
+        _del_element_index(_Expe, element)
+        to_delete.add(element)
+
+    if len(to_delete) == 0:
+        return
+    from ._elementList import ElementList
+    if isinstance(_Expe.Elements, ElementList):
+        for element in to_delete:
             _Expe.Elements.remove(element)
-            break
+    else:
+        _Expe.Elements[:] = [element for element in _Expe.Elements if element not in to_delete]
 
 # 原件的数量
 def count_Elements() -> int:
@@ -129,5 +337,16 @@ def count_Elements() -> int:
 def clear_Elements() -> None:
     _Expe = get_Experiment()
     _Expe.Wires.clear()
+    _Expe.elements_Wires.clear()
+    _Expe.slot_Elements.clear()
+    _Expe.free_Slots.clear()
+    if _Expe.netlist is not None:
+        _Expe.netlist.clear()
     _Expe.Elements.clear()
     _Expe.elements_Position.clear()
+    _Expe.elements_Identifier.clear()
+    _Expe.spatial_Index.clear()
+    if _Expe.element_Table is not None:
+        # 已有元件的data仍是旧表的视图, 不受影响
+        from .circuit.elementTable import ElementTable
+        _Expe.element_Table = ElementTable()
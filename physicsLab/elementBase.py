@@ -19,9 +19,12 @@ class ElementBase:
         assert hasattr(self, 'experiment')
         _Expe = self.experiment
 
-        for self_list in _Expe.elements_Position.values():
-            if self in self_list:
-                self_list.remove(self)
+        # 从原先所在的坐标中移除
+        self_list = _Expe.elements_Position.get(getattr(self, "_position_key", None))
+        if self_list is not None and self in self_list:
+            self_list.remove(self)
+            if len(self_list) == 0:
+                del _Expe.elements_Position[self._position_key]
 
         assert hasattr(self, 'data')
         self.data['Position'] = f"{x},{z},{y}" # type: ignore -> has attr .data
@@ -31,6 +34,9 @@ class ElementBase:
             _Expe.elements_Position[self._position].append(self)
         else:
             _Expe.elements_Position[self._position] = [self]
+        # 元件所在的elements_Position的key
+        self._position_key = self._position
+        _Expe.spatial_Index.update(self, x, y, z)
 
         return self
 
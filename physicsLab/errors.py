@@ -131,6 +131,10 @@ class WarningError(Exception):
 class ElementNotExistError(Exception):
     pass
 
+class SimulationError(Exception):
+    ''' 离线仿真失败, 如电路振荡 '''
+    pass
+
 class ResponseFail(Exception):
     ''' 返回消息体失败 '''
     def __init__(self, err_msg: str):
@@ -4,23 +4,29 @@ import json
 import copy
 import time
 import gzip
+import shutil
 import requests
 import platform
 import tempfile
+import contextvars
 
 from datetime import datetime
+from collections.abc import MutableSequence
 from enum import unique, Enum
 
 from physicsLab import plAR
 from physicsLab import  _tools
 from physicsLab import errors
+from physicsLab import _savIO
+from physicsLab import _savCatalog
+from physicsLab import _jsonBackend
 from physicsLab import savTemplate
 from physicsLab import _colorUtils
 from .web import User, _check_response
 from .enums import Category, Tag
 from .savTemplate import Generate
 from .enums import ExperimentType
-from .typehint import Union, Optional, List, Dict, numType, Self
+from .typehint import Union, Optional, List, Dict, Tuple, numType, Self
 
 def id_to_time(id: str) -> datetime:
     ''' 从 用户id/实验id 中获取其对应的时间
@@ -28,8 +34,45 @@ def id_to_time(id: str) -> datetime:
     seconds = int(id[0:8], 16)
     return datetime.fromtimestamp(seconds)
 
+# 实验栈保存在ContextVar中, 每个线程与asyncio的task都有自己的实验栈
+# 栈以tuple保存, push与pop时重新绑定, 因此task不会修改创建它的上下文中的栈
+_stack_var: contextvars.ContextVar[Tuple["Experiment", ...]] = \
+    contextvars.ContextVar("physicsLab_stack_Experiment", default=())
+
+class _ContextStack(MutableSequence):
+    ''' 当前上下文中的实验栈, 可以像list一样使用 '''
+    def __len__(self) -> int:
+        return len(_stack_var.get())
+
+    def __getitem__(self, i):
+        res = _stack_var.get()[i]
+        if isinstance(i, slice):
+            return list(res)
+        return res
+
+    def __setitem__(self, i, value) -> None:
+        data = list(_stack_var.get())
+        data[i] = value
+        _stack_var.set(tuple(data))
+
+    def __delitem__(self, i) -> None:
+        data = list(_stack_var.get())
+        del data[i]
+        _stack_var.set(tuple(data))
+
+    def insert(self, i: int, value: "Experiment") -> None:
+        data = list(_stack_var.get())
+        data.insert(i, value)
+        _stack_var.set(tuple(data))
+
+    def clear(self) -> None:
+        _stack_var.set(())
+
+    def __repr__(self) -> str:
+        return repr(list(_stack_var.get()))
+
 class stack_Experiment:
-    data: List["Experiment"] = []
+    data: "MutableSequence[Experiment]" = _ContextStack()
 
     def __new__(cls):
         return cls
@@ -39,19 +82,20 @@ class stack_Experiment:
         if not isinstance(data, Experiment):
             raise TypeError
 
-        cls.data.append(data)
+        _stack_var.set(_stack_var.get() + (data,))
 
     @classmethod
     def top(cls) -> "Experiment":
-        if len(cls.data) == 0:
+        data = _stack_var.get()
+        if len(data) == 0:
             raise errors.ExperimentError("no experiment can be operated(experiment stack is empty)")
 
-        return cls.data[-1]
+        return data[-1]
 
     @classmethod
     def pop(cls) -> "Experiment":
         res = cls.top()
-        cls.data.pop()
+        _stack_var.set(_stack_var.get()[:-1])
         return res
 
 def get_Experiment() -> "Experiment":
@@ -89,28 +133,92 @@ class Experiment:
         self.is_readed: bool = False
 
         self.SAV_PATH: Optional[str] = None # 存档的完整路径
+        from .elementBase import ElementBase
         # 通过坐标索引元件
         self.elements_Position: Dict[tuple, list] = {}  # key: self._position, value: List[self...]
-        # 通过index（元件生成顺序）索引元件
-        from .elementBase import ElementBase
-        self.Elements:List[ElementBase] = []
+        # 通过index（元件生成顺序）索引元件, 删除元件的开销为O(1), 见ElementList
+        from ._elementList import ElementList
+        self.Elements: ElementList = ElementList()
+        # 通过Identifier索引元件
+        self.elements_Identifier: Dict[str, ElementBase] = {}
+        # 为新元件分配不与elements_Identifier重复的Identifier
+        from ._identifiers import IdentifierAllocator
+        self.identifier_Allocator = IdentifierAllocator(self)
+        # 与元件相连的导线(仅电学实验), key: 元件, value: Dict[导线的key, None]
+        self.elements_Wires: Dict[ElementBase, dict] = {}
+        # 连接了导线的元件, 下标为元件的slot, 导线的key由slot与pinLabel组成
+        self.slot_Elements: List[Optional[ElementBase]] = []
+        # 被删除的元件空出的slot, 之后连接导线的元件优先使用
+        self.free_Slots: List[int] = []
+        # read(lazy=True)时尚未读取的导线所在的LazyElements
+        self.__lazy_Wires = None
+        # 元件坐标(物实坐标系)的空间索引, 支持范围查询与最近邻查询
+        from .spatialIndex import SpatialIndex
+        self.spatial_Index: SpatialIndex = SpatialIndex()
+        # 列式存储的元件表(仅电学实验), 见use_ElementTable
+        self.element_Table = None
+        # 导线的网表(仅电学实验), 见use_Netlist
+        self.netlist = None
 
         if sav_name is not None:
             self.open_or_crt(sav_name, experiment_type)
 
+    @property
+    def Wires(self):
+        ''' 存档对应的导线(仅电学实验), WireSet '''
+        if self.__lazy_Wires is not None:
+            self.__load_lazy_Wires()
+        return self.__Wires
+
+    @Wires.setter
+    def Wires(self, wires: set) -> None:
+        self.__Wires = wires
+
+    @property
+    def elements_Wires(self) -> dict:
+        if self.__lazy_Wires is not None:
+            self.__load_lazy_Wires()
+        return self.__elements_Wires
+
+    @elements_Wires.setter
+    def elements_Wires(self, elements_wires: dict) -> None:
+        self.__elements_Wires = elements_wires
+
+    def __load_lazy_Wires(self) -> None:
+        lazy_elements = self.__lazy_Wires
+        self.__lazy_Wires = None
+        self.__read_wire(lazy_elements.load_wires())
+
+    def __load_lazy(self) -> None:
+        ''' 构造read(lazy=True)时尚未构造的元件与导线, 之后不再需要映射存档 '''
+        from ._lazyElements import LazyElements
+        if isinstance(self.Elements, LazyElements):
+            if self.__lazy_Wires is not None:
+                self.__load_lazy_Wires()
+            self.Elements.load_all()
+            self.Elements.close()
+            from ._elementList import ElementList
+            self.Elements = ElementList(self.Elements)
+
     def get_element_from_identifier(self, identifier: str):
         ''' 通过 原件的["Identifier"]获取元件的引用 '''
-        for element in self.Elements:
-            assert hasattr(element, "data")
-            if element.data["Identifier"] == identifier: # type: ignore -> has attr .data
-                return element
-        raise errors.ExperimentError
+        try:
+            return self.elements_Identifier[identifier]
+        except KeyError:
+            pass
+        # read(lazy=True)时元件可能尚未构造
+        from ._lazyElements import LazyElements
+        if isinstance(self.Elements, LazyElements):
+            self.Elements.build_identifier(identifier)
+            if identifier in self.elements_Identifier:
+                return self.elements_Identifier[identifier]
+        raise errors.ExperimentError(f"element {identifier} do not exist")
 
     def __read_CameraSave(self, camera_save: str) -> None:
-        self.CameraSave = json.loads(camera_save)
-        temp = eval(f"({self.CameraSave['VisionCenter']})")
+        self.CameraSave = _jsonBackend.loads(camera_save)
+        temp = _tools.parse_vector(self.CameraSave['VisionCenter'])
         self.VisionCenter: _tools.position = _tools.position(temp[0], temp[2], temp[1]) # x, z, y
-        temp = eval(f"({self.CameraSave['TargetRotation']})")
+        temp = _tools.parse_vector(self.CameraSave['TargetRotation'])
         self.TargetRotation: _tools.position = _tools.position(temp[0], temp[2], temp[1]) # x, z, y
 
     def __open(self) -> None:
@@ -126,7 +234,8 @@ class Experiment:
             self.is_elementXYZ: bool = False
             # 元件坐标系的坐标原点
             self.elementXYZ_origin_position: _tools.position = _tools.position(0, 0, 0)
-            self.Wires: set = set() # Set[Wire] # 存档对应的导线
+            from .circuit.wire import WireSet
+            self.Wires: WireSet = WireSet() # 存档对应的导线
             # 存档对应的StatusSave, 存放实验元件，导线（如果是电学实验的话）
             self.StatusSave: dict = {"SimulationSpeed": 1.0, "Elements": Generate, "Wires": Generate}
 
@@ -220,7 +329,8 @@ class Experiment:
             # 元件坐标系的坐标原点
             self.elementXYZ_origin_position: _tools.position = _tools.position(0, 0, 0)
             self.PlSav: dict = copy.deepcopy(savTemplate.Circuit)
-            self.Wires: set = set() # Set[Wire] # 存档对应的导线
+            from .circuit.wire import WireSet
+            self.Wires: WireSet = WireSet() # 存档对应的导线
             # 存档对应的StatusSave, 存放实验元件，导线（如果是电学实验的话）
             self.StatusSave: dict = {"SimulationSpeed": 1.0, "Elements": Generate, "Wires": Generate}
             self.CameraSave: dict = {
@@ -280,6 +390,7 @@ class Experiment:
         elif force_crt and search is not None:
             path = os.path.join(Experiment.SAV_ROOT_DIR, search)
             os.remove(path)
+            _savCatalog.discard(Experiment.SAV_ROOT_DIR, search)
             if os.path.exists(path.replace(".sav", ".jpg")): # 用存档生成的实验无图片，因此可能删除失败
                 os.remove(path.replace(".sav", ".jpg"))
 
@@ -319,52 +430,63 @@ class Experiment:
         assert isinstance(_elements, list)
 
         for element in _elements:
-            position = eval(f"({element['Position']})")
-            x, y, z = position[0], position[2], position[1]
-
-            # 实例化对象
-            from physicsLab.element import crt_Element
-
-            if self.experiment_type == ExperimentType.Circuit:
-                if element["ModelID"] == "Simple Instrument":
-                    from .circuit.elements.otherCircuit import Simple_Instrument
-                    obj = Simple_Instrument(
-                        x, y, z, elementXYZ=False,
-                        instrument=int(element["Properties"]["乐器"]),
-                        pitch=int(element["Properties"]["音高"]),
-                        velocity=element["Properties"]["音量"],
-                        rated_oltage=element["Properties"]["额定电压"],
-                        is_ideal_model=bool(element["Properties"]["理想模式"]),
-                        is_single=bool(element["Properties"]["脉冲"])
-                    )
-                    for attr, val in element["Properties"].items():
-                        if attr.startswith("音高"):
-                            obj.add_note(int(val))
-                else:
-                    obj = crt_Element(element["ModelID"], x, y, z, elementXYZ=False)
-                    obj.data["Properties"] = element["Properties"]
-                    obj.data["Properties"]["锁定"] = 1.0
-                # 设置角度信息
-                rotation = eval(f'({element["Rotation"]})')
-                r_x, r_y, r_z = rotation[0], rotation[2], rotation[1]
-                obj.set_rotation(r_x, r_y, r_z)
-                obj.data['Identifier'] = element['Identifier']
-
-            elif self.experiment_type == ExperimentType.Celestial:
-                obj = crt_Element(element["Model"], x, y, z)
-                obj.data = element
-            elif self.experiment_type == ExperimentType.Electromagnetism:
-                obj = crt_Element(element["ModelID"], x, y, z)
-                obj.data = element
+            self.__read_one_element(element)
+
+    def __read_one_element(self, element: dict):
+        ''' 通过存档中元件的dict构造元件 '''
+        position = _tools.parse_vector(element['Position'])
+        x, y, z = position[0], position[2], position[1]
+
+        # 实例化对象, 通过元件类的注册表获取ModelID对应的类
+        from physicsLab.element import _element_class
+
+        if self.experiment_type == ExperimentType.Circuit:
+            if element["ModelID"] == "Simple Instrument":
+                from .circuit.elements.otherCircuit import Simple_Instrument
+                obj = Simple_Instrument(
+                    x, y, z, elementXYZ=False,
+                    instrument=int(element["Properties"]["乐器"]),
+                    pitch=int(element["Properties"]["音高"]),
+                    velocity=element["Properties"]["音量"],
+                    rated_oltage=element["Properties"]["额定电压"],
+                    is_ideal_model=bool(element["Properties"]["理想模式"]),
+                    is_single=bool(element["Properties"]["脉冲"])
+                )
+                for attr, val in element["Properties"].items():
+                    if attr.startswith("音高"):
+                        obj.add_note(int(val))
             else:
-                raise errors.InternalError
+                obj = _element_class(self.experiment_type, element["ModelID"])(x, y, z, False)
+                obj.data["Properties"] = element["Properties"]
+                obj.data["Properties"]["锁定"] = 1.0
+            # 设置角度信息
+            rotation = _tools.parse_vector(element["Rotation"])
+            r_x, r_y, r_z = rotation[0], rotation[2], rotation[1]
+            obj.set_rotation(r_x, r_y, r_z)
+            del self.elements_Identifier[obj.data["Identifier"]]
+            obj.data['Identifier'] = element['Identifier']
+
+        elif self.experiment_type == ExperimentType.Celestial:
+            obj = _element_class(self.experiment_type, element["Model"])(x, y, z)
+            del self.elements_Identifier[obj.data["Identifier"]]
+            obj.data = element
+        elif self.experiment_type == ExperimentType.Electromagnetism:
+            obj = _element_class(self.experiment_type, element["ModelID"])(x, y, z)
+            del self.elements_Identifier[obj.data["Identifier"]]
+            obj.data = element
+        else:
+            raise errors.InternalError
+        # 使用存档中原有的Identifier
+        self.elements_Identifier[obj.data["Identifier"]] = obj
+        return obj
 
     def __read_wire(self, _wires: list) -> None:
         assert self.experiment_type == ExperimentType.Circuit
 
-        from .circuit.wire import Wire, Pin
+        from .circuit.wire import Wire, Pin, _add_wire
         for wire_dict in _wires:
-            self.Wires.add(
+            _add_wire(
+                self,
                 Wire(
                     Pin(self.get_element_from_identifier(wire_dict["Source"]), wire_dict["SourcePin"]),
                     Pin(self.get_element_from_identifier(wire_dict["Target"]), wire_dict["TargetPin"]),
@@ -372,8 +494,13 @@ class Experiment:
                 )
             )
 
-    def read(self, warning_status: Optional[bool] = None) -> Self:
-        ''' 读取实验已有状态 '''
+    def read(self, warning_status: Optional[bool] = None, lazy: bool = False) -> Self:
+        ''' 读取实验已有状态
+            @param lazy: 按需读取元件, Elements中的元件在被索引或遍历时才会构造, 导线在第一次使用时才会读取
+                         存档通过mmap映射, 只读取少数元件时不需要将整个存档读入内存
+        '''
+        if not isinstance(lazy, bool):
+            raise TypeError
         if not self.is_open_or_crt:
             raise errors.ExperimentNotOpenError
         if self.is_readed:
@@ -384,7 +511,10 @@ class Experiment:
             errors.warning("can not read because you create this experiment", warning_status)
             return self
 
-        status_sav = json.loads(self.PlSav["Experiment"]["StatusSave"])
+        if lazy and self.__read_lazy():
+            return self
+
+        status_sav = _jsonBackend.loads(_savIO.load_status_save(self.PlSav["Experiment"]["StatusSave"]))
 
         if self.experiment_type == ExperimentType.Circuit:
             self.__read_element(status_sav["Elements"])
@@ -400,6 +530,23 @@ class Experiment:
 
         return self
 
+    def __read_lazy(self) -> bool:
+        ''' 建立存档中元件的索引, 无法按需读取(如StatusSave不在存档文件中)时返回False '''
+        status_save = self.PlSav["Experiment"]["StatusSave"]
+        if not isinstance(status_save, _savIO.LazyStatusSave) \
+                or status_save.encoding not in ("utf-8", "utf-8-sig") or len(self.Elements) != 0:
+            return False
+        try:
+            index = _savIO.StatusSaveIndex(status_save.path)
+        except (json.JSONDecodeError, ValueError, OSError):
+            return False
+
+        from ._lazyElements import LazyElements
+        self.Elements = LazyElements(self, index, self.__read_one_element)
+        if self.experiment_type == ExperimentType.Circuit:
+            self.__lazy_Wires = self.Elements
+        return True
+
     def read_from_web(self,
                       id: str,
                       category: Category,
@@ -426,7 +573,7 @@ class Experiment:
         _summary = user.get_summary(id, category)["Data"]
         if not no_read_experiment_status:
             _experiment = user.get_experiment(_summary["ContentID"])["Data"]
-            _StatusSave = json.loads(_experiment["StatusSave"])
+            _StatusSave = _jsonBackend.loads(_experiment["StatusSave"])
             self.__read_CameraSave(_experiment["CameraSave"])
             self.__read_element(_StatusSave["Elements"])
             self.__read_wire(_StatusSave["Wires"])
@@ -436,7 +583,8 @@ class Experiment:
         self.PlSav["Summary"] = _summary
         return self
 
-    def __write(self) -> None:
+    def __write_header(self) -> None:
+        ''' 更新存档中除StatusSave以外的内容 '''
         self.PlSav["Experiment"]["CreationDate"] = int(time.time() * 1000)
         self.PlSav["Summary"]["CreationDate"] = int(time.time() * 1000)
 
@@ -444,18 +592,25 @@ class Experiment:
         self.CameraSave["TargetRotation"] = f"{self.TargetRotation.x},{self.TargetRotation.z},{self.TargetRotation.y}"
         self.PlSav["Experiment"]["CameraSave"] = json.dumps(self.CameraSave)
 
+    def __stream_StatusSave(self) -> dict:
+        ''' 获取StatusSave, 其中的元件与导线为逐个产生的StreamList/StreamDict '''
+        status_save = dict(self.StatusSave)
         if self.experiment_type == ExperimentType.Circuit:
-            self.StatusSave["Elements"] = [a_element.data for a_element in self.Elements]
-            self.StatusSave["Wires"] = [a_wire.release() for a_wire in self.Wires]
+            from .circuit.elementTable import to_save_dict
+            status_save["Elements"] = _savIO.StreamList(to_save_dict(a_element.data) for a_element in self.Elements)
+            status_save["Wires"] = _savIO.StreamList(a_wire.release() for a_wire in self.Wires)
         elif self.experiment_type == ExperimentType.Celestial:
-            self.StatusSave["Elements"] = {a_element.data["Identifier"] : a_element.data
-                                           for a_element in self.Elements}
+            status_save["Elements"] = _savIO.StreamDict((a_element.data["Identifier"], a_element.data)
+                                                         for a_element in self.Elements)
         elif self.experiment_type == ExperimentType.Electromagnetism:
-            self.StatusSave["Elements"] = [a_element.data for a_element in self.Elements]
+            status_save["Elements"] = _savIO.StreamList(a_element.data for a_element in self.Elements)
         else:
             raise errors.InternalError
+        return status_save
 
-        self.PlSav["Experiment"]["StatusSave"] = json.dumps(self.StatusSave, ensure_ascii=False, separators=(',', ': '))
+    def __write(self) -> None:
+        self.__write_header()
+        self.PlSav["Experiment"]["StatusSave"] = "".join(_savIO.iter_status_save(self.__stream_StatusSave()))
 
     def write(self,
               extra_filepath: Optional[str] = None,
@@ -486,6 +641,8 @@ class Experiment:
 
         if self.is_open_or_crt is not True:
             raise errors.ExperimentError("write before open or crt")
+        # 写入的存档可能就是read(lazy=True)映射的存档
+        self.__load_lazy()
 
         if self.is_opened:
             status: str = "update"
@@ -501,19 +658,23 @@ class Experiment:
         if not no_pop:
             stack_Experiment.pop()
 
-        self.__write()
-
-        context: str = json.dumps(self.PlSav, indent=2, ensure_ascii=False, separators=(',', ':'))
         if ln:
+            self.__write()
+            context: str = json.dumps(self.PlSav, indent=2, ensure_ascii=False, separators=(',', ':'))
             context = _format_StatusSave(context)
+            with open(self.SAV_PATH, "w", encoding="utf-8") as f:
+                f.write(context)
+        else:
+            # 流式写入, 内存中不会出现整个存档的字符串
+            self.__write_header()
+            with open(self.SAV_PATH, "w", encoding="utf-8") as f:
+                _savIO.write_sav(f, self.PlSav, _savIO.iter_status_save(self.__stream_StatusSave()))
+            self.PlSav["Experiment"]["StatusSave"] = _savIO.LazyStatusSave(self.SAV_PATH, "utf-8")
 
-        with open(self.SAV_PATH, "w", encoding="utf-8") as f:
-            f.write(context)
         if extra_filepath is not None:
             if not extra_filepath.endswith(".sav"):
                 extra_filepath += ".sav"
-            with open(extra_filepath, "w", encoding="utf-8") as f:
-                f.write(context)
+            shutil.copyfile(self.SAV_PATH, extra_filepath)
 
         if self.experiment_type == ExperimentType.Circuit:
             _colorUtils.color_print(
@@ -540,6 +701,8 @@ class Experiment:
 
         assert self.SAV_PATH is not None
 
+        self._close_lazy_Elements()
+
         if os.path.exists(self.SAV_PATH): # 如果一个实验被创建但还未被写入, 就会触发错误
             os.remove(self.SAV_PATH)
             _colorUtils.color_print(
@@ -561,8 +724,79 @@ class Experiment:
 
     def exit(self) -> None:
         ''' 退出实验而不进行任何操作 '''
+        self._close_lazy_Elements()
         stack_Experiment.pop()
 
+    def _close_lazy_Elements(self) -> None:
+        ''' read(lazy=True)后解除对存档的映射, 之后无法再构造未构造的元件 '''
+        from ._lazyElements import LazyElements
+        if isinstance(self.Elements, LazyElements):
+            self.Elements.close()
+
+    def use_ElementTable(self) -> Self:
+        ''' 使用列式存储的元件表保存元件的data, 用于减少大量元件占用的内存
+            已有的元件与之后创建的元件的data都会变为表中一行的视图
+            只支持电学实验
+        '''
+        if not self.is_open_or_crt:
+            raise errors.ExperimentNotOpenError
+        if self.experiment_type != ExperimentType.Circuit:
+            raise errors.ExperimentTypeError
+
+        if self.element_Table is None:
+            from .circuit.elementTable import ElementTable
+            self.element_Table = ElementTable()
+            for a_element in self.Elements:
+                a_element.data = self.element_Table.append(a_element.data)
+        return self
+
+    def use_Netlist(self) -> Self:
+        ''' 为实验建立网表(self.netlist), 之后随导线的创建与删除增量更新
+            用于查询引脚所在的网络, 引脚的邻居与检查电路(lint)
+            只支持电学实验
+        '''
+        if not self.is_open_or_crt:
+            raise errors.ExperimentNotOpenError
+        if self.experiment_type != ExperimentType.Circuit:
+            raise errors.ExperimentTypeError
+
+        if self.netlist is None:
+            from .circuit.netlist import Netlist
+            netlist = Netlist(self)
+            for a_wire in self.Wires:
+                netlist._add(a_wire)
+            self.netlist = netlist
+        return self
+
+    def dump_snapshot(self, path: str) -> Self:
+        ''' 将实验保存为二进制快照, 读取快照比读取.sav快得多
+            读取到新创建的实验后, 可以通过load_snapshot与write无损地转换回.sav中的元件与导线
+            @param path: 快照的路径
+        '''
+        if not isinstance(path, str):
+            raise TypeError
+        if not self.is_open_or_crt:
+            raise errors.ExperimentNotOpenError
+
+        from ._snapshot import dump
+        dump(self, path)
+        return self
+
+    def load_snapshot(self, path: str) -> Self:
+        ''' 读取二进制快照中的实验, 快照中的元件, 导线与StatusSave中的其他字段会添加到该实验中
+            该实验的名称, 简介与视角等不会被快照覆盖
+            快照的实验类型必须与该实验相同
+            @param path: 快照的路径
+        '''
+        if not isinstance(path, str):
+            raise TypeError
+        if not self.is_open_or_crt:
+            raise errors.ExperimentNotOpenError
+
+        from ._snapshot import load
+        load(self, path)
+        return self
+
     def entitle(self, sav_name: str) -> Self:
         ''' 对存档名进行重命名 '''
         if not isinstance(sav_name, str):
@@ -869,16 +1103,18 @@ class Experiment:
         if not self.is_open_or_crt:
             raise errors.ExperimentNotOpenError
 
-        res: str = f"from physicsLab import *\nexp = Experiment('{sav_name}')\n"
+        lines: List[str] = ["from physicsLab import *", f"exp = Experiment('{sav_name}')"]
 
-        for a_element in self.Elements:
-            res += f"e{a_element.get_Index()} = {str(a_element)}\n"
+        element_index: dict = {}
+        for index, a_element in enumerate(self.Elements, 1):
+            element_index[a_element] = index
+            lines.append(f"e{index} = {str(a_element)}")
         for a_wire in self.Wires:
-            res += str(a_wire) + '\n'
-        res += "\nexp.write()"
+            lines.append(a_wire.export_str(element_index))
+        lines += ["", "exp.write()"]
 
         with open(output_path, "w", encoding="utf-8") as f:
-            f.write(res)
+            f.write("\n".join(lines))
 
         return self
 
@@ -911,31 +1147,45 @@ class Experiment:
 
         identifier_to_element: dict = {}
 
-        for a_element in other.Elements:
+        other_elements = list(other.Elements)
+        positions = [a_element._position for a_element in other_elements]
+        if self.experiment_type == ExperimentType.Circuit:
+            # 一次转换所有坐标系与elementXYZ不同的元件的坐标
+            from .circuit.elementXYZ import xyzTranslate_array, translateXYZ_array
+            if elementXYZ:
+                translate, to_translate = translateXYZ_array, [
+                    i for i, a_element in enumerate(other_elements) if not a_element.is_elementXYZ
+                ]
+            else:
+                translate, to_translate = xyzTranslate_array, [
+                    i for i, a_element in enumerate(other_elements) if a_element.is_elementXYZ
+                ]
+            translated = translate([positions[i] for i in to_translate],
+                                   [other_elements[i].is_bigElement for i in to_translate])
+            for i, position in zip(to_translate, translated):
+                positions[i] = position
+
+        for a_element, (e_x, e_y, e_z) in zip(other_elements, positions):
             a_element = copy.deepcopy(a_element, memo={id(a_element.experiment): self})
-            e_x, e_y, e_z = a_element.get_position()
-            if self.experiment_type == ExperimentType.Circuit:
-                from .circuit.elementXYZ import xyzTranslate, translateXYZ
-                if elementXYZ and not a_element.is_elementXYZ:
-                    e_x, e_y, e_z = translateXYZ(e_x, e_y, e_z, a_element.is_bigElement)
-                elif not elementXYZ and a_element.is_elementXYZ:
-                    e_x, e_y, e_z = xyzTranslate(e_x, e_y, e_z, a_element.is_bigElement)
             a_element.set_position(e_x + x, e_y + y, e_z + z, elementXYZ)
             # set_Position已处理与elements_Position有关的操作
             self.Elements.append(a_element)
+            self.elements_Identifier[a_element.data["Identifier"]] = a_element
+            if self.element_Table is not None:
+                a_element.data = self.element_Table.append(a_element.data)
 
             identifier_to_element[a_element.data["Identifier"]] = a_element
 
         if self.experiment_type == ExperimentType.Circuit and other.experiment_type == ExperimentType.Circuit:
+            from .circuit.wire import Wire, _add_wire
             for a_wire in other.Wires:
-                a_wire = copy.deepcopy(
-                    a_wire, memo={
-                        id(a_wire.Source.element_self):
-                            identifier_to_element[a_wire.Source.element_self.data["Identifier"]],
-                        id(a_wire.Target.element_self):
-                            identifier_to_element[a_wire.Target.element_self.data["Identifier"]],
-                })
-                self.Wires.add(a_wire)
+                source, target = a_wire.Source, a_wire.Target
+                # 导线的key由元件在实验中的slot组成, 因此需要重新构造
+                _add_wire(self, Wire(
+                    type(source)(identifier_to_element[source.element_self.data["Identifier"]], source.pinLabel),
+                    type(target)(identifier_to_element[target.element_self.data["Identifier"]], target.pinLabel),
+                    a_wire.color,
+                ))
 
         return self
 
@@ -1006,6 +1256,7 @@ class experiment:
         if self.delete:
             self._Experiment.delete()
             return
+        self._Experiment._close_lazy_Elements()
 
 def getAllSav() -> List[str]:
     ''' 获取所有物实存档的文件名 '''
@@ -1014,14 +1265,19 @@ def getAllSav() -> List[str]:
     savs = savs[savs.__len__() - 1]
     return [aSav for aSav in savs if aSav.endswith('sav')]
 
-def _open_sav(sav_path) -> Optional[dict]:
+def _open_sav(sav_path, header_only: bool = False) -> Optional[dict]:
     ''' 打开一个存档, 返回存档对应的dict
         @param sav_path: 存档的绝对路径
+        @param header_only: 只读取存档最外层的InternalName, Type, Summary
+
+        StatusSave不会在打开存档时解码, 而是以_savIO.LazyStatusSave代替, 直到Experiment.read()时才读取
     '''
     def encode_sav(path: str, encoding: str) -> Optional[dict]:
         try:
-            with open(path, encoding=encoding) as f:
-                d = json.loads(f.read().replace('\n', ''))
+            if header_only:
+                d = _savIO.read_header(path, encoding)
+            else:
+                d = _savIO.read_sav(path, encoding)
         except (json.decoder.JSONDecodeError, UnicodeDecodeError): # 文件不是物实存档
             return None
         else:
@@ -1050,13 +1306,18 @@ def search_Experiment(sav_name: str) -> Optional[str]:
         @param sav_name: 存档名
 
         若存在则返回存档对应的文件名, 若不存在则返回None
+        通过存档目录的索引查找, 只会重新解析自上次查找后被修改过的存档
     '''
-    for aSav in getAllSav():
-        sav = _open_sav(os.path.join(Experiment.SAV_ROOT_DIR, aSav))
-        if sav is None:
-            continue
-        if sav["InternalName"] == sav_name:
+    for _ in range(2):
+        filename = _savCatalog.search(Experiment.SAV_ROOT_DIR, sav_name)
+        if filename is None:
+            return None
+
+        sav = _open_sav(os.path.join(Experiment.SAV_ROOT_DIR, filename))
+        if sav is not None and sav.get("InternalName") == sav_name:
             search_Experiment.sav = sav
-            return aSav
+            return filename
+        # 索引与存档内容不一致 (存档在刷新索引后又被修改), 丢弃该条目后重新查找
+        _savCatalog.discard(Experiment.SAV_ROOT_DIR, filename)
 
     return None
@@ -4,6 +4,7 @@ import physicsLab.circuit.elementXYZ as _elementXYZ
 
 from .wires import unitPin, crt_Wires
 from physicsLab._tools import roundData
+from physicsLab.element import crt_Elements
 from physicsLab.circuit import elements
 from physicsLab.circuit.wire import crt_Wire, Pin
 from physicsLab.experiment import get_Experiment
@@ -622,30 +623,29 @@ class Sum(_Base):
                  fold: bool = False,  # False: 生成元件时不会在同一水平面的元件超过一定数量后z + 1继续生成元件
                  foldMaxNum: int = 4  # 达到foldMaxNum个元件数时即在z轴自动折叠
                  ) -> None:
-        self._elements: list = []
+        positions: list = []
 
         if heading:
             if fold:
                 zcor = z
                 for i in range(bitnum):
-                    self._elements.append(elements.Full_Adder(x + i % foldMaxNum, y, zcor, True))
+                    positions.append((x + i % foldMaxNum, y, zcor))
                     if i == foldMaxNum - 1:
                         zcor += 1
             else:
                 for increase in range(bitnum):
-                    self._elements.append(elements.Full_Adder(x + increase, y, z, True))
+                    positions.append((x + increase, y, z))
         else:
             if fold:
                 zcor = z
                 for i in range(bitnum):
-                    self._elements.append(
-                        elements.Full_Adder(x, y + (i % foldMaxNum) * 2, zcor, True)
-                    )
+                    positions.append((x, y + (i % foldMaxNum) * 2, zcor))
                     if i == foldMaxNum - 1:
                         zcor += 1
             else:
                 for increase in range(bitnum):
-                    self._elements.append(elements.Full_Adder(x, y + increase * 2, z, True))
+                    positions.append((x, y + increase * 2, z))
+        self._elements: list = crt_Elements(elements.Full_Adder, positions, elementXYZ=True)
 
         # 连接导线
         for i in range(self._elements.__len__() - 1):
@@ -890,36 +890,29 @@ class D_WaterLamp(_Base):
             self._elements = [elements.T_Flipflop(x, y, z, True)]
             return
 
-        self._elements: list = []
+        positions: list = []
 
         if heading:
             if fold:
                 zcor = z
                 for i in range(bitnum):
-                    self._elements.append(
-                        elements.D_Flipflop(x + i % foldMaxNum, y, zcor, True)
-                    )
+                    positions.append((x + i % foldMaxNum, y, zcor))
                     if i == foldMaxNum - 1:
                         zcor += 1
             else:
                 for increase in range(bitnum):
-                    self._elements.append(
-                        elements.D_Flipflop(x + increase, y, z, True)
-                    )
+                    positions.append((x + increase, y, z))
         else:
             if fold:
                 zcor = z
                 for i in range(bitnum):
-                    self._elements.append(
-                        elements.D_Flipflop(x, y + (i % foldMaxNum) * 2, zcor, True)
-                    )
+                    positions.append((x, y + (i % foldMaxNum) * 2, zcor))
                     if i == foldMaxNum - 1:
                         zcor += 1
             else:
                 for increase in range(bitnum):
-                    self._elements.append(
-                        elements.D_Flipflop(x, y + increase * 2, z, True)
-                    )
+                    positions.append((x, y + increase * 2, z))
+        self._elements: list = crt_Elements(elements.D_Flipflop, positions, elementXYZ=True)
 
         # 连接clk
         for i in range(len(self._elements) - 1):
@@ -981,36 +974,29 @@ class Register(_Base):
                  fold: bool = False, # False: 生成元件时不会在同一水平面的元件超过一定数量后z + 1继续生成元件
                  foldMaxNum: int = 4, # 达到foldMaxNum个元件数时即在z轴自动折叠
                  ) -> None:
-        self._elements: list = []
+        positions: list = []
 
         if heading:
             if fold:
                 zcor = z
                 for i in range(bitnum):
-                    self._elements.append(
-                        elements.D_Flipflop(x + i % foldMaxNum, y, zcor, True)
-                    )
+                    positions.append((x + i % foldMaxNum, y, zcor))
                     if i == foldMaxNum - 1:
                         zcor += 1
             else:
                 for increase in range(bitnum):
-                    self._elements.append(
-                        elements.D_Flipflop(x + increase, y, z, True)
-                    )
+                    positions.append((x + increase, y, z))
         else:
             if fold:
                 zcor = z
                 for i in range(bitnum):
-                    self._elements.append(
-                        elements.D_Flipflop(x, y + (i % foldMaxNum) * 2, zcor, True)
-                    )
+                    positions.append((x, y + (i % foldMaxNum) * 2, zcor))
                     if i == foldMaxNum - 1:
                         zcor += 1
             else:
                 for increase in range(bitnum):
-                    self._elements.append(
-                        elements.D_Flipflop(x, y + increase * 2, z, True)
-                    )
+                    positions.append((x, y + increase * 2, z))
+        self._elements: list = crt_Elements(elements.D_Flipflop, positions, elementXYZ=True)
 
         last_element = None
         for element in self._elements:
@@ -1059,7 +1045,7 @@ class MultiElements(_Base):
         if element is None or not issubclass(element, elements.CircuitBase):
             raise TypeError
 
-        self._elements: list = []
+        positions: list = []
         if heading:
             if fold:
                 zcor = z
@@ -1068,9 +1054,7 @@ class MultiElements(_Base):
                         plus = 2 * i % foldMaxNum
                     else:
                         plus = i % foldMaxNum
-                    self._elements.append(
-                        element(x + plus, y, zcor, True)
-                    )
+                    positions.append((x + plus, y, zcor))
                     if i == foldMaxNum - 1:
                         zcor += 1
             else:
@@ -1079,9 +1063,7 @@ class MultiElements(_Base):
                         plus = 2 * i
                     else:
                         plus = i
-                    self._elements.append(
-                        element(x + i, y, z, True)
-                    )
+                    positions.append((x + i, y, z))
         else:
             if fold:
                 zcor = z
@@ -1090,9 +1072,7 @@ class MultiElements(_Base):
                         plus = 2 * i % foldMaxNum
                     else:
                         plus = i % foldMaxNum
-                    self._elements.append(
-                        element(x, y + plus, zcor, True)
-                    )
+                    positions.append((x, y + plus, zcor))
                     if i == foldMaxNum - 1:
                         zcor += 1
             else:
@@ -1101,9 +1081,8 @@ class MultiElements(_Base):
                         plus = 2 * i
                     else:
                         plus = i
-                    self._elements.append(
-                        element(x, y + plus, z, True)
-                    )
+                    positions.append((x, y + plus, z))
+        self._elements: list = crt_Elements(element, positions, elementXYZ=True)
 
     def pins(self, pin: Pin) -> unitPin:
         if not isinstance(pin, Pin):
@@ -1111,10 +1090,9 @@ class MultiElements(_Base):
 
         res = []
         for e in self._elements:
-            for p_name in e._get_property():
-                p = eval(f"e.{p_name}")
-                if isinstance(p, Pin) and p.pinLabel == pin.pinLabel:
-                    res.append(p)
+            pin_name = e._get_pin_names().get(pin.pinLabel)
+            if pin_name is not None:
+                res.append(getattr(e, pin_name))
         return unitPin(self, *res)
 
 class Outputs(MultiElements):
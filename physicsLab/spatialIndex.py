@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# 元件坐标的空间索引 (均匀网格)
+# 坐标均为物实坐标系, 即写入存档的坐标, 因此不同坐标系(elementXYZ)的元件可以一起查询
+import math
+import heapq
+import itertools
+
+from physicsLab.typehint import numType, Dict, List, Tuple, Iterable, Iterator
+
+_Point = Tuple[float, float, float]
+_Cell = Tuple[int, int, int]
+
+class SpatialIndex:
+    ''' 将空间划分为边长为cell_size的网格, 每个网格记录其中的元件
+        插入, 移动, 删除元件的开销为O(1)
+        查询的开销只与被访问的网格数及结果的数量有关
+    '''
+    def __init__(self, cell_size: numType = 0.16) -> None:
+        if not isinstance(cell_size, (int, float)):
+            raise TypeError
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+
+        self.cell_size: float = float(cell_size)
+        # 网格中的元件通常很少, 因此用list而不是set以节省内存
+        self.__cells: Dict[_Cell, list] = {}
+        self.__points: Dict[object, _Point] = {} # key: 元件, value: 坐标
+
+    def __len__(self) -> int:
+        return len(self.__points)
+
+    def __contains__(self, element) -> bool:
+        return element in self.__points
+
+    def _cell_of(self, x: float, y: float, z: float) -> _Cell:
+        size = self.cell_size
+        return math.floor(x / size), math.floor(y / size), math.floor(z / size)
+
+    def update(self, element, x: numType, y: numType, z: numType) -> None:
+        ''' 插入元件或更新元件的坐标 '''
+        cell = self._cell_of(x, y, z)
+        old = self.__points.get(element)
+        old_cell = None if old is None else self._cell_of(*old)
+        if old_cell != cell:
+            if old_cell is not None:
+                self.__discard_from_cell(element, old_cell)
+            elements = self.__cells.get(cell)
+            if elements is None:
+                self.__cells[cell] = [element]
+            else:
+                elements.append(element)
+        self.__points[element] = (x, y, z)
+
+    def update_many(self, elements: Iterable, points: Iterable[_Point]) -> None:
+        ''' 依次对elements与points中对应的元件与坐标调用update, 插入新元件时更快 '''
+        size = self.cell_size
+        floor = math.floor
+        cells = self.__cells
+        old_points = self.__points
+        for element, point in zip(elements, points):
+            if element in old_points:
+                self.update(element, *point)
+                continue
+            x, y, z = point
+            cell = floor(x / size), floor(y / size), floor(z / size)
+            bucket = cells.get(cell)
+            if bucket is None:
+                cells[cell] = [element]
+            else:
+                bucket.append(element)
+            old_points[element] = (x, y, z)
+
+    def remove(self, element) -> None:
+        ''' 删除元件, 元件不存在时不做任何事 '''
+        old = self.__points.pop(element, None)
+        if old is not None:
+            self.__discard_from_cell(element, self._cell_of(*old))
+
+    def clear(self) -> None:
+        self.__cells.clear()
+        self.__points.clear()
+
+    def __discard_from_cell(self, element, cell: _Cell) -> None:
+        elements = self.__cells[cell]
+        elements.remove(element)
+        if len(elements) == 0:
+            del self.__cells[cell]
+
+    def get_position(self, element) -> _Point:
+        ''' 获取元件在索引中的坐标(物实坐标系) '''
+        return self.__points[element]
+
+    def __iter_cells_in_range(self, low: _Cell, high: _Cell) -> Iterator[list]:
+        ''' 遍历范围内所有非空的网格 '''
+        volume = (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * (high[2] - low[2] + 1)
+        if volume <= 0:
+            return
+        # 范围内的网格比非空网格还多时, 直接遍历非空网格
+        if volume > len(self.__cells):
+            for cell, elements in self.__cells.items():
+                if low[0] <= cell[0] <= high[0] and low[1] <= cell[1] <= high[1] \
+                        and low[2] <= cell[2] <= high[2]:
+                    yield elements
+            return
+
+        for cell in itertools.product(range(low[0], high[0] + 1),
+                                      range(low[1], high[1] + 1),
+                                      range(low[2], high[2] + 1)):
+            elements = self.__cells.get(cell)
+            if elements is not None:
+                yield elements
+
+    def query_box(self,
+                  x1: numType, y1: numType, z1: numType,
+                  x2: numType, y2: numType, z2: numType,
+                  ) -> list:
+        ''' 获取位于长方体内(含边界)的所有元件 '''
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        z1, z2 = min(z1, z2), max(z1, z2)
+
+        result = []
+        for elements in self.__iter_cells_in_range(self._cell_of(x1, y1, z1), self._cell_of(x2, y2, z2)):
+            for element in elements:
+                x, y, z = self.__points[element]
+                if x1 <= x <= x2 and y1 <= y <= y2 and z1 <= z <= z2:
+                    result.append(element)
+        return result
+
+    def query_radius(self, x: numType, y: numType, z: numType, radius: numType) -> list:
+        ''' 获取与(x, y, z)的距离不超过radius的所有元件, 按距离从近到远排序 '''
+        if radius < 0:
+            raise ValueError("radius must not be negative")
+
+        result = []
+        r2 = radius * radius
+        low = self._cell_of(x - radius, y - radius, z - radius)
+        high = self._cell_of(x + radius, y + radius, z + radius)
+        for elements in self.__iter_cells_in_range(low, high):
+            for element in elements:
+                e_x, e_y, e_z = self.__points[element]
+                d2 = (e_x - x) ** 2 + (e_y - y) ** 2 + (e_z - z) ** 2
+                if d2 <= r2:
+                    result.append((d2, element))
+        result.sort(key=lambda item: item[0])
+        return [element for _, element in result]
+
+    def collides(self, x: numType, y: numType, z: numType, radius: numType = 0) -> bool:
+        ''' 放置元件前的碰撞检测: (x, y, z)周围radius内是否已有元件 '''
+        if radius < 0:
+            raise ValueError("radius must not be negative")
+
+        r2 = radius * radius
+        low = self._cell_of(x - radius, y - radius, z - radius)
+        high = self._cell_of(x + radius, y + radius, z + radius)
+        for elements in self.__iter_cells_in_range(low, high):
+            for element in elements:
+                e_x, e_y, e_z = self.__points[element]
+                if (e_x - x) ** 2 + (e_y - y) ** 2 + (e_z - z) ** 2 <= r2:
+                    return True
+        return False
+
+    def nearest(self, x: numType, y: numType, z: numType, k: int = 1) -> list:
+        ''' 获取距离(x, y, z)最近的k个元件, 按距离从近到远排序 '''
+        if not isinstance(k, int):
+            raise TypeError
+        if k <= 0 or len(self.__points) == 0:
+            return []
+
+        heap: List[Tuple[float, int, object]] = [] # 大顶堆, 保存当前最近的k个元件
+        def push(elements: list) -> None:
+            for element in elements:
+                e_x, e_y, e_z = self.__points[element]
+                item = (-((e_x - x) ** 2 + (e_y - y) ** 2 + (e_z - z) ** 2), id(element), element)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+        c_x, c_y, c_z = self._cell_of(x, y, z)
+        visited = 0
+        ring = 0
+        while True:
+            # 网格太稀疏时, 逐圈查找不如直接遍历所有非空网格
+            if visited > len(self.__cells):
+                heap.clear()
+                for elements in self.__cells.values():
+                    push(elements)
+                break
+
+            for cell in self.__ring(c_x, c_y, c_z, ring):
+                visited += 1
+                elements = self.__cells.get(cell)
+                if elements is not None:
+                    push(elements)
+
+            # 第ring圈之外的元件与(x, y, z)的距离至少为ring * cell_size
+            if len(heap) == k and -heap[0][0] <= (ring * self.cell_size) ** 2:
+                break
+            if len(heap) == len(self.__points):
+                break
+            ring += 1
+
+        return [element for _, _, element in sorted(heap, reverse=True)]
+
+    @staticmethod
+    def __ring(c_x: int, c_y: int, c_z: int, ring: int) -> Iterator[_Cell]:
+        ''' 与网格(c_x, c_y, c_z)的切比雪夫距离恰好为ring的所有网格 '''
+        if ring == 0:
+            yield c_x, c_y, c_z
+            return
+        for d_x in range(-ring, ring + 1):
+            for d_y in range(-ring, ring + 1):
+                if abs(d_x) == ring or abs(d_y) == ring:
+                    for d_z in range(-ring, ring + 1):
+                        yield c_x + d_x, c_y + d_y, c_z + d_z
+                else:
+                    yield c_x + d_x, c_y + d_y, c_z - ring
+                    yield c_x + d_x, c_y + d_y, c_z + ring
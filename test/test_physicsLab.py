@@ -18,6 +18,10 @@ def my_test_dec(method: Callable):
             raise TestError
     return result
 
+def _summarize_save(exp: Experiment) -> tuple:
+    # 供test_map_saves在子进程中调用, 需要定义在模块顶层
+    return exp.PlSav["InternalName"], len(exp.Elements), len(exp.Wires), get_Experiment() is exp
+
 class BasicTest(PLTestBase):
     @my_test_dec
     def test_experiment1(self):
@@ -346,3 +350,901 @@ class BasicTest(PLTestBase):
                 pass
             else:
                 raise TestError
+
+    @my_test_dec
+    def test_search_Experiment_catalog(self):
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        filename = os.path.basename(exp.SAV_PATH)
+        exp.write(no_pop=True)
+        self.assertEqual(search_Experiment("__test__"), filename)
+
+        # 存档被修改后索引会增量刷新
+        exp.entitle("__test_renamed__")
+        exp.write()
+        self.assertEqual(search_Experiment("__test_renamed__"), filename)
+        self.assertIsNone(search_Experiment("__test__"))
+
+        # 索引保存在physicsLab的缓存目录中, 不在存档目录中写入文件
+        from physicsLab import _savCatalog
+        self.assertTrue(os.path.exists(_savCatalog._catalog_path(exp.SAV_ROOT_DIR)))
+        self.assertEqual([name for name in os.listdir(exp.SAV_ROOT_DIR) if not name.endswith((".sav", ".jpg"))], [])
+
+        # 损坏的记录被视为过期
+        entries = _savCatalog._load(exp.SAV_ROOT_DIR)
+        entries[filename] = {"mtime": entries[filename]["mtime"]}
+        entries["missing.sav"] = "broken"
+        _savCatalog._dump(exp.SAV_ROOT_DIR, entries)
+        self.assertEqual(search_Experiment("__test_renamed__"), filename)
+
+        Experiment().open("__test_renamed__").delete()
+        self.assertIsNone(search_Experiment("__test_renamed__"))
+
+    @my_test_dec
+    def test_lazy_StatusSave(self):
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        Logic_Input(0, 0, 0).o - Logic_Output(1, 0, 0).i
+        exp.write(ln=True) # StatusSave中含有未转义的换行
+
+        from physicsLab import _savIO
+        from physicsLab.experiment import _open_sav
+        header = _open_sav(exp.SAV_PATH, header_only=True)
+        self.assertEqual(header["InternalName"], "__test__")
+        self.assertEqual(set(header.keys()), {"InternalName", "Type", "Summary"})
+
+        exp2: Experiment = Experiment().open("__test__")
+        self.assertIsInstance(exp2.PlSav["Experiment"]["StatusSave"], _savIO.LazyStatusSave)
+        exp2.read()
+        self.assertEqual(count_Elements(), 2)
+        self.assertEqual(count_Wires(), 1)
+        exp2.delete()
+
+    @my_test_dec
+    def test_get_element_from_identifier(self):
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Logic_Input(0, 0, 0)
+        b = Logic_Output(1, 0, 0)
+        a.o - b.i
+        self.assertIs(exp.get_element_from_identifier(a.data["Identifier"]), a)
+        exp.write()
+
+        exp2: Experiment = Experiment().open("__test__").read()
+        self.assertEqual(len(exp2.elements_Identifier), 2)
+        a2 = exp2.get_element_from_identifier(a.data["Identifier"])
+        self.assertEqual(a2.data["Identifier"], a.data["Identifier"])
+        del_Element(a2)
+        self.assertRaises(errors.ExperimentError, exp2.get_element_from_identifier, a.data["Identifier"])
+        clear_Elements()
+        self.assertEqual(len(exp2.elements_Identifier), 0)
+        exp2.delete()
+
+    @my_test_dec
+    def test_parse_vector(self):
+        from physicsLab._tools import parse_vector
+        self.assertEqual(parse_vector("1,2.5,-3e-05"), (1, 2.5, -3e-05))
+        self.assertEqual(parse_vector(".5,0,1"), (0.5, 0, 1))
+        self.assertRaises(ValueError, parse_vector, '__import__("os"),0,0')
+        self.assertRaises(ValueError, parse_vector, '1,"2",3')
+
+    @my_test_dec
+    def test_del_Elements(self):
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Logic_Input(0, 0, 0)
+        b = Logic_Output(1, 0, 0)
+        c = Logic_Output(2, 0, 0)
+        a.o - b.i
+        a.o - c.i
+        del_Element(b)
+        self.assertEqual(count_Elements(), 2)
+        self.assertEqual(count_Wires(), 1)
+        self.assertIs(get_Element(0, 0, 0), a)
+        self.assertIs(get_Element(2, 0, 0), c)
+        self.assertIsNone(get_Element(1, 0, 0, defualt=None))
+        self.assertEqual(len(exp.elements_Wires[a]), 1)
+        self.assertNotIn(b, exp.elements_Wires)
+
+        d = Yes_Gate(3, 0, 0)
+        c.i - d.o
+        del_Elements([a, c])
+        self.assertEqual(exp.Elements, [d])
+        self.assertEqual(count_Wires(), 0)
+        self.assertEqual(len(exp.elements_Wires), 0)
+
+        # 删除大量元件后(触发列表压缩)仍保持元件的顺序与下标
+        gates = crt_Elements(Yes_Gate, [(i, 1, 0) for i in range(200)])
+        for gate in gates[::3] + gates[1::3]:
+            del_Element(gate)
+        rest = [d] + gates[2::3]
+        self.assertEqual(count_Elements(), len(rest))
+        self.assertEqual(list(exp.Elements), rest)
+        self.assertIs(get_Element(index=2), gates[2])
+        self.assertEqual(rest[-1].get_index(), len(rest))
+        self.assertNotIn(gates[0], exp.Elements)
+        self.assertRaises(ValueError, exp.Elements.remove, gates[0])
+
+        # Elements不是list, 但常用的list操作结果相同
+        elements = exp.Elements
+        self.assertRaises(ValueError, elements.append, d)
+        self.assertRaises(ValueError, elements.insert, 0, d)
+        self.assertEqual(count_Elements(), len(rest))
+        self.assertEqual(elements + [a], rest + [a])
+        self.assertEqual([a] + elements, [a] + rest)
+        self.assertEqual(elements.copy(), rest)
+        self.assertIsInstance(elements[1:3], list)
+        elements.sort(key=lambda element: -element.get_position()[0])
+        self.assertEqual(list(elements), sorted(rest, key=lambda element: -element.get_position()[0]))
+        self.assertEqual(elements.index(gates[2]), len(rest) - 1)
+        exp.exit()
+
+    @my_test_dec
+    def test_set_position(self):
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Logic_Input(0, 0, 0)
+        b = Logic_Output(0, 0, 0)
+        for position in [(1, 0, 0), (1, 2, 0.5), (-3, 2, 0.5)]:
+            a.set_position(*position)
+            self.assertIs(get_Element(*position), a)
+            self.assertEqual(exp.spatial_Index.query_radius(*position, 0.01), [a])
+        # 原先的坐标不再能找到a
+        self.assertIs(get_Element(0, 0, 0), b)
+        self.assertIsNone(get_Element(1, 0, 0, defualt=None))
+        self.assertIsNone(get_Element(1, 2, 0.5, defualt=None))
+        self.assertNotIn((1, 2, 0.5), exp.elements_Position)
+
+        # 移动到其他元件所在的坐标
+        a.set_position(0, 0, 0)
+        self.assertEqual(set(get_Element(0, 0, 0)), {a, b})
+        b.set_position(5, 5, 5)
+        self.assertIs(get_Element(0, 0, 0), a)
+        self.assertIs(get_Element(5, 5, 5), b)
+        self.assertIsNone(get_Element(-3, 2, 0.5, defualt=None))
+        exp.exit()
+
+    @my_test_dec
+    def test_wire_key(self):
+        from physicsLab.circuit.wire import Wire, WireSet
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Yes_Gate(0, 0, 0)
+        b = Yes_Gate(1, 0, 0)
+        self.assertEqual(a.o, a.o)
+        self.assertNotEqual(a.o, a.i)
+        # 查询与删除不存在的导线时不为元件分配slot
+        self.assertNotIn(Wire(a.o, b.i), exp.Wires)
+        self.assertRaises(KeyError, del_Wire, a.o, b.i)
+        self.assertEqual(exp.slot_Elements, [])
+
+        crt_Wire(a.o, b.i)
+        crt_Wire(b.i, a.o, "red") # 与方向无关, 已存在的导线不会被替换
+        self.assertIsInstance(exp.Wires, WireSet)
+        self.assertEqual(count_Wires(), 1)
+        self.assertIn(Wire(b.i, a.o), exp.Wires)
+        self.assertEqual(hash(Wire(a.o, b.i)), hash(Wire(b.i, a.o)))
+        self.assertEqual(hash(next(iter(exp.Wires))), hash(Wire(b.i, a.o)))
+        self.assertEqual(len({Wire(a.o, b.i), Wire(b.i, a.o), Wire(a.i, b.o)}), 2)
+        self.assertEqual([a_wire.color for a_wire in exp.Wires], ["蓝"])
+        self.assertNotIn(Wire(a.i, b.o), exp.Wires)
+
+        del_Wire(b.i, a.o)
+        self.assertEqual(count_Wires(), 0)
+        self.assertEqual(len(exp.elements_Wires), 0)
+        self.assertRaises(KeyError, del_Wire, a.o, b.i)
+
+        # 被删除的元件空出的slot由之后连接导线的元件使用
+        e = Yes_Gate(2, 0, 0)
+        e.o - a.i
+        slot = e._slot
+        del_Element(e)
+        self.assertIsNone(exp.slot_Elements[slot])
+        self.assertNotIn(Wire(e.o, a.i), exp.Wires)
+        f = Yes_Gate(3, 0, 0)
+        f.o - b.i
+        self.assertIs(exp.slot_Elements[slot], f)
+        self.assertNotIn(Wire(e.o, a.i), exp.Wires)
+        self.assertIn(Wire(f.o, b.i), exp.Wires)
+        del_Element(f)
+        clear_Elements()
+        self.assertEqual((exp.slot_Elements, exp.free_Slots), ([], []))
+        a = Yes_Gate(0, 0, 0)
+        b = Yes_Gate(1, 0, 0)
+
+        # 元件被复制到其他实验后重新分配slot
+        a.o - b.i
+        exp2: Experiment = Experiment().crt("__test2__", force_crt=True)
+        c = Yes_Gate(0, 0, 0)
+        d = Yes_Gate(0, 1, 0)
+        c.o - d.i
+        exp2.merge(exp, 0, 0, 1, elementXYZ=False)
+        self.assertEqual(count_Wires(), 2)
+        self.assertEqual(len({a_wire.Source.element_self for a_wire in exp2.Wires}), 2)
+        exp2.exit()
+        exp.exit()
+
+    @my_test_dec
+    def test_netlist(self):
+        from physicsLab.circuit import netlist
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Logic_Input(0, 0, 0)
+        b = Yes_Gate(1, 0, 0)
+        c = Yes_Gate(2, 0, 0)
+        d = And_Gate(3, 0, 0)
+        a.o - b.i
+        exp.use_Netlist()
+        b.i - c.i
+        b.o - d.i_up
+        net = exp.netlist
+
+        self.assertTrue(net.same_net(a.o, c.i))
+        self.assertFalse(net.same_net(a.o, b.o))
+        self.assertCountEqual(net.neighbors(b.i), [a.o, c.i])
+        self.assertCountEqual(net.net(c.i), [a.o, b.i, c.i])
+        self.assertCountEqual(net.fan_out(a.o), [b.i, c.i])
+        self.assertEqual(net.neighbors(d.o), [])
+        self.assertEqual(len(net.nets()), 2)
+
+        issues = net.lint()
+        self.assertCountEqual(
+            [(issue.kind, issue.pins) for issue in issues if issue.kind == netlist.UNCONNECTED_INPUT],
+            [(netlist.UNCONNECTED_INPUT, [d.i_low])]
+        )
+        self.assertEqual(len(issues), 1)
+
+        # 删除导线后重建并查集
+        del_Wire(a.o, b.i)
+        self.assertFalse(net.same_net(a.o, c.i))
+        self.assertTrue(net.same_net(b.i, c.i))
+        kinds = sorted(issue.kind for issue in net.lint())
+        self.assertEqual(kinds, [netlist.UNCONNECTED_INPUT, netlist.UNDRIVEN_NET])
+
+        a.o - d.i_low
+        c.o - d.i_low
+        self.assertIn(netlist.MULTIPLE_DRIVERS, [issue.kind for issue in net.lint()])
+
+        del_Element(d)
+        self.assertEqual(len(net.nets()), 1)
+        clear_Wires()
+        self.assertEqual(len(net), 0)
+
+        # 删除导线使网络分裂为两个, 之后再次合并
+        gates = crt_Elements(Yes_Gate, [(i, 5, 0) for i in range(6)])
+        for i in range(5):
+            gates[i].i - gates[i + 1].i
+        gates[0].i - gates[5].i # 环: 删除其中一条导线后仍然相连
+        del_Wire(gates[2].i, gates[3].i)
+        self.assertTrue(net.same_net(gates[0].i, gates[3].i))
+        del_Wire(gates[0].i, gates[5].i)
+        self.assertTrue(net.same_net(gates[0].i, gates[2].i))
+        self.assertTrue(net.same_net(gates[3].i, gates[5].i))
+        self.assertFalse(net.same_net(gates[2].i, gates[3].i))
+        self.assertEqual(len(net.nets()), 2)
+        del_Wire(gates[0].i, gates[1].i) # gates[0]不再连接导线
+        self.assertFalse(net.same_net(gates[0].i, gates[1].i))
+        self.assertTrue(net.same_net(gates[1].i, gates[2].i))
+        gates[1].i - gates[4].i
+        self.assertTrue(net.same_net(gates[2].i, gates[5].i))
+        self.assertEqual(len(net.nets()), 1)
+        exp.exit()
+
+    @my_test_dec
+    def test_logic_simulator(self):
+        from physicsLab.circuit.logicSimulator import LogicSimulator
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = lib.Inputs(0, 0, 0, 3)
+        b = lib.Inputs(1, 0, 0, 3)
+        adder = lib.Sum(2, 0, 0, 3)
+        out = lib.Outputs(3, 0, 0, 4)
+        a.outputs - adder.inputs1
+        b.outputs - adder.inputs2
+        adder.outputs - out.inputs
+        clk = Logic_Input(5, 0, 0)
+        lamp = lib.D_WaterLamp(6, 0, 0, 3)
+        clk.o - lamp.inputs
+        counter = lib.Tick_Counter(8, 0, 0, 3)
+        clk.o - counter.input
+
+        sim = LogicSimulator(exp)
+        for x in range(8):
+            for y in range(8):
+                sim.set(a, x).set(b, y)
+                self.assertEqual(sim.get(out), x + y)
+        self.assertEqual(sim.get(adder.outputs), 14)
+
+        lamps, ticks = [], []
+        for _ in range(6):
+            lamps.append(sim.get(lamp.outputs))
+            sim.pulse(clk)
+            ticks.append(sim.get(counter.output))
+        self.assertEqual(lamps, [0b001, 0b010, 0b100, 0b001, 0b010, 0b100])
+        self.assertEqual(ticks, [0, 0, 1, 0, 0, 1])
+        self.assertRaises(ValueError, sim.set, a, 8)
+
+        gate = No_Gate(10, 0, 0)
+        gate.o - gate.i
+        self.assertRaises(errors.SimulationError, LogicSimulator, exp)
+        exp.exit()
+
+    @my_test_dec
+    def test_bit_parallel(self):
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest("numpy is not installed")
+        from physicsLab.circuit.bitParallel import BitParallelSimulator
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = lib.Inputs(0, 0, 0, 4)
+        b = lib.Inputs(1, 0, 0, 4)
+        adder = lib.Sum(2, 0, 0, 4)
+        a.outputs - adder.inputs1
+        b.outputs - adder.inputs2
+        eq = lib.Equal_to(4, 0, 0, 4, elementXYZ=False)
+        a.outputs - eq.inputs1
+        b.outputs - eq.inputs2
+
+        sim = BitParallelSimulator(exp)
+        results = list(sim.exhaustive([a, b], chunk_bits=6))
+        self.assertEqual(len(results), 4)
+        x, y = results[-1]
+        self.assertEqual(len(x), 64)
+        self.assertTrue((sim.get(adder.outputs) == x + y).all())
+        self.assertTrue((sim.get(eq.output) == (x == y)).all())
+
+        x = np.array([0, 3, 15, 9])
+        y = np.array([0, 5, 15, 7])
+        sim.evaluate({a: x, b: y})
+        self.assertEqual(sim.get(adder.outputs).tolist(), [0, 8, 30, 16])
+        self.assertEqual(sim.get(eq.output).tolist(), [1, 0, 1, 0])
+
+        D_Flipflop(10, 0, 0)
+        self.assertRaises(errors.SimulationError, BitParallelSimulator, exp)
+        clear_Elements()
+        gate = No_Gate(10, 0, 0)
+        gate.o - gate.i
+        self.assertRaises(errors.SimulationError, BitParallelSimulator, exp)
+        exp.exit()
+
+    @my_test_dec
+    def test_analog_simulator(self):
+        try:
+            import scipy
+        except ImportError:
+            self.skipTest("scipy is not installed")
+        import math
+        from physicsLab.circuit.analogSimulator import AnalogSimulator
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        battery = Battery_Source(0, 0, 0)
+        r1 = Resistor(1, 0, 0).set_resistor(100)
+        r2 = Resistor(2, 0, 0).set_resistor(300)
+        ground = Ground_Component(3, 0, 0)
+        battery.red - r1.red
+        r1.black - r2.red
+        r2.black - battery.black - ground.i
+
+        capacitor = Basic_Capacitor(0, 1, 0)
+        r3 = Resistor(1, 1, 0).set_resistor(995)
+        battery.red - r3.red
+        r3.black - capacitor.red
+        capacitor.black - ground.i
+
+        diode = Basic_Diode(0, 2, 0)
+        r4 = Resistor(1, 2, 0).set_resistor(10)
+        Simple_Switch(2, 2, 0).turn_on_switch().red - battery.red
+        get_Element(2, 2, 0).black - diode.red
+        diode.black - r4.red
+        r4.black - ground.i
+
+        sim = AnalogSimulator(exp).dc()
+        current = r1.data["Statistics"]["电流"]
+        self.assertAlmostEqual(sim.voltage(r1.black), 300 * current)
+        self.assertAlmostEqual(battery.data["Statistics"]["电压"], 3 - 0.5 * battery.data["Statistics"]["电流"])
+        self.assertAlmostEqual(capacitor.data["Statistics"]["电流"], 0)
+        self.assertAlmostEqual(capacitor.data["Statistics"]["电压"], sim.voltage(battery.red))
+        self.assertAlmostEqual(battery.data["Statistics"]["电流"],
+                               current + diode.data["Statistics"]["电流"], places=6)
+        self.assertTrue(0.5 < diode.data["Statistics"]["电压"] < 0.6)
+        self.assertAlmostEqual(diode.data["Statistics"]["电流"], r4.data["Statistics"]["电流"], places=6)
+
+        # 从电容没有电荷开始, 经过一个时间常数后约充电到63%
+        sim = AnalogSimulator(exp)
+        times = []
+        sim.transient(1e-3, 1e-6, times.append)
+        self.assertEqual(len(times), 1000)
+        ratio = capacitor.data["Statistics"]["电压"] / sim.voltage(battery.red)
+        self.assertAlmostEqual(ratio, 1 - math.exp(-1), places=2)
+
+        clear_Elements()
+        battery = Battery_Source(0, 0, 0)
+        battery.data["Properties"]["内阻"] = 0
+        battery.red - battery.black
+        self.assertRaises(errors.SimulationError, AnalogSimulator(exp).dc)
+        exp.exit()
+
+    @my_test_dec
+    def test_spatial_Index(self):
+        import random
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        rand = random.Random(0)
+        elements = [Logic_Input(rand.uniform(-2, 2), rand.uniform(-2, 2), rand.uniform(0, 1)) for _ in range(300)]
+        elements[0].set_position(10, 10, 10)
+        del_Element(elements.pop())
+        index = exp.spatial_Index
+        self.assertEqual(len(index), 299)
+
+        def distance2(element):
+            x, y, z = index.get_position(element)
+            return (x - 0.3) ** 2 + (y + 0.1) ** 2 + (z - 0.5) ** 2
+
+        self.assertEqual(set(index.query_box(-1, -1, 0, 1, 1, 1)),
+                         {e for e in elements if all(-1 <= v <= 1 for v in e.get_position()[:2])})
+        self.assertEqual(set(index.query_radius(0.3, -0.1, 0.5, 0.8)),
+                         {e for e in elements if distance2(e) <= 0.64})
+        nearest = index.nearest(0.3, -0.1, 0.5, k=5)
+        self.assertEqual([distance2(e) for e in nearest], sorted(map(distance2, elements))[:5])
+        self.assertEqual(index.nearest(100, 100, 100), [elements[0]])
+        self.assertTrue(index.collides(10, 10, 10))
+        self.assertFalse(index.collides(10, 10, 9, 0.5))
+        clear_Elements()
+        self.assertEqual(len(index), 0)
+        exp.exit()
+
+    @my_test_dec
+    def test_ElementTable(self):
+        import copy, json, pickle
+        from physicsLab.circuit.elementTable import to_save_dict
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Logic_Input(0, 0, 0).set_highLevel()
+        b = Or_Gate(1.5, 0, 0, elementXYZ=True)
+        a.o - b.i_up
+        expected = [json.dumps(e.data, ensure_ascii=False) for e in exp.Elements]
+
+        exp.use_ElementTable()
+        c = Logic_Output(2, 0, 0).rename("out")
+        b.o - c.i
+        self.assertEqual([json.dumps(e.data.to_dict(), ensure_ascii=False) for e in (a, b)], expected)
+        self.assertEqual(c.data["Label"], "out")
+
+        c.set_position(3, 0, 0.5)
+        c.data["Properties"]["状态"] = 1.0
+        c.data["Statistics"]["电压"] = 3.0
+        self.assertEqual(c.data["Position"], "3,0.5,0")
+        self.assertEqual(c.data.to_dict()["Statistics"], {"电压": 3.0})
+        self.assertEqual(Logic_Output(4, 0, 0).data["Statistics"], {})
+        self.assertTrue(isinstance(c.data, dict) and isinstance(c.data["Properties"], dict))
+        self.assertEqual(json.loads(json.dumps(to_save_dict(c.data), ensure_ascii=False)), c.data.to_dict())
+        self.assertEqual(dict(c.data), c.data.to_dict())
+        self.assertEqual({**c.data}, c.data.to_dict())
+        self.assertEqual(copy.copy(c.data), c.data.to_dict())
+        self.assertEqual(pickle.loads(pickle.dumps(c.data)), c.data.to_dict())
+        self.assertEqual(dict(c.data["Properties"]), c.data.to_dict()["Properties"])
+
+        # 删除元件后回收其所在的行, 被删除的元件的data与表分离
+        table = exp.element_Table
+        d = Logic_Output(5, 0, 0).rename("d")
+        props = d.data["Properties"]
+        del_Element(d)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(d.data["Label"], "d")
+        props["状态"] = 1.0
+        e = Logic_Output(6, 0, 0)
+        self.assertEqual(len(table), 5)
+        self.assertEqual(e.data["Properties"]["状态"], 0.0)
+        self.assertNotIn("Label", e.data.to_dict())
+        self.assertEqual(d.data["Properties"]["状态"], 1.0)
+        self.assertEqual(e.data["Position"], "6,0,0")
+        del_Element(e)
+        exp.write()
+
+        exp2: Experiment = Experiment().open("__test__").read()
+        c2 = get_Element(3, 0, 0.5)
+        self.assertEqual(c2.data["Properties"]["状态"], 1.0)
+        self.assertEqual(count_Elements(), 4)
+        self.assertEqual(count_Wires(), 2)
+        exp2.delete()
+
+        # 清空元件时重置元件表
+        exp3: Experiment = Experiment().crt("__test__", force_crt=True).use_ElementTable()
+        crt_Elements(Logic_Input, [(x, 0, 0) for x in range(10)])
+        clear_Elements()
+        self.assertEqual(len(exp3.element_Table), 0)
+        Logic_Input(0, 0, 0)
+        self.assertEqual(len(exp3.element_Table), 1)
+        exp3.exit()
+
+    @my_test_dec
+    def test_shared_template(self):
+        import copy, json
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Logic_Input(0, 0, 0)
+        b = Logic_Input(1, 0, 0)
+        self.assertIs(dict.__getitem__(a.data, "Statistics"), dict.__getitem__(b.data, "Statistics"))
+        self.assertIs(dict.__getitem__(a.data, "Properties"), dict.__getitem__(b.data, "Properties"))
+
+        a.set_HighLevelValue(5).set_highLevel()
+        self.assertEqual(a.get_HighLevelValue(), 5)
+        self.assertEqual(b.get_HighLevelValue(), 3.0)
+        self.assertEqual(b.data["Properties"]["开关"], 0)
+        self.assertIsNot(dict.__getitem__(a.data, "Properties"), dict.__getitem__(b.data, "Properties"))
+        self.assertEqual(json.loads(json.dumps(a.data))["Properties"]["高电平"], 5)
+        self.assertEqual(copy.deepcopy(b.data), b.data)
+
+        # 共享的子字典读取后是普通的dict, 任何修改方式都只影响该元件
+        props = b.data["Properties"]
+        self.assertIsInstance(props, dict)
+        self.assertEqual(json.loads(json.dumps(props)), dict(props))
+        c = Logic_Input(2, 0, 0)
+        c.data.copy()["Properties"]["高电平"] = 4
+        dict(c.data.items())["Statistics"]["电压"] = 1
+        self.assertEqual(c.data["Properties"]["高电平"], 3.0)
+        for key, val in c.data.items():
+            if key == "Properties":
+                val.update({"高电平": 6})
+        self.assertEqual(c.get_HighLevelValue(), 6)
+        self.assertEqual(b.get_HighLevelValue(), 3.0)
+        # 修改之前取得的引用都能看到之后的修改, 读取不会复制
+        first, second = b.data["Statistics"], b.data["Statistics"]
+        self.assertIs(first, second)
+        first["电压"] = 1
+        second.setdefault("计数", 2)
+        self.assertEqual(second["电压"], 1)
+        self.assertEqual(first["计数"], 2)
+        self.assertIs(b.data["Statistics"], first)
+        self.assertNotIn("计数", c.data["Statistics"])
+        d = Logic_Input(3, 0, 0)
+        props = d.data["Properties"]
+        d.data["Properties"]["开关"] = 1.0
+        self.assertEqual(props["开关"], 1.0)
+        self.assertIs(dict.__getitem__(d.data, "Properties"), props)
+        self.assertEqual(Logic_Input(4, 0, 0).data["Properties"]["开关"], 0)
+        exp.exit()
+
+    @my_test_dec
+    def test_stream_write(self):
+        import json
+        from physicsLab import _savIO
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Logic_Input(0, 0, 0).rename('"中文"\n\\')
+        a.o - Or_Gate(1, 0, 0).i_up
+        exp.write(no_pop=True)
+        with open(exp.SAV_PATH, encoding="utf-8") as f:
+            context = f.read()
+
+        plsav = json.loads(context)
+        status_save = json.loads(plsav["Experiment"]["StatusSave"])
+        self.assertEqual(status_save["Elements"][0]["Label"], '"中文"\n\\')
+        self.assertEqual(len(status_save["Wires"]), 1)
+        # 与一次性json.dumps的结果完全相同
+        self.assertEqual(
+            context, json.dumps(plsav, indent=2, ensure_ascii=False, separators=(',', ':'))
+        )
+        self.assertEqual(
+            plsav["Experiment"]["StatusSave"], json.dumps(status_save, ensure_ascii=False, separators=(',', ': '))
+        )
+        self.assertIsInstance(exp.PlSav["Experiment"]["StatusSave"], _savIO.LazyStatusSave)
+        exp.delete()
+
+    @my_test_dec
+    def test_json_backend(self):
+        import copy, json
+        from physicsLab import _jsonBackend
+        tricky = '{"a": NaN, "b": "line\nbreak", "c": 123456789012345678901234567890, "d": [1.5e-07, -0.0, "中文\\u0000"]}'
+        expected = json.loads(tricky, strict=False)
+
+        old_backend = _jsonBackend.get_backend()
+        try:
+            for backend in _jsonBackend.available_backends():
+                _jsonBackend.set_backend(backend)
+                self.assertEqual(json.dumps(_jsonBackend.loads(tricky)), json.dumps(expected))
+
+                exp: Experiment = Experiment().crt("__test__", force_crt=True)
+                a = Logic_Input(0.1234, -1, 0.5).rename('"中文"\\')
+                a.o - Or_Gate(1, 0, 0).i_low
+                exp.write(no_pop=True)
+                data = [copy.deepcopy(dict(e.data)) for e in exp.Elements]
+                exp.exit()
+
+                exp2: Experiment = Experiment().open("__test__").read()
+                self.assertEqual([e.data["Properties"] for e in exp2.Elements], [d["Properties"] for d in data])
+                self.assertEqual([e.data["Position"] for e in exp2.Elements], [d["Position"] for d in data])
+                self.assertEqual(count_Wires(), 1)
+                exp2.delete()
+        finally:
+            _jsonBackend.set_backend(old_backend)
+        self.assertRaises(ValueError, _jsonBackend.set_backend, "pickle")
+
+    @my_test_dec
+    def test_snapshot(self):
+        import os, json, tempfile
+        from physicsLab import _savIO
+        path = os.path.join(tempfile.mkdtemp(), "__test__.snap")
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Logic_Input(0.1234, -1, 0.5).rename('"中文"')
+        b = Simple_Instrument(1, 0, 0, pitch=48).add_note(50)
+        a.o - b.i
+        a.o - Or_Gate(1, 1, 0).i_low
+        exp.StatusSave["SimulationSpeed"] = 2.0
+        exp.dump_snapshot(path)
+        exp.write(no_pop=True)
+        with open(exp.SAV_PATH, encoding="utf-8") as f:
+            expected = json.loads(f.read())
+        exp.exit()
+
+        exp2: Experiment = Experiment().crt("__test__", force_crt=True).load_snapshot(path)
+        self.assertEqual(count_Elements(), 3)
+        self.assertEqual(count_Wires(), 2)
+        self.assertEqual(exp2.Elements[1].get_chord(), (48, 50))
+        self.assertIs(get_Element(0.1234, -1, 0.5), exp2.Elements[0])
+        self.assertIs(exp2.get_element_from_identifier(a.data["Identifier"]), exp2.Elements[0])
+        exp2.write(no_pop=True)
+        with open(exp2.SAV_PATH, encoding="utf-8") as f:
+            result = json.loads(f.read())
+        # 转换回.sav后与原存档相同(导线的顺序可能不同)
+        status_saves = []
+        for plsav in (expected, result):
+            status_save = json.loads(_savIO.load_status_save(plsav["Experiment"].pop("StatusSave")))
+            status_save["Wires"].sort(key=str)
+            status_saves.append(status_save)
+            del plsav["Experiment"]["CreationDate"], plsav["Summary"]["CreationDate"]
+        self.assertEqual(status_saves[0], status_saves[1])
+        self.assertEqual(expected, result)
+        exp2.delete()
+
+        exp3: Experiment = Experiment().crt("__test__", experiment_type=ExperimentType.Celestial, force_crt=True)
+        self.assertRaises(errors.ExperimentTypeError, exp3.load_snapshot, path)
+        exp3.exit()
+
+        # 读取快照不改变实验的名称
+        exp4: Experiment = Experiment().crt("__test_dst__", force_crt=True).load_snapshot(path)
+        self.assertEqual(exp4.PlSav["InternalName"], "__test_dst__")
+        self.assertEqual(exp4.PlSav["Summary"]["Subject"], "__test_dst__")
+        self.assertEqual(exp4.StatusSave["SimulationSpeed"], 2.0)
+        self.assertEqual(count_Elements(), 3)
+        exp4.write(no_pop=True)
+        self.assertEqual(Experiment().open("__test_dst__").read().PlSav["InternalName"], "__test_dst__")
+        self.assertEqual(count_Wires(), 2)
+        get_Experiment().exit()
+        exp4.delete()
+
+    @my_test_dec
+    def test_lazy_read(self):
+        from physicsLab._lazyElements import LazyElements
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        # 含有转义字符与括号的字段不影响元件的定位
+        Logic_Input(0, 0, 0).rename('{"a": [\\"}]\\\\')
+        for i in range(1, 10):
+            Or_Gate(i, 0, 0).i_up - get_Element(index=i).o
+        exp.write()
+
+        expected = Experiment().open("__test__").read()
+        expected_data = [dict(e.data) for e in expected.Elements]
+        expected_wires = {str(a_wire.release()) for a_wire in expected.Wires}
+        expected.exit()
+
+        # 退出实验时解除对存档的映射
+        exp3: Experiment = Experiment().open("__test__").read(lazy=True)
+        exp3.exit()
+        self.assertTrue(exp3.Elements._index._mmap.closed)
+        with experiment("__test__", is_exit=True) as exp3:
+            exp3.read(lazy=True)
+        self.assertTrue(exp3.Elements._index._mmap.closed)
+
+        exp2: Experiment = Experiment().open("__test__").read(lazy=True)
+        self.assertIsInstance(exp2.Elements, LazyElements)
+        self.assertEqual(count_Elements(), 10)
+        self.assertEqual(exp2.Elements.unbuilt, 10)
+        self.assertEqual(dict(exp2.Elements[3].data), expected_data[3])
+        self.assertEqual(exp2.Elements.unbuilt, 9)
+        identifier = expected_data[7]["Identifier"]
+        self.assertEqual(exp2.get_element_from_identifier(identifier).data["Identifier"], identifier)
+        self.assertEqual(exp2.Elements.unbuilt, 8)
+
+        self.assertEqual(count_Wires(), 9)
+        self.assertEqual({str(a_wire.release()) for a_wire in exp2.Wires}, expected_wires)
+        self.assertEqual([dict(e.data) for e in exp2.Elements], expected_data)
+        self.assertEqual(exp2.Elements.unbuilt, 0)
+        self.assertIs(get_Element(3, 0, 0), exp2.Elements[3])
+        exp2.write(no_pop=True)
+        self.assertNotIsInstance(exp2.Elements, LazyElements)
+        exp2.delete()
+
+    @my_test_dec
+    def test_map_saves(self):
+        paths = []
+        for i in range(3):
+            exp: Experiment = Experiment().crt(f"__test_{i}__", force_crt=True)
+            for j in range(i + 1):
+                Or_Gate(j, 0, 0).o - get_Element(index=j + 1).i_up
+            exp.write()
+            paths.append(exp.SAV_PATH)
+
+        expected = [(f"__test_{i}__", i + 1, i + 1, True) for i in range(3)]
+        # 调用者已打开的实验不影响存档的处理
+        exp = Experiment().crt("__test__", force_crt=True)
+        for workers in (0, 2):
+            results = list(batch.map_saves(_summarize_save, paths, workers=workers))
+            self.assertEqual(results, list(zip(paths, expected)))
+            self.assertIs(get_Experiment(), exp)
+        results = sorted(batch.map_saves(_summarize_save, iter(paths), workers=2, lazy=True, ordered=False))
+        self.assertEqual(results, sorted(zip(paths, expected)))
+        # 处理完存档后退出实验并解除对存档的映射
+        for _, processed in batch.map_saves(lambda exp: exp, paths, workers=0, lazy=True):
+            self.assertTrue(processed.Elements._index._mmap.closed)
+        self.assertEqual(stack_Experiment.data[:], [exp])
+        exp.exit()
+
+        for path in paths:
+            Experiment().open(path, Experiment.PathLoadMode.path).delete()
+
+    @my_test_dec
+    def test_context_local_stack(self):
+        import asyncio
+        import threading
+
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        barrier = threading.Barrier(2)
+        results = {}
+
+        def build(i: int) -> None:
+            # 新线程的实验栈是空的, 不受主线程已打开的实验影响
+            results[i] = [len(stack_Experiment.data)]
+            sub_exp = Experiment().crt(f"__test_{i}__", force_crt=True)
+            barrier.wait()
+            for j in range(10 * (i + 1)):
+                Yes_Gate(j, i, 0)
+            barrier.wait()
+            results[i] += [get_Experiment() is sub_exp, count_Elements()]
+            sub_exp.exit()
+
+        threads = [threading.Thread(target=build, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {0: [0, True, 10], 1: [0, True, 20]})
+        self.assertIs(get_Experiment(), exp)
+        self.assertEqual(count_Elements(), 0)
+
+        async def task(i: int) -> tuple:
+            # task继承创建时的实验栈, 但push与pop不影响其他task
+            outer = get_Experiment()
+            sub_exp = Experiment().crt(f"__test_{i}__", force_crt=True)
+            await asyncio.sleep(0)
+            Yes_Gate(0, 0, 0)
+            await asyncio.sleep(0)
+            res = (outer is exp, get_Experiment() is sub_exp, count_Elements())
+            sub_exp.exit()
+            return res
+
+        async def main() -> list:
+            return list(await asyncio.gather(task(0), task(1)))
+
+        self.assertEqual(asyncio.run(main()), [(True, True, 1)] * 2)
+        self.assertIs(get_Experiment(), exp)
+        exp.exit()
+
+    @my_test_dec
+    def test_crt_Elements(self):
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        positions = [(i, i // 2, 0.12345) for i in range(6)]
+        expected = [Or_Gate(*position, True).set_rotation(1, 2, 3) for position in positions]
+        gates = crt_Elements("Or Gate", positions, (1, 2, 3), elementXYZ=True)
+
+        self.assertEqual(count_Elements(), 12)
+        self.assertEqual(len(exp.elements_Identifier), 12)
+        for a, b in zip(expected, gates):
+            self.assertNotEqual(a.data["Identifier"], b.data["Identifier"])
+            self.assertEqual({**a.data, "Identifier": None}, {**b.data, "Identifier": None})
+            self.assertEqual(a.get_position(), b.get_position())
+            self.assertTrue(b.is_elementXYZ)
+        self.assertEqual(get_Element(1, 0, 0.1235), [expected[1], gates[1]])
+        self.assertEqual(exp.spatial_Index.get_position(gates[5]),
+                         exp.spatial_Index.get_position(expected[5]))
+        self.assertEqual(set(exp.spatial_Index.query_radius(*exp.spatial_Index.get_position(gates[5]), 0)),
+                         {expected[5], gates[5]})
+        gates[0].o - gates[1].i_up
+        self.assertEqual(count_Wires(), 1)
+
+        with self.assertRaises(TypeError):
+            crt_Elements(Or_Gate, [(0, 0, 0), (0, "1", 0)])
+        self.assertEqual(count_Elements(), 12)
+        exp.exit()
+
+    @my_test_dec
+    def test_translate_array(self):
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        set_O(0.3, -1.25, 2)
+        points = [(i * 1.5, -i, i % 3 * 0.7) for i in range(8)]
+        bigs = [i % 2 == 0 for i in range(8)]
+        self.assertEqual(xyzTranslate_array(points, bigs),
+                         [xyzTranslate(*point, big) for point, big in zip(points, bigs)])
+        self.assertEqual(translateXYZ_array(points, True),
+                         [translateXYZ(*point, True) for point in points])
+        self.assertEqual(xyzTranslate_array([]), [])
+        with self.assertRaises(TypeError):
+            xyzTranslate_array([(0, "1", 0)])
+        with self.assertRaises(TypeError):
+            translateXYZ_array(points, bigs[:-1])
+
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+        else:
+            result = xyzTranslate_array(np.array(points), np.array(bigs))
+            self.assertIsInstance(result, np.ndarray)
+            self.assertEqual(result.tolist(), [list(point) for point in xyzTranslate_array(points, bigs)])
+
+        # 模块化电路通过crt_Elements批量创建元件
+        a = lib.Register(0, 0, 0, 4, elementXYZ=True)
+        self.assertEqual([element.get_position() for element in a[:]],
+                         [(0, i * 2, 0) for i in range(4)])
+        self.assertEqual(a[3].data["Position"], "{},{},{}".format(
+            *(roundData(*xyzTranslate(0, 6, 0, True))[i] for i in (0, 2, 1))))
+        exp.exit()
+
+    @my_test_dec
+    def test_identifier_allocator(self):
+        from physicsLab import _tools
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Yes_Gate(0, 0, 0)
+        gates = crt_Elements(Yes_Gate, [(i, 0, 0) for i in range(300)])
+        identifiers = [a.data["Identifier"]] + [gate.data["Identifier"] for gate in gates]
+        self.assertEqual(len(set(identifiers)), 301)
+        self.assertTrue(all(len(identifier) == 32 and identifier.isalnum() for identifier in identifiers))
+
+        # 随机生成的Identifier与已有的元件重复时跳过
+        rand_strings = _tools.randStrings
+        fake = iter([[a.data["Identifier"]] * 3, ["x" * 32, "y" * 32],
+                     ["x" * 32, a.data["Identifier"], "x" * 32], ["y" * 32, "z" * 32]])
+        _tools.randStrings = lambda count, length: next(fake)
+        try:
+            exp.identifier_Allocator._pool.clear()
+            self.assertEqual(exp.identifier_Allocator.allocate(), "y" * 32)
+            exp.identifier_Allocator._pool.clear()
+            self.assertEqual(exp.identifier_Allocator.allocate_many(3), ["x" * 32, "y" * 32, "z" * 32])
+        finally:
+            _tools.randStrings = rand_strings
+        exp.exit()
+
+    @my_test_dec
+    def test_element_registry(self):
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        self.assertIsInstance(crt_Element("Yes Gate"), Yes_Gate)
+        self.assertIsInstance(crt_Element("Yes_Gate"), Yes_Gate)
+        self.assertIsInstance(crt_Element(" 555 Timer ", 1, 0, 0), NE555)
+        self.assertIsInstance(crt_Element("8bit Display", 2, 0, 0), eight_bit_Display)
+        self.assertIsInstance(crt_Element("N-MOSFET", 3, 0, 0), N_MOSFET)
+        a = crt_Element("Simple Instrument", 4, 0, 0, None, pitch="C5")
+        self.assertEqual(a.data["Properties"]["音高"], Simple_Instrument(5, 0, 0, pitch="C5").data["Properties"]["音高"])
+        self.assertRaises(ElementNotExistError, crt_Element, "Unknown Element")
+        self.assertRaises(ElementNotExistError, crt_Element, "Earth")
+        exp.exit()
+
+        exp = Experiment().crt("__test__", force_crt=True, experiment_type=ExperimentType.Celestial)
+        self.assertIsInstance(crt_Element("Earth"), Earth)
+        self.assertRaises(ElementNotExistError, crt_Element, "Yes Gate")
+        exp.exit()
+
+    @my_test_dec
+    def test_export(self):
+        import tempfile
+        exp: Experiment = Experiment().crt("__test__", force_crt=True)
+        a = Full_Adder(0, 0, 0)
+        b = Multiplier(1, 0, 0)
+        a.o_up - b.i_up
+        crt_Wire(b.o_low, a.i_low, "red")
+        self.assertEqual(repr(Wire(a.o_up, b.i_up)), "e1.o_up - e2.i_up")
+        self.assertEqual(repr(Wire(b.o_low, a.i_low, "red")), "crt_Wire(e2.o_low, e1.i_low, '红')")
+
+        m = lib.MultiElements(0, 0, 1, 3, element=Multiplier)
+        self.assertEqual([(pin.element_self, pin.pinLabel) for pin in m.pins(b.o_low)],
+                         [(e, b.o_low.pinLabel) for e in m[:]])
+
+        with tempfile.TemporaryDirectory() as path:
+            output = os.path.join(path, "temp.pl.py")
+            exp.export(output, "__test_export__")
+            with open(output, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[:4], ["from physicsLab import *",
+                                     "exp = Experiment('__test_export__')",
+                                     f"e1 = {a!r}",
+                                     f"e2 = {b!r}"])
+        self.assertEqual(sorted(lines[7:9]), ["crt_Wire(e2.o_low, e1.i_low, '红')", "e1.o_up - e2.i_up"])
+        self.assertEqual(lines[-2:], ["", "exp.write()"])
+        exp.exit()